@@ -1,2 +1,52 @@
-from .models import ResultAggregator, Span, GoldPredictedPair, ScoreCard
-from .evaluator import NEREvaluator, NERTagListEvaluator
\ No newline at end of file
+"""
+Submodules (and the optional dependencies they need) are only imported once one of
+their attributes is accessed, keeping `import seqnereval` cheap for short-lived
+processes like the command line or serverless scoring jobs.
+"""
+_LAZY_ATTRIBUTES = {
+    "ResultAggregator": "models",
+    "Span": "models",
+    "CharSpan": "models",
+    "GoldPredictedPair": "models",
+    "ScoreCard": "models",
+    "ConfusionMatrix": "models",
+    "PairStatistics": "models",
+    "PredictionScores": "models",
+    "BucketedCounts": "models",
+    "Reservoir": "models",
+    "HeavyHitters": "models",
+    "TokenScoreCard": "models",
+    "CountAggregator": "models",
+    "SlidingWindowAggregator": "models",
+    "ResultSnapshot": "models",
+    "merge_files": "models",
+    "NEREvaluator": "evaluator",
+    "NERTagListEvaluator": "evaluator",
+    "NERCharOffsetEvaluator": "evaluator",
+    "aggregate_subword_tag_ids": "subword",
+    "decode_tag_list": "decoder",
+    "TagScheme": "decoder",
+    "DocumentResultCache": "cache",
+    "compare": "comparison",
+    "SystemComparison": "comparison",
+    "annotator_agreement": "agreement",
+    "AgreementCounts": "agreement",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # __import__ (unlike importlib.import_module) shows up in `python -X importtime`.
+    value = getattr(__import__(f"{__name__}.{module_name}", fromlist=[name]), name)
+    # cache the attribute so that __getattr__ isn't called for it again.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
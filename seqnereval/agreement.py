@@ -0,0 +1,232 @@
+from __future__ import annotations
+import heapq
+import itertools
+from array import array
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from .decoder import DecodedSpan, get_decoder
+
+
+class AgreementCounts:
+    """Pairwise agreement counts of several annotators of the same documents.
+
+    For every ordered pair of annotators (a, b) the # of spans of a that b annotated exactly (same type and bounds)
+    and the # of spans of a that overlap a span of the same type annotated by b are counted, so taking a as the
+    reference, the precision of b is matches[b][a] / # of spans of b and its recall is matches[a][b] / # of spans of a.
+    """
+    MATCHES = ('strict', 'partial')
+
+    def __init__(self, annotators: Sequence[str]) -> None:
+        """
+        Constructor for AgreementCounts
+
+        Args:
+            annotators (Sequence[str]): names of the annotators.
+        """
+        self.annotators = list(annotators)
+        annotator_count = len(self.annotators)
+        self.span_counts = array('q', bytes(8 * annotator_count))
+        # matches of annotator a with annotator b at a * # of annotators + b.
+        self.strict_matches = array('q', bytes(8 * annotator_count * annotator_count))
+        self.partial_matches = array('q', bytes(8 * annotator_count * annotator_count))
+        # # of distinct spans and of spans annotated by every annotator.
+        self.distinct_span_count = 0
+        self.unanimous_span_count = 0
+        self.document_count = 0
+
+    def add_document(self, spans_by_annotator: Sequence[Sequence[DecodedSpan]]) -> None:
+        """Counts the agreement on a document in a single k-way merge of the sorted spans of the annotators.
+
+        Args:
+            spans_by_annotator (Sequence[Sequence[DecodedSpan]]): (type, start_idx, end_idx) of the spans of
+                every annotator, in the order of `annotators`.
+        """
+        annotator_count = len(self.annotators)
+        if len(spans_by_annotator) != annotator_count:
+            raise Exception(
+                f'Exception: Expected the spans of {annotator_count} annotators, got {len(spans_by_annotator)}')
+
+        sorted_span_lists = [
+            sorted((start_idx, end_idx, span_type, annotator_idx) for span_type, start_idx, end_idx in spans)
+            for annotator_idx, spans in enumerate(spans_by_annotator)
+        ]
+        all_annotators_mask = (1 << annotator_count) - 1
+
+        # masks of the annotators every span matches, strictly and partially.
+        strict_masks, partial_masks, span_annotators = [], [], []
+        # (end_idx, type, annotator, span index) of the spans overlapping the current position.
+        active_spans: List[Tuple[int, str, int, int]] = []
+        previous_key, key_annotators_mask = None, 0
+        for span_idx, (start_idx, end_idx, span_type, annotator_idx) in enumerate(heapq.merge(*sorted_span_lists)):
+            self.span_counts[annotator_idx] += 1
+            annotator_bit = 1 << annotator_idx
+            strict_mask, partial_mask = 0, 0
+
+            active_spans = [active_span for active_span in active_spans if active_span[0] >= start_idx]
+            for active_end_idx, active_type, active_annotator_idx, active_span_idx in active_spans:
+                if active_type != span_type or active_annotator_idx == annotator_idx:
+                    continue
+                # active spans start at or before this one and end after it starts.
+                partial_mask |= 1 << active_annotator_idx
+                partial_masks[active_span_idx] |= annotator_bit
+
+            key = (start_idx, end_idx, span_type)
+            if key == previous_key:
+                strict_mask = key_annotators_mask & ~annotator_bit
+                for previous_span_idx in range(span_idx - 1, -1, -1):
+                    if span_annotators[previous_span_idx][1] != key:
+                        break
+                    if span_annotators[previous_span_idx][0] != annotator_idx:
+                        strict_masks[previous_span_idx] |= annotator_bit
+                key_annotators_mask |= annotator_bit
+            else:
+                if previous_key is not None and key_annotators_mask == all_annotators_mask:
+                    self.unanimous_span_count += 1
+                self.distinct_span_count += 1
+                previous_key, key_annotators_mask = key, annotator_bit
+
+            strict_masks.append(strict_mask)
+            partial_masks.append(partial_mask)
+            span_annotators.append((annotator_idx, key))
+            active_spans.append((end_idx, span_type, annotator_idx, span_idx))
+
+        if previous_key is not None and key_annotators_mask == all_annotators_mask:
+            self.unanimous_span_count += 1
+
+        for (annotator_idx, _), strict_mask, partial_mask in zip(span_annotators, strict_masks, partial_masks):
+            row_offset = annotator_idx * annotator_count
+            for other_annotator_idx in range(annotator_count):
+                if strict_mask >> other_annotator_idx & 1:
+                    self.strict_matches[row_offset + other_annotator_idx] += 1
+                if partial_mask >> other_annotator_idx & 1:
+                    self.partial_matches[row_offset + other_annotator_idx] += 1
+        self.document_count += 1
+
+    def merge(self, other: AgreementCounts) -> None:
+        """Merges the counts of other (e.g. of another batch of documents) into self.
+        """
+        if other.annotators != self.annotators:
+            raise Exception('Exception: Agreement counts of different annotators can\'t be merged.')
+        for counts, other_counts in ((self.span_counts, other.span_counts),
+                                     (self.strict_matches, other.strict_matches),
+                                     (self.partial_matches, other.partial_matches)):
+            for idx, count in enumerate(other_counts):
+                counts[idx] += count
+        self.distinct_span_count += other.distinct_span_count
+        self.unanimous_span_count += other.unanimous_span_count
+        self.document_count += other.document_count
+
+    def pairwise(self, match: str = 'strict') -> Dict[Tuple[str, str], Dict[str, float]]:
+        """Precision, recall and f1 of every pair of annotators.
+
+        Args:
+            match (str, optional): 'strict' (same type and bounds) or 'partial' (same type, overlapping bounds).
+                Defaults to 'strict'.
+
+        Returns:
+            Dict[Tuple[str, str], Dict[str, float]]: summary keyed by (reference annotator, other annotator), for
+                every pair of annotators in the order of `annotators`.
+        """
+        if match not in AgreementCounts.MATCHES:
+            raise Exception(f'Unknown match: {match}, expected one of {AgreementCounts.MATCHES}')
+        matches = self.strict_matches if match == 'strict' else self.partial_matches
+
+        annotator_count = len(self.annotators)
+        summaries = {}
+        for reference_idx, other_idx in itertools.combinations(range(annotator_count), 2):
+            reference_span_count, other_span_count = self.span_counts[reference_idx], self.span_counts[other_idx]
+            precision = matches[other_idx * annotator_count + reference_idx] / other_span_count \
+                if other_span_count > 0 else 0
+            recall = matches[reference_idx * annotator_count + other_idx] / reference_span_count \
+                if reference_span_count > 0 else 0
+            f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0
+            summaries[(self.annotators[reference_idx], self.annotators[other_idx])] = {
+                "precision": precision,
+                "recall": recall,
+                "f1": f1,
+            }
+        return summaries
+
+    def summarize(self) -> Dict[str, float]:
+        """Multi-rater summary, the mean pairwise strict and partial f1 and the fraction of the distinct spans
+        annotated by every annotator.
+        """
+        summary = {}
+        for match in AgreementCounts.MATCHES:
+            pairwise_summaries = self.pairwise(match)
+            summary[f"mean_{match}_f1"] = sum(pair_summary["f1"] for pair_summary in pairwise_summaries.values()) / \
+                len(pairwise_summaries) if pairwise_summaries else 0
+        summary["unanimous_span_ratio"] = self.unanimous_span_count / self.distinct_span_count \
+            if self.distinct_span_count > 0 else 0
+        summary["document_count"] = self.document_count
+        return summary
+
+
+def agreement_for_documents(annotators: Sequence[str], documents: Sequence[Sequence[Sequence[str]]],
+                            tag_scheme: str = 'lenient') -> AgreementCounts:
+    """Decodes the tags of every annotator once and counts the agreement on the documents.
+
+    Args:
+        annotators (Sequence[str]): names of the annotators.
+        documents (Sequence[Sequence[Sequence[str]]]): tag list of every annotator for each document.
+        tag_scheme (str, optional): decoding scheme of the tags, refer `DECODERS`. Defaults to 'lenient'.
+
+    Returns:
+        AgreementCounts: agreement counts of the documents.
+    """
+    decoder = get_decoder(tag_scheme)
+    counts = AgreementCounts(annotators)
+    for doc_idx, tag_lists in enumerate(documents):
+        if len({len(tag_list) for tag_list in tag_lists}) > 1:
+            raise Exception(f'Exception: Number of tags of the annotators are not the same in document #{doc_idx}.')
+        counts.add_document([decoder.decode(tag_list)[0] for tag_list in tag_lists])
+    return counts
+
+
+def _agreement_for_documents_star(args) -> AgreementCounts:
+    return agreement_for_documents(*args)
+
+
+def annotator_agreement(tag_lists_by_annotator: Dict[str, Sequence[Sequence[str]]], tag_scheme: str = 'lenient',
+                        jobs: int = 1, batch_size: int = 1000) -> AgreementCounts:
+    """Computes the agreement of every pair of annotators in one pass over the documents, rather than evaluating
+    every pair of annotators separately.
+
+    Example:
+        >>> agreement = annotator_agreement({"ann1": tag_lists_1, "ann2": tag_lists_2, "ann3": tag_lists_3})
+        >>> agreement.pairwise('partial')[("ann1", "ann2")]["f1"]
+        >>> agreement.summarize()
+
+    Args:
+        tag_lists_by_annotator (Dict[str, Sequence[Sequence[str]]]): tag lists of the documents keyed by the annotator.
+        tag_scheme (str, optional): decoding scheme of the tags, refer `DECODERS`. Defaults to 'lenient'.
+        jobs (int, optional): # of worker processes the batches of documents are split across. Defaults to 1.
+        batch_size (int, optional): # of documents in a batch. Defaults to 1000.
+
+    Returns:
+        AgreementCounts: agreement counts of all the documents.
+    """
+    annotators = list(tag_lists_by_annotator)
+    if len(annotators) < 2:
+        raise Exception('Exception: At least two annotators are required to compute the agreement.')
+    if len({len(tag_lists) for tag_lists in tag_lists_by_annotator.values()}) > 1:
+        raise Exception('Exception: Number of documents annotated by the annotators are not the same.')
+
+    def batches() -> Iterator[Tuple[List[str], List[Tuple[Sequence[str], ...]], str]]:
+        documents = zip(*tag_lists_by_annotator.values())
+        while True:
+            batch = list(itertools.islice(documents, batch_size))
+            if not batch:
+                return
+            yield annotators, batch, tag_scheme
+
+    counts = AgreementCounts(annotators)
+    if jobs > 1:
+        with Pool(jobs) as pool:
+            for batch_counts in pool.imap(_agreement_for_documents_star, batches()):
+                counts.merge(batch_counts)
+    else:
+        for batch in batches():
+            counts.merge(agreement_for_documents(*batch))
+    return counts
@@ -0,0 +1,102 @@
+from __future__ import annotations
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Hashable, Iterable, Optional
+
+from .checkpoint import atomic_pickle_dump, pickle_load
+
+
+class DocumentResultCache:
+    """LRU cache of the results of single documents, keyed by a hash of everything the results depend on
+    (tokens, gold and predicted tags and the evaluator settings), so re-evaluating mostly unchanged
+    predictions only decodes and matches the documents that changed. NERTagListEvaluator caches compact
+    entries per document, the decoded (type, start_idx, end_idx) spans and the per-scenario counts and rows
+    of their matches, and rebuilds the result aggregators from them.
+
+    Example:
+        >>> cache = DocumentResultCache.load('dev_results.cache')
+        >>> NERTagListEvaluator(tokens, gold_tag_lists, pred_tag_lists, result_cache=cache).evaluate()
+        >>> cache.save('dev_results.cache')
+    """
+
+    # version of the entries, caches saved with another version are discarded when loaded.
+    FORMAT_VERSION = 3
+
+    def __init__(self, max_size: Optional[int] = 1000000):
+        """
+        Constructor for DocumentResultCache
+
+        Args:
+            max_size (int, optional): max # of documents kept, least recently used documents are evicted first.
+                None keeps every document. Defaults to 1000000.
+        """
+        self.max_size = max_size
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts: Iterable) -> bytes:
+        """Hashes sequences of strings (e.g. the tokens, the gold and the predicted tags of a document).
+        """
+        key_hash = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            # unit and record separators keep ['a b'] and ['a', 'b'] (or the parts) from colliding.
+            key_hash.update('\x1f'.join(map(str, part)).encode('utf-8'))
+            key_hash.update(b'\x1e')
+        return key_hash.digest()
+
+    def get(self, key: Hashable):
+        """Returns the cached entry of a key (marking it as recently used) or None.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, entry) -> None:
+        """Caches an entry, evicting the least recently used entries if the cache is full.
+        """
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if self.max_size is not None:
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def save(self, path: str) -> None:
+        """Writes the cached entries to a file, atomically replacing it.
+        """
+        atomic_pickle_dump({"format_version": DocumentResultCache.FORMAT_VERSION, "max_size": self.max_size,
+                            "entries": self.entries}, path)
+
+    @classmethod
+    def load(cls, path: str, max_size: Optional[int] = None) -> DocumentResultCache:
+        """Loads a cache saved by `save`, an empty cache is returned if the file doesn't exist or was saved
+        with another format version.
+
+        Only load caches written by yourself, the file is unpickled.
+
+        Args:
+            path (str): path of the cache file.
+            max_size (int, optional): overrides the max size the cache was saved with.
+        """
+        if not os.path.exists(path):
+            return cls(max_size) if max_size is not None else cls()
+
+        state = pickle_load(path)
+        cache = cls(max_size if max_size is not None else state["max_size"])
+        if state.get("format_version") != DocumentResultCache.FORMAT_VERSION:
+            return cache
+        for key, entry in state["entries"].items():
+            cache.put(key, entry)
+        return cache
@@ -0,0 +1,44 @@
+from __future__ import annotations
+import os
+import pickle
+import tempfile
+
+
+def atomic_pickle_dump(obj, path: str) -> None:
+    """Pickles an object to a file through a temporary file in the same directory that is flushed to disk and
+    renamed over the file, so a crash never leaves a partially written file behind. The directory is flushed
+    after the rename as well, so the new file survives a power loss.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}-')
+    try:
+        with os.fdopen(file_descriptor, 'wb') as temp_file:
+            pickle.dump(obj, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    fsync_directory(directory)
+
+
+def fsync_directory(directory: str) -> None:
+    """Flushes the entries of a directory (e.g. a file renamed into it) to disk, a no-op where directories
+    can't be opened (Windows).
+    """
+    try:
+        directory_descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(directory_descriptor)
+    finally:
+        os.close(directory_descriptor)
+
+
+def pickle_load(path: str):
+    """Unpickles an object written by `atomic_pickle_dump`, only load files written by yourself.
+    """
+    with open(path, 'rb') as pickle_file:
+        return pickle.load(pickle_file)
@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import sys
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .__version__ import __version__
+from .streaming import StreamingEvaluator
+
+FILE_FORMATS = ('conll', 'tsv', 'jsonl')
+
+
+def infer_file_format(path: str) -> str:
+    """Infers the format of a file from its extension, defaults to 'conll'.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.json', '.ndjson'):
+        return 'jsonl'
+    if extension == '.tsv':
+        return 'tsv'
+    return 'conll'
+
+
+def read_column_documents(path: str, delimiter: Optional[str] = None) -> Iterator[Tuple[List[str], List[str]]]:
+    """Streams the (tokens, tags) of the documents of a CoNLL/TSV file.
+
+    Every line holds a token in the first and its tag in the last column, documents
+    (sentences) are separated by blank lines or `-DOCSTART-` lines.
+
+    Args:
+        path (str): path of the file.
+        delimiter (str, optional): column delimiter, any whitespace if None.
+    """
+    tokens, tags = [], []
+    with open(path, encoding='utf-8') as column_file:
+        for line_number, line in enumerate(column_file, 1):
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('-DOCSTART-'):
+                if tokens:
+                    yield tokens, tags
+                    tokens, tags = [], []
+                continue
+
+            columns = line.split(delimiter)
+            if len(columns) < 2:
+                raise Exception(f'Exception: Expected a token and a tag at {path}:{line_number}, got: {line}')
+            tokens.append(columns[0])
+            tags.append(columns[-1])
+
+    if tokens:
+        yield tokens, tags
+
+
+def read_jsonl_documents(path: str) -> Iterator[Tuple[List[str], List[str]]]:
+    """Streams the (tokens, tags) of the documents of a JSON lines file, one {"tokens": [...], "tags": [...]}
+    object per line.
+    """
+    with open(path, encoding='utf-8') as jsonl_file:
+        for line_number, line in enumerate(jsonl_file, 1):
+            if not line.strip():
+                continue
+            document = json.loads(line)
+            tags = document.get('tags', document.get('ner_tags'))
+            if tags is None:
+                raise Exception(f'Exception: No "tags" found at {path}:{line_number}')
+            yield document.get('tokens', [None] * len(tags)), tags
+
+
+def read_documents(path: str, file_format: Optional[str] = None) -> Iterator[Tuple[List[str], List[str]]]:
+    """Streams the (tokens, tags) of the documents of a file.
+
+    Args:
+        path (str): path of the file.
+        file_format (str, optional): one of 'conll', 'tsv' or 'jsonl', inferred from the extension if None.
+    """
+    file_format = file_format or infer_file_format(path)
+    if file_format == 'jsonl':
+        return read_jsonl_documents(path)
+    if file_format == 'tsv':
+        return read_column_documents(path, '\t')
+    if file_format == 'conll':
+        return read_column_documents(path)
+    raise Exception(f'Unknown file format: {file_format}, expected one of {FILE_FORMATS}')
+
+
+def read_document_pairs(gold_path: str, pred_path: str, file_format: Optional[str] = None,
+                        pred_file_format: Optional[str] = None) -> Iterator[Tuple[List[str], List[str], List[str]]]:
+    """Streams the (tokens, gold tags, predicted tags) of the documents of a gold and a prediction file.
+    """
+    gold_documents = read_documents(gold_path, file_format)
+    pred_documents = read_documents(pred_path, pred_file_format or file_format)
+
+    for doc_idx, gold_document in enumerate(gold_documents):
+        pred_document = next(pred_documents, None)
+        if pred_document is None:
+            raise Exception(f'Exception: {pred_path} has fewer documents than {gold_path} ({doc_idx}).')
+        (tokens, gold_tags), (_, pred_tags) = gold_document, pred_document
+        yield tokens, gold_tags, pred_tags
+
+    if next(pred_documents, None) is not None:
+        raise Exception(f'Exception: {pred_path} has more documents than {gold_path}.')
+
+
+def format_text_summary(summary: dict) -> str:
+    """Formats the summary as a plain text table.
+    """
+    lines = []
+
+    def add_scorecards(name: str, summary_for_name: dict) -> None:
+        lines.append(name)
+        lines.append(f'  {"schema":<15}{"correct":>10}{"incorrect":>10}{"partial":>10}{"missed":>10}'
+                     f'{"spurious":>10}{"precision":>11}{"recall":>11}{"f1":>11}')
+        for scorecard in ('strict_match', 'type_match', 'partial_match', 'bounds_match'):
+            scores = summary_for_name[scorecard]
+            lines.append(f'  {scorecard:<15}{scores["correct_counts"]:>10}{scores["incorrect_counts"]:>10}'
+                         f'{scores["partial_counts"]:>10}{scores["missed_counts"]:>10}{scores["spurious_counts"]:>10}'
+                         f'{scores["precision"]:>11.4f}{scores["recall"]:>11.4f}{scores["f1"]:>11.4f}')
+
+    add_scorecards('overall', summary["overall"])
+    for tag, summary_for_tag in summary.get("by_tags", {}).items():
+        add_scorecards(tag, summary_for_tag)
+
+    return '\n'.join(lines)
+
+
+def evaluate_command(args: argparse.Namespace) -> int:
+    if args.resume is not None and os.path.exists(args.resume):
+        evaluator = StreamingEvaluator.from_checkpoint(args.resume, jobs=args.jobs)
+    else:
+        evaluator = StreamingEvaluator(counts_only=args.counts_only, jobs=args.jobs, batch_size=args.batch_size,
+                                       entity_context_padding=args.context, batch_cost=args.batch_cost)
+    evaluator.evaluate(read_document_pairs(args.gold, args.pred, args.format, args.pred_format),
+                       checkpoint_path=args.checkpoint if args.checkpoint is not None else args.resume,
+                       checkpoint_every=args.checkpoint_every)
+
+    summary = evaluator.summarize_result(per_tag=args.per_tag)
+    throughput = evaluator.get_throughput()
+
+    if args.output == 'json':
+        print(json.dumps({**summary, "throughput": throughput}, indent=2))
+    else:
+        print(format_text_summary(summary))
+
+    print(f'Evaluated {throughput["documents"]} documents ({throughput["tokens"]} tokens) in '
+          f'{throughput["seconds"]:.2f}s: {throughput["documents_per_second"]:.0f} documents/s, '
+          f'{throughput["tokens_per_second"]:.0f} tokens/s', file=sys.stderr)
+    return 0
+
+
+def merge_command(args: argparse.Namespace) -> int:
+    from .models.result_snapshot import merge_files
+
+    merged_snapshot = merge_files(args.snapshots, args.output_path)
+    print(json.dumps(merged_snapshot.summarize_result(), indent=2))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='seqnereval', description='Evaluate NER models significantly faster and easily.')
+    parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    evaluate_parser = subparsers.add_parser('evaluate', help='evaluate a prediction file against a gold file')
+    evaluate_parser.add_argument('gold', help='file with the gold tags')
+    evaluate_parser.add_argument('pred', help='file with the predicted tags')
+    evaluate_parser.add_argument('--format', choices=FILE_FORMATS,
+                                 help='format of the files, inferred from the extension by default')
+    evaluate_parser.add_argument('--pred-format', choices=FILE_FORMATS,
+                                 help='format of the prediction file if it differs from the gold file')
+    evaluate_parser.add_argument('--jobs', type=int, default=1, help='# of worker processes (default: 1)')
+    evaluate_parser.add_argument('--batch-size', type=int, default=1000,
+                                 help='# of documents evaluated at once by a worker (default: 1000)')
+    evaluate_parser.add_argument('--batch-cost', type=int,
+                                 help='pack documents into batches of about this many tokens + entity tags '
+                                      'instead of fixed # of documents')
+    evaluate_parser.add_argument('--counts-only', action='store_true', help='only keep counts, the tags are matched without creating any span')
+    evaluate_parser.add_argument('--per-tag', action='store_true', help='include the results of every tag')
+    evaluate_parser.add_argument('--context', type=int, default=0, help='# of context tokens around spans')
+    evaluate_parser.add_argument('--output', choices=('text', 'json'), default='text',
+                                 help='output format (default: text)')
+    evaluate_parser.add_argument('--checkpoint', help='periodically save the running results to this file')
+    evaluate_parser.add_argument('--checkpoint-every', type=int, default=10,
+                                 help='# of batches between checkpoints (default: 10)')
+    evaluate_parser.add_argument('--resume', help='resume from this checkpoint file if it exists (and keep '
+                                                  'checkpointing to it unless --checkpoint is given)')
+    evaluate_parser.set_defaults(handler=evaluate_command)
+
+    merge_parser = subparsers.add_parser('merge', help='merge result snapshot files')
+    merge_parser.add_argument('snapshots', nargs='+', help='snapshot files to merge')
+    merge_parser.add_argument('-o', '--output-path', help='write the merged snapshot to this path')
+    merge_parser.set_defaults(handler=merge_command)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
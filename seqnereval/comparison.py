@@ -0,0 +1,186 @@
+from __future__ import annotations
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .models import ResultAggregator, Span
+
+# (start_idx, end_idx, span_type)
+SpanKey = Tuple[int, int, str]
+
+NO_SPAN = -1
+TYPE_MATCH_BOUNDS_MATCH = ResultAggregator.SCENARIOS.index('type_match_bounds_match')
+UNECESSARY_PREDICTED_SPAN = ResultAggregator.SCENARIOS.index('unecessary_predicted_span')
+MISSED_GOLD_SPAN = ResultAggregator.SCENARIOS.index('missed_gold_span')
+TYPE_MISMATCH_BOUNDS_MATCH = ResultAggregator.SCENARIOS.index('type_mismatch_bounds_match')
+TYPE_MATCH_BOUNDS_PARTIAL = ResultAggregator.SCENARIOS.index('type_match_bounds_partial')
+TYPE_MISMATCH_BOUNDS_PARTIAL = ResultAggregator.SCENARIOS.index('type_mismatch_bounds_partial')
+
+
+class SystemComparison:
+    """Spans whose outcome changed between two systems A and B evaluated against the same gold spans.
+
+    A gold span is fixed if B predicts it exactly (type and bounds) and A doesn't, broken in the opposite
+    case and an unchanged error if neither does. A predicted span overlapping no gold span is fixed if only
+    A predicts it, broken if only B predicts it and an unchanged error if both do. The spans of every outcome
+    are kept in parallel arrays along with their scenario (index into `ResultAggregator.SCENARIOS`, -1 if the
+    system has no such span) under A and B.
+    """
+    OUTCOMES = ('fixed', 'broken', 'unchanged_error')
+
+    def __init__(self) -> None:
+        """
+        Constructor for SystemComparison
+        """
+        self.doc_idxs: Dict[str, array] = {outcome: array('q') for outcome in SystemComparison.OUTCOMES}
+        self.start_idxs: Dict[str, array] = {outcome: array('q') for outcome in SystemComparison.OUTCOMES}
+        self.end_idxs: Dict[str, array] = {outcome: array('q') for outcome in SystemComparison.OUTCOMES}
+        self.span_types: Dict[str, List[str]] = {outcome: [] for outcome in SystemComparison.OUTCOMES}
+        self.scenarios_a: Dict[str, array] = {outcome: array('b') for outcome in SystemComparison.OUTCOMES}
+        self.scenarios_b: Dict[str, array] = {outcome: array('b') for outcome in SystemComparison.OUTCOMES}
+        self.unchanged_correct_count = 0
+
+    def add(self, outcome: str, doc_idx: int, span_key: SpanKey, scenario_a: int, scenario_b: int) -> None:
+        self.doc_idxs[outcome].append(doc_idx)
+        self.start_idxs[outcome].append(span_key[0])
+        self.end_idxs[outcome].append(span_key[1])
+        self.span_types[outcome].append(span_key[2])
+        self.scenarios_a[outcome].append(scenario_a)
+        self.scenarios_b[outcome].append(scenario_b)
+
+    def get_spans(self, outcome: str) -> List[Tuple[int, int, int, str, Optional[str], Optional[str]]]:
+        """Spans of an outcome.
+
+        Returns:
+            List[Tuple[int, int, int, str, Optional[str], Optional[str]]]: (document index, start index, end index,
+                type, scenario under A, scenario under B) of every span, scenarios are None if the system has no
+                such span.
+        """
+        def scenario_name(scenario: int) -> Optional[str]:
+            return ResultAggregator.SCENARIOS[scenario] if scenario != NO_SPAN else None
+
+        return [(doc_idx, start_idx, end_idx, span_type, scenario_name(scenario_a), scenario_name(scenario_b))
+                for doc_idx, start_idx, end_idx, span_type, scenario_a, scenario_b in zip(
+                    self.doc_idxs[outcome], self.start_idxs[outcome], self.end_idxs[outcome],
+                    self.span_types[outcome], self.scenarios_a[outcome], self.scenarios_b[outcome])]
+
+    def get_counts(self, outcome: str) -> Dict[str, Dict[str, int]]:
+        """# of spans of an outcome per type and per scenario of the error, i.e. the scenario under A for
+        fixed spans and under B otherwise.
+
+        Returns:
+            Dict[str, Dict[str, int]]: counts keyed by the span type, then by the scenario.
+        """
+        error_scenarios = self.scenarios_a[outcome] if outcome == 'fixed' else self.scenarios_b[outcome]
+        counts = defaultdict(lambda: defaultdict(int))
+        for span_type, scenario in zip(self.span_types[outcome], error_scenarios):
+            counts[span_type][ResultAggregator.SCENARIOS[scenario]] += 1
+        return {span_type: dict(counts_for_type) for span_type, counts_for_type in counts.items()}
+
+    def summarize(self) -> Dict[str, int]:
+        """# of spans of every outcome, along with the # of gold spans both systems predict exactly.
+        """
+        return {
+            **{outcome: len(self.doc_idxs[outcome]) for outcome in SystemComparison.OUTCOMES},
+            "unchanged_correct": self.unchanged_correct_count,
+        }
+
+
+# best outcome of a gold span over the predicted spans overlapping it.
+_SCENARIO_PRIORITY = {
+    TYPE_MATCH_BOUNDS_MATCH: 0,
+    TYPE_MISMATCH_BOUNDS_MATCH: 1,
+    TYPE_MATCH_BOUNDS_PARTIAL: 2,
+    TYPE_MISMATCH_BOUNDS_PARTIAL: 3,
+    MISSED_GOLD_SPAN: 4,
+}
+
+
+def _sorted_span_keys(spans: Sequence[Span]) -> List[SpanKey]:
+    return sorted((span.start_idx, span.end_idx, span.span_type) for span in spans)
+
+
+def _classify_doc(gold_keys: List[SpanKey], pred_keys: List[SpanKey]) -> Tuple[List[int], List[SpanKey]]:
+    """Scenario of every gold span under a system and the system's predicted spans overlapping no gold span,
+    in a single sweep over the sorted spans.
+    """
+    gold_scenarios = []
+    overlaps_gold = bytearray(len(pred_keys))
+    # predicted spans starting before the current gold span ends and not ending before it starts.
+    active_pred_idxs = []
+    next_pred_idx = 0
+    for gold_start, gold_end, gold_type in gold_keys:
+        while next_pred_idx < len(pred_keys) and pred_keys[next_pred_idx][0] <= gold_end:
+            active_pred_idxs.append(next_pred_idx)
+            next_pred_idx += 1
+        # gold spans are sorted by start, spans ending before this one starts can't overlap the later ones.
+        active_pred_idxs = [pred_idx for pred_idx in active_pred_idxs if pred_keys[pred_idx][1] >= gold_start]
+
+        scenario = MISSED_GOLD_SPAN
+        for pred_idx in active_pred_idxs:
+            pred_start, pred_end, pred_type = pred_keys[pred_idx]
+            if pred_start > gold_end:
+                continue
+            overlaps_gold[pred_idx] = 1
+            if pred_start == gold_start and pred_end == gold_end:
+                pair_scenario = TYPE_MATCH_BOUNDS_MATCH if pred_type == gold_type else TYPE_MISMATCH_BOUNDS_MATCH
+            else:
+                pair_scenario = TYPE_MATCH_BOUNDS_PARTIAL if pred_type == gold_type else TYPE_MISMATCH_BOUNDS_PARTIAL
+            scenario = min(scenario, pair_scenario, key=_SCENARIO_PRIORITY.__getitem__)
+        gold_scenarios.append(scenario)
+
+    spurious_keys = [pred_key for pred_idx, pred_key in enumerate(pred_keys) if not overlaps_gold[pred_idx]]
+    return gold_scenarios, spurious_keys
+
+
+def compare(gold_entity_span_lists: List[List[Span]], pred_a_entity_span_lists: List[List[Span]],
+            pred_b_entity_span_lists: List[List[Span]]) -> SystemComparison:
+    """Finds the spans system B fixed or broke compared with system A, with a linear merge of the sorted
+    gold, A and B spans of every document rather than joining the examples of two evaluations.
+
+    Args:
+        gold_entity_span_lists (List[List[Span]]): List of gold entity spans lists for different documents.
+        pred_a_entity_span_lists (List[List[Span]]): List of entity span lists predicted by system A.
+        pred_b_entity_span_lists (List[List[Span]]): List of entity span lists predicted by system B.
+
+    Returns:
+        SystemComparison: fixed, broken and unchanged error spans.
+    """
+    if not len(gold_entity_span_lists) == len(pred_a_entity_span_lists) == len(pred_b_entity_span_lists):
+        raise Exception(
+            'Exception: Number of gold and predicted span lists of the two systems are not the same.')
+
+    comparison = SystemComparison()
+    for doc_idx, (gold_spans, pred_a_spans, pred_b_spans) in enumerate(
+            zip(gold_entity_span_lists, pred_a_entity_span_lists, pred_b_entity_span_lists)):
+        gold_keys = _sorted_span_keys(gold_spans)
+        gold_scenarios_a, spurious_keys_a = _classify_doc(gold_keys, _sorted_span_keys(pred_a_spans))
+        gold_scenarios_b, spurious_keys_b = _classify_doc(gold_keys, _sorted_span_keys(pred_b_spans))
+
+        for gold_key, scenario_a, scenario_b in zip(gold_keys, gold_scenarios_a, gold_scenarios_b):
+            if scenario_a == TYPE_MATCH_BOUNDS_MATCH and scenario_b == TYPE_MATCH_BOUNDS_MATCH:
+                comparison.unchanged_correct_count += 1
+            elif scenario_b == TYPE_MATCH_BOUNDS_MATCH:
+                comparison.add('fixed', doc_idx, gold_key, scenario_a, scenario_b)
+            elif scenario_a == TYPE_MATCH_BOUNDS_MATCH:
+                comparison.add('broken', doc_idx, gold_key, scenario_a, scenario_b)
+            else:
+                comparison.add('unchanged_error', doc_idx, gold_key, scenario_a, scenario_b)
+
+        # an unnecessary span is unnecessary in both systems, merge the two sorted lists.
+        a_idx, b_idx = 0, 0
+        while a_idx < len(spurious_keys_a) or b_idx < len(spurious_keys_b):
+            key_a = spurious_keys_a[a_idx] if a_idx < len(spurious_keys_a) else None
+            key_b = spurious_keys_b[b_idx] if b_idx < len(spurious_keys_b) else None
+            if key_b is None or (key_a is not None and key_a < key_b):
+                comparison.add('fixed', doc_idx, key_a, UNECESSARY_PREDICTED_SPAN, NO_SPAN)
+                a_idx += 1
+            elif key_a is None or key_b < key_a:
+                comparison.add('broken', doc_idx, key_b, NO_SPAN, UNECESSARY_PREDICTED_SPAN)
+                b_idx += 1
+            else:
+                comparison.add('unchanged_error', doc_idx, key_a, UNECESSARY_PREDICTED_SPAN, UNECESSARY_PREDICTED_SPAN)
+                a_idx += 1
+                b_idx += 1
+
+    return comparison
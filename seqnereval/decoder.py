@@ -0,0 +1,304 @@
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+# (type, start_idx, end_idx) of a decoded entity
+DecodedSpan = Tuple[str, int, int]
+
+# kinds of tag prefixes
+OUTSIDE, BEGIN, INSIDE, END, SINGLE = range(5)
+
+# actions of the transition table, combined as bit flags
+EMIT = 1      # the open entity ends at the previous token
+DROP = 2      # the open entity is discarded
+START = 4     # an entity starts at this token
+CLOSE = 8     # the open entity ends at this token
+INVALID = 16  # the transition is not valid in the scheme
+MALFORMED = 32  # the entity started at this token is malformed, it is dropped instead of emitted when it ends
+
+# relation of a tag to the open entity
+NO_OPEN_ENTITY, SAME_TYPE, OTHER_TYPE = range(3)
+
+TAG_SCHEME_PREFIXES = {
+    'BIO': {'B': BEGIN, 'I': INSIDE},
+    'IOB1': {'B': BEGIN, 'I': INSIDE},
+    'BIOES': {'B': BEGIN, 'I': INSIDE, 'E': END, 'S': SINGLE},
+    'BILOU': {'B': BEGIN, 'I': INSIDE, 'L': END, 'U': SINGLE},
+}
+
+TAG_SCHEME_MODES = ('lenient', 'strict')
+
+
+class TagScheme:
+    """State machine decoding the entities of a tag sequence, compiled into an integer transition table
+    indexed by (kind of the tag prefix, relation of the tag to the open entity).
+
+    In 'lenient' mode malformed sequences are repaired (e.g. an "I" tag without a "B" starts an entity), in
+    'strict' mode the tokens of malformed entities are dropped. Invalid transitions are counted in both modes.
+    Tags are interned into ids so that whole tag id arrays can be decoded without any string handling, the
+    interned tags belong to the instance (refer `copy`) while the transition table is never modified.
+    """
+
+    def __init__(self, prefix_kinds: Mapping[str, int], mode: str = 'lenient', requires_end: bool = False,
+                 inside_begins: bool = False):
+        """
+        Constructor for TagScheme
+
+        Args:
+            prefix_kinds (Mapping[str, int]): kind (BEGIN, INSIDE, END or SINGLE) of every tag prefix, "O" is OUTSIDE.
+            mode (str, optional): 'lenient' or 'strict'. Defaults to 'lenient'.
+            requires_end (bool, optional): multi token entities have to be closed by an END tag (BIOES/BILOU).
+                Defaults to False.
+            inside_begins (bool, optional): an INSIDE tag begins an entity and a BEGIN tag is only expected right
+                after an entity of the same type (IOB1). Defaults to False.
+        """
+        if mode not in TAG_SCHEME_MODES:
+            raise Exception(f'Unknown tag scheme mode: {mode}, expected one of {TAG_SCHEME_MODES}')
+
+        self.prefix_kinds = dict(prefix_kinds)
+        self.mode = mode
+        self.requires_end = requires_end
+        self.inside_begins = inside_begins
+        self.transition_table = self.__compile_transition_table()
+
+        # interned tags: tag -> id, and kind/type id of every tag id
+        self.tag_ids: Dict[str, int] = {}
+        self.tag_kinds: List[int] = []
+        self.tag_type_ids: List[int] = []
+        # interned entity types
+        self.types: List[str] = []
+        self.type_ids: Dict[str, int] = {}
+
+    @classmethod
+    def from_name(cls, name: str, mode: str = 'lenient') -> 'TagScheme':
+        """Creates one of the standard schemes, refer TAG_SCHEME_PREFIXES.
+        """
+        if name not in TAG_SCHEME_PREFIXES:
+            raise Exception(f'Unknown tag scheme: {name}, expected one of {list(TAG_SCHEME_PREFIXES)}')
+        return cls(TAG_SCHEME_PREFIXES[name], mode,
+                   requires_end=name in ('BIOES', 'BILOU'), inside_begins=name == 'IOB1')
+
+    def copy(self) -> 'TagScheme':
+        """Returns a tag scheme sharing the transition table of self with its own (empty) interned tags.
+        """
+        tag_scheme = TagScheme.__new__(TagScheme)
+        tag_scheme.prefix_kinds = self.prefix_kinds
+        tag_scheme.mode = self.mode
+        tag_scheme.requires_end = self.requires_end
+        tag_scheme.inside_begins = self.inside_begins
+        tag_scheme.transition_table = self.transition_table
+        tag_scheme.tag_ids, tag_scheme.tag_kinds, tag_scheme.tag_type_ids = {}, [], []
+        tag_scheme.types, tag_scheme.type_ids = [], {}
+        return tag_scheme
+
+    def __compile_transition_table(self) -> List[int]:
+        strict = self.mode == 'strict'
+        # what happens to the open entity if it is interrupted
+        interrupt = (DROP | INVALID if strict else EMIT | INVALID) if self.requires_end else EMIT
+
+        begin_row = [START, interrupt | START, interrupt | START]
+        if self.inside_begins:
+            # a BEGIN tag is only valid right after an entity of the same type, otherwise it is an INSIDE tag
+            # in lenient mode and the whole entity it starts is dropped in strict mode (like the INSIDE tags
+            # of a BIO entity without BEGIN tag).
+            malformed = MALFORMED if strict else 0
+            begin_row = [START | INVALID | malformed, EMIT | START, EMIT | START | INVALID | malformed]
+
+        if self.inside_begins:
+            inside_row = [START, 0, EMIT | START]
+        elif strict:
+            inside_row = [INVALID, 0, interrupt | INVALID]
+        else:
+            inside_row = [START | INVALID, 0, interrupt | START | INVALID]
+
+        if strict:
+            end_row = [INVALID, CLOSE, interrupt | INVALID]
+        else:
+            end_row = [START | CLOSE | INVALID, CLOSE, interrupt | START | CLOSE | INVALID]
+
+        rows = {
+            OUTSIDE: [0, interrupt, interrupt],
+            BEGIN: begin_row,
+            INSIDE: inside_row,
+            END: end_row,
+            SINGLE: [START | CLOSE, interrupt | START | CLOSE, interrupt | START | CLOSE],
+        }
+        return [action for kind in range(5) for action in rows[kind]]
+
+    def intern_tag(self, tag: str) -> int:
+        """Returns the id of a tag, assigning it the next free id if it wasn't seen before.
+        """
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is not None:
+            return tag_id
+
+        if tag == 'O':
+            kind, type_id = OUTSIDE, -1
+        else:
+            kind = self.prefix_kinds.get(tag[:1])
+            if kind is None:
+                raise Exception(f'Unknown Token Tag: {tag}')
+            span_type = tag[2:]
+            type_id = self.type_ids.get(span_type)
+            if type_id is None:
+                type_id = self.type_ids[span_type] = len(self.types)
+                self.types.append(span_type)
+
+        tag_id = self.tag_ids[tag] = len(self.tag_kinds)
+        self.tag_kinds.append(kind)
+        self.tag_type_ids.append(type_id)
+        return tag_id
+
+    def encode(self, tag_list: Sequence[str]) -> List[int]:
+        """Converts a tag list into a tag id list.
+        """
+        tag_ids = self.tag_ids
+        return [tag_ids[tag] if tag in tag_ids else self.intern_tag(tag) for tag in tag_list]
+
+    def decode_ids(self, tag_ids: Sequence[int]) -> Tuple[List[DecodedSpan], int]:
+        """Decodes the entities of a tag id array.
+
+        Args:
+            tag_ids (Sequence[int]): ids of the tags of a document, refer `encode`.
+
+        Returns:
+            Tuple[List[DecodedSpan], int]: (decoded entities, # of invalid transitions)
+        """
+        tag_kinds, tag_type_ids, transition_table, types = \
+            self.tag_kinds, self.tag_type_ids, self.transition_table, self.types
+
+        spans = []
+        invalid_transitions = 0
+        open_type_id, open_start, open_malformed = -1, 0, False
+        for offset, tag_id in enumerate(tag_ids):
+            type_id = tag_type_ids[tag_id]
+            if open_type_id < 0:
+                action = transition_table[3 * tag_kinds[tag_id]]
+            elif open_type_id == type_id:
+                action = transition_table[3 * tag_kinds[tag_id] + SAME_TYPE]
+            else:
+                action = transition_table[3 * tag_kinds[tag_id] + OTHER_TYPE]
+            if not action:
+                continue
+
+            if action & EMIT:
+                if not open_malformed:
+                    spans.append((types[open_type_id], open_start, offset - 1))
+                open_type_id = -1
+            elif action & DROP:
+                open_type_id = -1
+            if action & START:
+                open_type_id, open_start, open_malformed = type_id, offset, bool(action & MALFORMED)
+            if action & CLOSE:
+                if not open_malformed:
+                    spans.append((types[open_type_id], open_start, offset))
+                open_type_id = -1
+            if action & INVALID:
+                invalid_transitions += 1
+
+        if open_type_id >= 0:
+            # the end of the sequence interrupts the open entity like an "O" tag would.
+            action = transition_table[3 * OUTSIDE + SAME_TYPE]
+            if action & EMIT and not open_malformed:
+                spans.append((types[open_type_id], open_start, len(tag_ids) - 1))
+            if action & INVALID:
+                invalid_transitions += 1
+
+        return spans, invalid_transitions
+
+    def decode(self, tag_list: Sequence[str]) -> Tuple[List[DecodedSpan], int]:
+        """Decodes the entities of a tag list, refer `decode_ids`.
+        """
+        return self.decode_ids(self.encode(tag_list))
+
+    def decoder(self) -> 'TagSchemeDecoder':
+        """Returns a decoder consuming the tags of a document one at a time.
+        """
+        return TagSchemeDecoder(self)
+
+
+class TagSchemeDecoder:
+    """Decodes the tags of a document one at a time, used to decode the same tags under several
+    schemes in a single pass.
+    """
+
+    def __init__(self, tag_scheme: TagScheme) -> None:
+        self.tag_scheme = tag_scheme
+        self.spans: List[DecodedSpan] = []
+        self.invalid_transitions = 0
+        self.open_type_id = -1
+        self.open_start = 0
+        self.open_malformed = False
+
+    def step(self, offset: int, token_tag: str) -> None:
+        tag_scheme = self.tag_scheme
+        tag_id = tag_scheme.tag_ids.get(token_tag)
+        if tag_id is None:
+            tag_id = tag_scheme.intern_tag(token_tag)
+
+        type_id = tag_scheme.tag_type_ids[tag_id]
+        if self.open_type_id < 0:
+            relation = NO_OPEN_ENTITY
+        else:
+            relation = SAME_TYPE if self.open_type_id == type_id else OTHER_TYPE
+        self.__apply(tag_scheme.transition_table[3 * tag_scheme.tag_kinds[tag_id] + relation], offset, type_id)
+
+    def __apply(self, action: int, offset: int, type_id: int) -> None:
+        if action & EMIT:
+            if not self.open_malformed:
+                self.spans.append((self.tag_scheme.types[self.open_type_id], self.open_start, offset - 1))
+            self.open_type_id = -1
+        elif action & DROP:
+            self.open_type_id = -1
+        if action & START:
+            self.open_type_id, self.open_start, self.open_malformed = type_id, offset, bool(action & MALFORMED)
+        if action & CLOSE:
+            if not self.open_malformed:
+                self.spans.append((self.tag_scheme.types[self.open_type_id], self.open_start, offset))
+            self.open_type_id = -1
+        if action & INVALID:
+            self.invalid_transitions += 1
+
+    def finish(self, length: int) -> List[DecodedSpan]:
+        if self.open_type_id >= 0:
+            self.__apply(self.tag_scheme.transition_table[3 * OUTSIDE + SAME_TYPE] & (EMIT | DROP | INVALID),
+                         length, -1)
+        return self.spans
+
+
+# the registered tag schemes are never used to decode directly, `get_decoder` hands out copies
+# interning the tags on their own, so that concurrent evaluations don't share (and grow) intern tables.
+DECODERS: Dict[str, TagScheme] = {
+    # the decoding NERTagListEvaluator always did: "L" continues and "U" begins an entity.
+    'lenient': TagScheme({'B': BEGIN, 'I': INSIDE, 'L': INSIDE, 'U': BEGIN}, 'lenient'),
+    # valid BIO/IOBES/BILOU entities, "E"/"L" may close an entity but don't have to.
+    'strict': TagScheme({'B': BEGIN, 'I': INSIDE, 'E': END, 'L': END, 'S': SINGLE, 'U': SINGLE}, 'strict'),
+}
+for tag_scheme_name in TAG_SCHEME_PREFIXES:
+    DECODERS[tag_scheme_name] = TagScheme.from_name(tag_scheme_name, 'lenient')
+    DECODERS[f'{tag_scheme_name}-strict'] = TagScheme.from_name(tag_scheme_name, 'strict')
+
+
+def get_decoder(scheme: str) -> TagScheme:
+    """Returns a copy (refer `TagScheme.copy`) of the tag scheme registered under a name in DECODERS.
+    """
+    tag_scheme = DECODERS.get(scheme)
+    if tag_scheme is None:
+        raise Exception(f'Unknown decoding scheme: {scheme}, expected one of {list(DECODERS)}')
+    return tag_scheme.copy()
+
+
+def decode_tag_list(tag_list: Sequence[str], schemes: Sequence[str] = ('lenient',)) -> Dict[str, List[DecodedSpan]]:
+    """Decodes the entities of a tag list under several schemes in a single pass over the tags.
+
+    Args:
+        tag_list (Sequence[str]): tags of a document.
+        schemes (Sequence[str], optional): names of the decoding schemes, refer DECODERS. Defaults to ('lenient',).
+
+    Returns:
+        Dict[str, List[DecodedSpan]]: (type, start_idx, end_idx) of the entities decoded under each scheme.
+    """
+    decoders = [get_decoder(scheme).decoder() for scheme in schemes]
+    for offset, token_tag in enumerate(tag_list):
+        for decoder in decoders:
+            decoder.step(offset, token_tag)
+
+    return {scheme: decoder.finish(len(tag_list)) for scheme, decoder in zip(schemes, decoders)}
@@ -1,320 +1,738 @@
-from .models import ResultAggregator, Span
+from __future__ import annotations
+from .models import ResultAggregator, Span, CharSpan, TokenScoreCard, BucketedCounts, PredictionScores
+from .subword import aggregate_subword_tag_ids
+from .decoder import get_decoder
+from .matching import assign_overlapping_pairs
+from array import array
 from collections import defaultdict
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+import heapq
+import itertools
+import random
+import warnings
+
+if TYPE_CHECKING:
+    from .cache import DocumentResultCache
+
+# scenarios whose rows hold a single span.
+PAIRLESS_SCENARIOS = ('missed_gold_span', 'unecessary_predicted_span')
 
 
 class NEREvaluator:
-    def __init__(self, gold_entity_span_lists: List[List[Span]], pred_entity_span_lists: List[List[Span]]):
+    VALIDATION_POLICIES = ('strict', 'warn', 'skip')
+
+    def __init__(self, gold_entity_span_lists: List[List[Span]], pred_entity_span_lists: List[List[Span]],
+                 validation_policy: str = 'strict', allow_overlapping_spans: bool = True, doc_lengths: List[int] = None,
+                 breakdowns: Optional[Sequence[Union[str, BucketedCounts]]] = None,
+                 examples_per_category: Optional[int] = None, heavy_hitter_capacity: Optional[int] = None,
+                 rng: Optional[random.Random] = None):
         """
         Constructor for NEREvaluator
 
         Args:
             gold_entity_span_lists (List[List[Span]]): List of gold entity spans lists for different documents.
             pred_entity_span_lists (List[List[Span]]): List of predicted entity span list for different documents.
+            validation_policy (str, optional): What to do with invalid input i.e. spans with start_idx > end_idx,
+                negative or out of range indices, overlapping spans (if not allowed) and mismatching # of documents.
+                'strict' raises an exception, 'warn' issues a warning and drops the offending spans/documents,
+                'skip' silently drops them. Defaults to 'strict'.
+            allow_overlapping_spans (bool, optional): Whether spans within the gold or the predicted span list of a
+                document may overlap each other (e.g. nested entities). Defaults to True.
+            doc_lengths (List[int], optional): # of tokens in each document, used to check for out of range indices.
+            breakdowns (Sequence[Union[str, BucketedCounts]], optional): dimensions ('length', 'position') or
+                BucketedCounts with custom buckets the scenario counts are also broken down by while matching,
+                available as `results.breakdowns`. Defaults to None.
+            examples_per_category (int, optional): keep only a uniform random sample of this many examples per
+                scenario/scorecard category (per tag as well) to bound the memory, counts stay exact. Refer
+                ResultAggregator. Defaults to None i.e. every example is kept.
+            heavy_hitter_capacity (int, optional): track the most frequent errors by surface form in
+                `results.heavy_hitters` with this many counters. Refer HeavyHitters. Defaults to None.
+            rng (random.Random, optional): generator the examples are sampled with, e.g. a seeded one for
+                reproducible samples. Defaults to None i.e. the global generator.
         """
-        if len(gold_entity_span_lists) != len(pred_entity_span_lists):
-            raise Exception(f'# of documents for which golden tags were provided {len(gold_entity_span_lists)}'
-                            f'!= # of documents for which golden tags were provided {len(pred_entity_span_lists)}')
+        if validation_policy not in NEREvaluator.VALIDATION_POLICIES:
+            raise Exception(f'Unknown validation policy: {validation_policy}, '
+                            f'expected one of {NEREvaluator.VALIDATION_POLICIES}')
+
+        self.validation_policy = validation_policy
+        self.allow_overlapping_spans = allow_overlapping_spans
+        self.breakdowns = [BucketedCounts(breakdown) if isinstance(breakdown, str) else breakdown
+                           for breakdown in breakdowns or ()]
+        self.examples_per_category = examples_per_category
+        self.heavy_hitter_capacity = heavy_hitter_capacity
+        self.rng = rng
+        self.doc_lengths = doc_lengths
+        self.validation_report = {
+            "document_count_mismatch": 0,
+            "invalid_bounds": 0,
+            "out_of_range": 0,
+            "overlapping_spans": 0,
+        }
 
-        self.gold_entity_span_lists = gold_entity_span_lists
-        self.pred_entity_span_lists = pred_entity_span_lists
-
-        # TODO: check for overlapping spans and throw exceptions
+        if len(gold_entity_span_lists) != len(pred_entity_span_lists):
+            self.__report_validation_issue(
+                "document_count_mismatch",
+                f'# of documents for which golden tags were provided {len(gold_entity_span_lists)}'
+                f'!= # of documents for which predicted tags were provided {len(pred_entity_span_lists)}')
+            doc_count = min(len(gold_entity_span_lists), len(pred_entity_span_lists))
+            gold_entity_span_lists = gold_entity_span_lists[:doc_count]
+            pred_entity_span_lists = pred_entity_span_lists[:doc_count]
+
+        self.gold_entity_span_lists = self.__validate_span_lists(
+            gold_entity_span_lists, 'gold', allow_overlapping_spans, doc_lengths)
+        self.pred_entity_span_lists = self.__validate_span_lists(
+            pred_entity_span_lists, 'predicted', allow_overlapping_spans, doc_lengths)
 
         self.unique_gold_tags = list(
             set([span.span_type
-                 for gold_entity_span_list in gold_entity_span_lists
+                 for gold_entity_span_list in self.gold_entity_span_lists
                  for span in gold_entity_span_list]))
 
         self.results = ResultAggregator()
         self.results_grouped_by_tags = defaultdict(
             lambda: ResultAggregator())
 
-    def evaluate(self) -> Tuple[ResultAggregator, ResultAggregator]:
+    def __report_validation_issue(self, issue: str, message: str) -> None:
+        """Handles an invalid input according to the validation policy.
+
+        Args:
+            issue (str): key of the issue in the validation report.
+            message (str): description of the issue.
+        """
+        self.validation_report[issue] += 1
+        if self.validation_policy == 'strict':
+            raise Exception(f'Exception: {message}')
+        elif self.validation_policy == 'warn':
+            warnings.warn(message)
+
+    def __validate_span_lists(self, entity_span_lists: List[List[Span]], list_name: str,
+                              allow_overlapping_spans: bool, doc_lengths: List[int] = None) -> List[List[Span]]:
+        """Validates the spans of every document in a single sweep over the sorted spans.
+
+        Args:
+            entity_span_lists (List[List[Span]]): List of entity span lists for different documents.
+            list_name (str): name of the span lists used in the messages.
+            allow_overlapping_spans (bool): if 'False' overlapping spans are considered invalid.
+            doc_lengths (List[int], optional): # of tokens in each document.
+
+        Returns:
+            List[List[Span]]: entity span lists (sorted by (start_idx, end_idx)) with the invalid spans dropped.
+        """
+        def entity_span_sort_fn(span): return (span.start_idx, span.end_idx)
+
+        validated_span_lists = []
+        for doc_idx, entity_spans in enumerate(entity_span_lists):
+            # the matcher needs the spans sorted anyway, sorting them here makes the overlap check linear.
+            entity_spans.sort(key=entity_span_sort_fn)
+            doc_length = doc_lengths[doc_idx] if doc_lengths is not None else None
+
+            invalid_span_found = False
+            valid_spans = []
+            max_end_idx = -1
+            for span in entity_spans:
+                if span.start_idx < 0 or span.start_idx > span.end_idx:
+                    issue = "invalid_bounds"
+                elif doc_length is not None and span.end_idx >= doc_length:
+                    issue = "out_of_range"
+                elif not allow_overlapping_spans and span.start_idx <= max_end_idx:
+                    issue = "overlapping_spans"
+                else:
+                    valid_spans.append(span)
+                    max_end_idx = max(max_end_idx, span.end_idx)
+                    continue
+
+                invalid_span_found = True
+                self.__report_validation_issue(
+                    issue, f'Invalid {list_name} span in document #{doc_idx} ({issue}): {span}')
+
+            validated_span_lists.append(valid_spans if invalid_span_found else entity_spans)
+
+        return validated_span_lists
+
+    def evaluate(self) -> Tuple[ResultAggregator, Dict[str, ResultAggregator]]:
         """Runs the evaluation and return results
 
         Returns:
-            Tuple[ResultAggregator, ResultAggregator]: (Results, Results Grouped by tags)
+            Tuple[ResultAggregator, Dict[str, ResultAggregator]]: (Results, Results Grouped by tags)
         """
-        results_by_doc = []
-        results = ResultAggregator()
+        results, results_grouped_by_tags = self.__match_span_lists(
+            self.pred_entity_span_lists, self._calculate_metrics_for_doc)
 
-        for gold_spans, pred_spans in zip(self.gold_entity_span_lists, self.pred_entity_span_lists):
-            results_for_curr_doc = self.__calculate_metrics_for_doc(
-                gold_spans, pred_spans)
-            results_by_doc.append(results_for_curr_doc)
-            results.append_result_aggregator(results_for_curr_doc[0])
+        self.results = results
+        self.results_grouped_by_tags = results_grouped_by_tags
 
-        return results, results_for_curr_doc
+        return results, results_grouped_by_tags
 
-    def __calculate_metrics_for_doc(self, gold_entity_spans: List[Span], pred_entity_spans: List[Span]) -> Tuple[ResultAggregator, ResultAggregator]:
-        """Calculate the metrics for a particular document.
+    def evaluate_predictions(self, pred_entity_span_lists: List[List[Span]]) -> Tuple[ResultAggregator, Dict[str, ResultAggregator]]:
+        """Evaluates another set of predicted spans against the (already validated and sorted) gold spans
+        of the evaluator, e.g. the predictions of another model or another decoding of the same tags.
+        The results of the evaluator (`results`, `results_grouped_by_tags`) are left untouched.
 
         Args:
-            gold_entity_spans (List[Span]): list of gold entity spans
-            pred_entity_spans (List[Span]): list of predicted entity spans
+            pred_entity_span_lists (List[List[Span]]): List of predicted entity span list for different documents.
 
         Returns:
-            Tuple[ResultAggregator, ResultAggregator]: (Results, Results Grouped by tags)
+            Tuple[ResultAggregator, Dict[str, ResultAggregator]]: (Results, Results Grouped by tags)
         """
+        if len(pred_entity_span_lists) != len(self.gold_entity_span_lists):
+            self.__report_validation_issue(
+                "document_count_mismatch",
+                f'# of documents for which golden tags were provided {len(self.gold_entity_span_lists)}'
+                f'!= # of documents for which predicted tags were provided {len(pred_entity_span_lists)}')
+            pred_entity_span_lists = pred_entity_span_lists[:len(self.gold_entity_span_lists)]
+
+        pred_entity_span_lists = self.__validate_span_lists(
+            pred_entity_span_lists, 'predicted', self.allow_overlapping_spans, self.doc_lengths)
+
+        return self.__match_span_lists(pred_entity_span_lists)
+
+    @classmethod
+    def from_padded_arrays(cls, gold_label_ids, pred_label_ids, id_to_label: Union[Sequence[str], Dict[int, str]],
+                           lengths=None, mask=None, ignore_index: int = -100, tag_scheme: str = 'lenient',
+                           **kwargs) -> NEREvaluator:
+        """Creates an evaluator from padded (batch, seq_len) label id arrays, e.g. the labels and the argmax of
+        the logits of a batch of a training loop. NumPy arrays (or anything with `tolist`) and nested lists
+        are accepted, and the label ids are decoded without being converted to tag strings.
+
+        Positions past the length of a row, masked positions and positions whose gold label id is
+        `ignore_index` (padding, special tokens, subword continuations) are dropped, the span indices refer to
+        the remaining positions. Predicted label ids equal to `ignore_index` are read as 'O', any other label id
+        outside of `id_to_label` raises an exception.
+
+        Every call creates a new evaluator for the rows of one batch, to evaluate the batches of a training loop
+        together append the results of every batch to running aggregators (`append_result_aggregator`).
 
-        def entity_span_sort_fn(span): return (span.start_idx, span.end_idx)
+        Args:
+            gold_label_ids: (batch, seq_len) gold label ids.
+            pred_label_ids: (batch, seq_len) predicted label ids.
+            id_to_label (Union[Sequence[str], Dict[int, str]]): tag of every label id, e.g. ['O', 'B-PER', 'I-PER'].
+            lengths (optional): (batch,) # of positions of every row. Defaults to None i.e. seq_len.
+            mask (optional): (batch, seq_len) 1 for the positions to evaluate, 0 for the others. Defaults to None.
+            ignore_index (int, optional): gold label id of the positions to drop. Defaults to -100.
+            tag_scheme (str, optional): decoding scheme of the tags, refer `DECODERS`. Defaults to 'lenient'.
+            **kwargs: other arguments passed to the constructor.
 
-        # sort the entity list so we can make the evaluation faster (O(n)).
-        gold_entity_spans.sort(key=entity_span_sort_fn)
-        pred_entity_spans.sort(key=entity_span_sort_fn)
+        Returns:
+            NEREvaluator: evaluator for the spans of every row.
+        """
+        def to_list(array_like):
+            return array_like.tolist() if hasattr(array_like, 'tolist') else array_like
+
+        gold_rows, pred_rows = to_list(gold_label_ids), to_list(pred_label_ids)
+        lengths, mask = to_list(lengths), to_list(mask)
+        if len(gold_rows) != len(pred_rows):
+            raise Exception('Exception: Number of gold and predicted rows are not the same.')
+
+        if isinstance(id_to_label, dict):
+            if sorted(id_to_label) != list(range(len(id_to_label))):
+                raise Exception('Exception: The label ids of id_to_label must be 0 to # of labels - 1.')
+            id_to_label = [id_to_label[label_id] for label_id in range(len(id_to_label))]
+        decoder = get_decoder(tag_scheme)
+        # tag id of every label id in the decoder, so the rows are decoded without any tag strings.
+        label_tag_ids = [decoder.intern_tag(label) for label in id_to_label]
+        outside_tag_id = decoder.intern_tag('O')
+
+        gold_entity_span_lists, pred_entity_span_lists, doc_lengths = [], [], []
+        for row_idx, (gold_row, pred_row) in enumerate(zip(gold_rows, pred_rows)):
+            if len(gold_row) != len(pred_row):
+                raise Exception(f'Exception: Number of gold and predicted label ids are not the same in row #{row_idx}.')
+            length = lengths[row_idx] if lengths is not None else len(gold_row)
+            mask_row = mask[row_idx] if mask is not None else None
+
+            positions = [position for position in range(length) if gold_row[position] != ignore_index and
+                         (mask_row is None or mask_row[position])]
+            gold_ids = [gold_row[position] for position in positions]
+            pred_ids = [pred_row[position] for position in positions]
+            for ids, row_name in ((gold_ids, 'gold'), (pred_ids, 'predicted')):
+                # negative ids would silently index the labels from the end.
+                invalid_ids = [label_id for label_id in ids
+                               if not 0 <= label_id < len(label_tag_ids) and label_id != ignore_index]
+                if invalid_ids:
+                    raise Exception(f'Exception: Unknown {row_name} label id {invalid_ids[0]} in row #{row_idx}, '
+                                    f'expected 0 to {len(label_tag_ids) - 1} or ignore_index.')
+            gold_spans, _ = decoder.decode_ids([label_tag_ids[label_id] for label_id in gold_ids])
+            pred_spans, _ = decoder.decode_ids([label_tag_ids[label_id] if label_id != ignore_index else outside_tag_id
+                                                for label_id in pred_ids])
+
+            gold_entity_span_lists.append([Span(span_type, start_idx, end_idx)
+                                           for span_type, start_idx, end_idx in gold_spans])
+            pred_entity_span_lists.append([Span(span_type, start_idx, end_idx)
+                                           for span_type, start_idx, end_idx in pred_spans])
+            doc_lengths.append(len(positions))
+
+        return cls(gold_entity_span_lists, pred_entity_span_lists, doc_lengths=doc_lengths, **kwargs)
+
+    def __new_result_aggregator(self) -> ResultAggregator:
+        return ResultAggregator(self.breakdowns, self.examples_per_category, self.heavy_hitter_capacity, self.rng)
+
+    def __match_span_lists(self, pred_entity_span_lists: List[List[Span]],
+                           calculate_metrics_for_doc=None) -> Tuple[ResultAggregator, Dict[str, ResultAggregator]]:
+        """Matches the predicted span lists against the gold span lists document by document.
+        """
+        results = self.__new_result_aggregator()
+        results_grouped_by_tags = defaultdict(self.__new_result_aggregator)
 
-        # to check if the gold span or pred span was overlapping in last step
-        gold_part_overlap_in_last_step, pred_part_overlap_in_last_step = False, False
+        for doc_idx, (gold_spans, pred_spans) in enumerate(zip(self.gold_entity_span_lists, pred_entity_span_lists)):
+            if calculate_metrics_for_doc is not None:
+                results_for_curr_doc, results_grouped_by_tags_for_curr_doc = calculate_metrics_for_doc(
+                    doc_idx, gold_spans, pred_spans)
+            else:
+                results_for_curr_doc, results_grouped_by_tags_for_curr_doc = self.__calculate_metrics_for_doc(
+                    gold_spans, pred_spans)
+            results.append_result_aggregator(results_for_curr_doc)
+            for tag, results_for_tag in results_grouped_by_tags_for_curr_doc.items():
+                results_grouped_by_tags[tag].append_result_aggregator(results_for_tag)
 
-        gold_idx, pred_idx = 0, 0
-        results = ResultAggregator()
-        results_grouped_by_tags = defaultdict(lambda: ResultAggregator())
+        return results, results_grouped_by_tags
 
-        while gold_idx < len(gold_entity_spans) and pred_idx < len(pred_entity_spans):
-            if gold_entity_spans[gold_idx] == pred_entity_spans[pred_idx]:
-                # Scenario I: Both entity type/labels and spans match perfectly
-                results.add_type_match_bounds_match(
-                    gold_entity_spans[gold_idx], pred_entity_spans[pred_idx])
+    def _calculate_metrics_for_doc(self, doc_idx: int, gold_entity_spans: List[Span],
+                                   pred_entity_spans: List[Span]) -> Tuple[ResultAggregator, Dict[str, ResultAggregator]]:
+        """Calculates the metrics of the document at `doc_idx` for `evaluate`, subclasses may override it
+        e.g. to reuse the results of unchanged documents.
+        """
+        return self.__calculate_metrics_for_doc(gold_entity_spans, pred_entity_spans)
 
-                gold_span_type = gold_entity_spans[gold_idx].span_type
-                results_grouped_by_tags[gold_span_type].add_type_match_bounds_match(
-                    gold_entity_spans[gold_idx],
-                    pred_entity_spans[pred_idx]
-                )
+    def __calculate_metrics_for_doc(self, gold_entity_spans: List[Span], pred_entity_spans: List[Span]) -> Tuple[ResultAggregator, ResultAggregator]:
+        """Calculate the metrics for a particular document.
 
-                # it is safe to move cursor over
-                # as overlapping spans are not allowed within the predicted entity spans list
-                # and is also not allowed within gold entity span list
-                gold_idx += 1
-                pred_idx += 1
+        Every gold span is matched with at most one overlapping predicted span and vice versa (refer
+        `assign_overlapping_pairs`), whether or not the spans of a list overlap each other (e.g. nested entities),
+        and every assigned pair is added to the scenario it belongs to. Gold spans left unassigned are missed and
+        predicted spans left unassigned are spurious.
 
-                gold_part_overlap_in_last_step, pred_part_overlap_in_last_step = False, False
+        Args:
+            gold_entity_spans (List[Span]): list of gold entity spans
+            pred_entity_spans (List[Span]): list of predicted entity spans
+
+        Returns:
+            Tuple[ResultAggregator, ResultAggregator]: (Results, Results Grouped by tags)
+        """
+        scenario_counts, scenario_rows = self._match_doc_spans(gold_entity_spans, pred_entity_spans)
+        return self._results_from_matches(gold_entity_spans, pred_entity_spans, scenario_counts, scenario_rows)
 
-            elif gold_entity_spans[gold_idx].bounds_same_tokens_as(pred_entity_spans[pred_idx]):
-                # Scenario IV: Wrong Entity types but, spans match perfectly
-                results.add_type_mismatch_bounds_match(
-                    gold_entity_spans[gold_idx], pred_entity_spans[pred_idx])
+    @staticmethod
+    def _match_doc_spans(gold_entity_spans: List[Span], pred_entity_spans: List[Span]) -> Tuple[array, array]:
+        """Sorts the spans of a document by (start_idx, end_idx) and matches them, refer `__calculate_metrics_for_doc`.
 
-                gold_span_type = gold_entity_spans[gold_idx].span_type
-                results_grouped_by_tags[gold_span_type].add_type_mismatch_bounds_match(
-                    gold_entity_spans[gold_idx],
-                    pred_entity_spans[pred_idx]
-                )
+        Returns:
+            Tuple[array, array]: # of rows of every scenario (in the order of `ResultAggregator.SCENARIOS`) and
+                the (gold index, predicted index) rows of the scenarios one after the other, flattened. Indices
+                refer to the sorted span lists, -1 for the side a missed/spurious span doesn't have.
+        """
+        def entity_span_sort_fn(span): return (span.start_idx, span.end_idx)
 
-                # it is safe to move cursor over
-                # as overlapping spans are not allowed within the predicted entity spans list
-                # and is also not allowed within gold entity span list
-                gold_idx += 1
-                pred_idx += 1
-
-                gold_part_overlap_in_last_step, pred_part_overlap_in_last_step = False, False
-
-            elif gold_entity_spans[gold_idx].overlaps_with(pred_entity_spans[pred_idx]):
-                if gold_entity_spans[gold_idx].span_type == pred_entity_spans[pred_idx].span_type:
-                    # Scenario V: Correct Entity Type, partial span overlap
-                    results.add_type_match_bounds_partial(
-                        gold_entity_spans[gold_idx],
-                        pred_entity_spans[pred_idx]
-                    )
-
-                    gold_span_type = gold_entity_spans[gold_idx].span_type
-                    results_grouped_by_tags[gold_span_type].add_type_match_bounds_partial(
-                        gold_entity_spans[gold_idx],
-                        pred_entity_spans[pred_idx]
-                    )
-                else:
-                    # Scenario VI: Wrong Entity Type, partial span overlap
-                    results.add_type_mismatch_bounds_partial(
-                        gold_entity_spans[gold_idx],
-                        pred_entity_spans[pred_idx]
-                    )
-
-                    gold_span_type = gold_entity_spans[gold_idx].span_type
-                    results_grouped_by_tags[gold_span_type].add_type_mismatch_bounds_partial(
-                        gold_entity_spans[gold_idx],
-                        pred_entity_spans[pred_idx]
-                    )
-
-                if pred_entity_spans[pred_idx].end_idx > gold_entity_spans[gold_idx].end_idx:
-                    pred_part_overlap_in_last_step = True
-                    gold_idx += 1
-                elif pred_entity_spans[pred_idx].end_idx < gold_entity_spans[gold_idx].end_idx:
-                    gold_part_overlap_in_last_step = True
-                    pred_idx += 1
-                else:
-                    gold_idx += 1
-                    pred_idx += 1
-                    gold_part_overlap_in_last_step, pred_part_overlap_in_last_step = False, False
+        gold_entity_spans.sort(key=entity_span_sort_fn)
+        pred_entity_spans.sort(key=entity_span_sort_fn)
 
+        rows_by_scenario = {scenario: [] for scenario in ResultAggregator.SCENARIOS}
+        assigned_pairs, gold_assigned, pred_assigned = assign_overlapping_pairs(
+            [(span.start_idx, span.end_idx) for span in gold_entity_spans],
+            [span.span_type for span in gold_entity_spans],
+            [(span.start_idx, span.end_idx) for span in pred_entity_spans],
+            [span.span_type for span in pred_entity_spans])
+        for pair_gold_idx, pair_pred_idx in assigned_pairs:
+            gold_span, pred_span = gold_entity_spans[pair_gold_idx], pred_entity_spans[pair_pred_idx]
+            if gold_span.bounds_same_tokens_as(pred_span):
+                # Scenario I: Both entity type/labels and spans match perfectly
+                # Scenario IV: Wrong Entity Type, Correct Span
+                scenario = 'type_match_bounds_match' if gold_span.span_type == pred_span.span_type else \
+                    'type_mismatch_bounds_match'
             else:
-                if pred_entity_spans[pred_idx].start_idx > gold_entity_spans[gold_idx].end_idx:
-                    if not gold_part_overlap_in_last_step:
-                        # Scenario III system missed an entity
-                        results.add_missed_gold_span(
-                            gold_entity_spans[gold_idx])
-
-                        gold_span_type = gold_entity_spans[gold_idx].span_type
-                        results_grouped_by_tags[gold_span_type].add_missed_gold_span(
-                            gold_entity_spans[gold_idx]
-                        )
-
-                    gold_idx += 1
-                    gold_part_overlap_in_last_step = False
-                elif pred_entity_spans[pred_idx].end_idx < gold_entity_spans[gold_idx].start_idx:
-                    if not pred_part_overlap_in_last_step:
-                        # Scenario II system hypothesised an extra entity
-                        results.add_unecessary_predicted_span(
-                            pred_entity_spans[pred_idx])
-
-                        pred_span_type = pred_entity_spans[pred_idx].span_type
-                        results_grouped_by_tags[pred_span_type].add_unecessary_predicted_span(
-                            pred_entity_spans[pred_idx]
-                        )
-
-                    pred_idx += 1
-                    pred_part_overlap_in_last_step = True
-
-        if gold_part_overlap_in_last_step:
-            gold_idx += 1
-
-        while gold_idx < len(gold_entity_spans):
-            # Scenario III: missed entity
-            results.add_missed_gold_span(
-                gold_entity_spans[gold_idx])
-
-            gold_span_type = gold_entity_spans[gold_idx].span_type
-            results_grouped_by_tags[gold_span_type].add_missed_gold_span(
-                gold_entity_spans[gold_idx]
-            )
-
-            gold_idx += 1
-
-        if pred_part_overlap_in_last_step:
-            pred_idx += 1
-        while pred_idx < len(pred_entity_spans):
-            # Scenario II: hypothesised entity incorrect
-            results.add_unecessary_predicted_span(
-                pred_entity_spans[pred_idx])
-
-            pred_span_type = pred_entity_spans[pred_idx].span_type
-            results_grouped_by_tags[pred_span_type].add_unecessary_predicted_span(
-                pred_entity_spans[pred_idx]
-            )
-
-            pred_idx += 1
+                # Scenario V: Correct Entity Type, partial span overlap
+                # Scenario VI: Wrong Entity Type, partial span overlap
+                scenario = 'type_match_bounds_partial' if gold_span.span_type == pred_span.span_type else \
+                    'type_mismatch_bounds_partial'
+            rows_by_scenario[scenario].extend((pair_gold_idx, pair_pred_idx))
+
+        for gold_idx, assigned in enumerate(gold_assigned):
+            if not assigned:
+                # Scenario III: missed entity
+                rows_by_scenario['missed_gold_span'].extend((gold_idx, -1))
+
+        for pred_idx, assigned in enumerate(pred_assigned):
+            if not assigned:
+                # Scenario II: hypothesised entity incorrect
+                rows_by_scenario['unecessary_predicted_span'].extend((-1, pred_idx))
+
+        scenario_counts = array('q', (len(rows) // 2 for rows in rows_by_scenario.values()))
+        scenario_rows = array('q', itertools.chain.from_iterable(rows_by_scenario.values()))
+        return scenario_counts, scenario_rows
+
+    def _results_from_matches(self, gold_entity_spans: List[Span], pred_entity_spans: List[Span],
+                              scenario_counts: Sequence[int],
+                              scenario_rows: Sequence[int]) -> Tuple[ResultAggregator, Dict[str, ResultAggregator]]:
+        """Adds the matched spans of a document (refer `_match_doc_spans`) to new result aggregators.
+
+        Returns:
+            Tuple[ResultAggregator, Dict[str, ResultAggregator]]: (Results, Results Grouped by tags)
+        """
+        results = self.__new_result_aggregator()
+        results_grouped_by_tags = defaultdict(self.__new_result_aggregator)
+
+        rows_by_scenario, row_idx = {}, 0
+        for scenario, count in zip(ResultAggregator.SCENARIOS, scenario_counts):
+            rows_by_scenario[scenario] = [(scenario_rows[row_idx + 2 * row], scenario_rows[row_idx + 2 * row + 1],
+                                           scenario) for row in range(count)]
+            row_idx += 2 * count
+
+        # the rows of every pair scenario are sorted, merging them adds the pairs in the order they were matched.
+        for gold_idx, pred_idx, scenario in heapq.merge(*(rows_by_scenario[scenario]
+                                                          for scenario in ResultAggregator.SCENARIOS
+                                                          if scenario not in PAIRLESS_SCENARIOS)):
+            gold_span, pred_span = gold_entity_spans[gold_idx], pred_entity_spans[pred_idx]
+            add_scenario = 'add_' + scenario
+            getattr(results, add_scenario)(gold_span, pred_span)
+            getattr(results_grouped_by_tags[gold_span.span_type], add_scenario)(gold_span, pred_span)
+
+        for gold_idx, _, _ in rows_by_scenario['missed_gold_span']:
+            gold_span = gold_entity_spans[gold_idx]
+            results.add_missed_gold_span(gold_span)
+            results_grouped_by_tags[gold_span.span_type].add_missed_gold_span(gold_span)
+
+        for _, pred_idx, _ in rows_by_scenario['unecessary_predicted_span']:
+            pred_span = pred_entity_spans[pred_idx]
+            results.add_unecessary_predicted_span(pred_span)
+            results_grouped_by_tags[pred_span.span_type].add_unecessary_predicted_span(pred_span)
+
+        if any(pred_span.score is not None for pred_span in pred_entity_spans):
+            # dropping a scored predicted span lets the spans overlapping it be matched with other ones, so the
+            # spans are recorded to be matched again at every threshold.
+            for tag, tag_results in [(None, results), *results_grouped_by_tags.items()]:
+                tag_results.prediction_scores = PredictionScores()
+                tag_results.prediction_scores.add_spans(gold_entity_spans, pred_entity_spans, tag)
 
         return results, results_grouped_by_tags
 
 
 class NERTagListEvaluator(NEREvaluator):
-    def __init__(self, tokens: List[List[str]], gold_tag_lists: List[List[str]], pred_tag_lists: List[List[str]], entity_context_padding=0):
+    def __init__(self, tokens: List[List[str]], gold_tag_lists: List[List[str]], pred_tag_lists: List[List[str]], entity_context_padding=0,
+                 compute_token_metrics=False, validation_policy='strict', schemes: Optional[Sequence[str]] = None,
+                 tag_scheme: Optional[str] = None, breakdowns: Optional[Sequence[Union[str, BucketedCounts]]] = None,
+                 examples_per_category: Optional[int] = None, heavy_hitter_capacity: Optional[int] = None,
+                 result_cache: Optional[DocumentResultCache] = None, rng: Optional[random.Random] = None):
         """Constructor for tag list based evaluator
 
         Args:
             tokens (List[List[str]]): List of token lists for different documents.
             gold_tag_lists (List[List[str]]): List of golden tag lists for different documents.
             pred_tag_lists (List[List[str]]): List of predicted tag lists for different documents.
+            entity_context_padding (int, optional): # of tokens around a span kept as its context. Defaults to 0.
+            compute_token_metrics (bool, optional): Score tags token by token while the predicted tags are
+                decoded, results are stored in `token_results`. Defaults to False.
+            validation_policy (str, optional): Refer NEREvaluator. Defaults to 'strict'.
+            schemes (Sequence[str], optional): Decoding schemes (refer `DECODERS`, e.g. ['lenient', 'strict'])
+                the predicted tags are decoded with in a single pass, the first one is the one `evaluate`
+                uses and `evaluate_schemes` evaluates all of them. Defaults to None i.e. [tag_scheme] if provided,
+                else only the lenient decoding.
+            tag_scheme (str, optional): Decoding scheme of the gold (and by default the predicted) tags, e.g.
+                'BIOES' or 'BILOU-strict', refer `DECODERS`. The # of invalid transitions in the gold and predicted
+                tags is added to `validation_report`. Defaults to None i.e. the lenient decoding.
+            breakdowns (Sequence[Union[str, BucketedCounts]], optional): Refer NEREvaluator. Defaults to None.
+            examples_per_category (int, optional): Refer NEREvaluator. Defaults to None.
+            heavy_hitter_capacity (int, optional): Refer NEREvaluator. Defaults to None.
+            result_cache (DocumentResultCache, optional): Cache of the decoded spans and matches of single
+                documents, documents whose tokens, tags and evaluator settings are cached are neither decoded nor
+                matched again. Can't be used with several decoding schemes. Defaults to None.
+            rng (random.Random, optional): Refer NEREvaluator. Defaults to None.
         """
         # TODO: Check for nesting and convert nested items to list
         self.tokens = list(tokens)
         self.gold_tag_lists = list(gold_tag_lists)
         self.pred_tag_lists = list(pred_tag_lists)
         self.entity_context_padding = entity_context_padding
+        self.token_results = TokenScoreCard() if compute_token_metrics else None
+
+        if schemes is None and tag_scheme is not None:
+            schemes = [tag_scheme]
+
+        self.result_cache = result_cache
+        self.__cached_docs = None
+        gold_invalid_transitions = None
+        if result_cache is not None:
+            if schemes is not None and list(schemes) != [tag_scheme]:
+                raise Exception('Exception: A result cache can\'t be used with several decoding schemes.')
+            config = (entity_context_padding, tag_scheme, validation_policy, examples_per_category,
+                      heavy_hitter_capacity, *(breakdown if isinstance(breakdown, str) else
+                                               (breakdown.dimension, *breakdown.boundaries)
+                                               for breakdown in (breakdowns or ())))
+            gold_entity_spans, pred_entity_spans, gold_invalid_transitions, pred_invalid_transitions = \
+                self.__tagged_lists_to_spans_with_cache(tag_scheme, config, compute_token_metrics)
+            self.pred_entity_span_lists_by_scheme = None
+            self.invalid_transition_counts_by_scheme = None
+            if tag_scheme is not None:
+                self.pred_entity_span_lists_by_scheme = {tag_scheme: pred_entity_spans}
+                self.invalid_transition_counts_by_scheme = {tag_scheme: pred_invalid_transitions}
+                gold_invalid_transitions = {tag_scheme: gold_invalid_transitions}
+        else:
+            decoding_scheme = tag_scheme if tag_scheme is not None else 'lenient'
+            gold_entity_spans_by_scheme, gold_invalid_transitions = self.__tagged_list_to_spans_by_scheme(
+                self.gold_tag_lists, self.tokens, [decoding_scheme])
+            gold_entity_spans = gold_entity_spans_by_scheme[decoding_scheme]
+
+            pred_schemes = schemes if schemes is not None else ['lenient']
+            pred_entity_spans_by_scheme, pred_invalid_transitions = self.__tagged_list_to_spans_by_scheme(
+                self.pred_tag_lists, self.tokens, pred_schemes, self.gold_tag_lists if compute_token_metrics else None)
+            pred_entity_spans = pred_entity_spans_by_scheme[pred_schemes[0]]
+            # the spans and invalid transitions by scheme are only kept when decoding schemes were provided.
+            self.pred_entity_span_lists_by_scheme = pred_entity_spans_by_scheme if schemes is not None else None
+            self.invalid_transition_counts_by_scheme = pred_invalid_transitions if schemes is not None else None
+
+        super().__init__(gold_entity_spans, pred_entity_spans, validation_policy,
+                         doc_lengths=[len(token_list) for token_list in self.tokens], breakdowns=breakdowns,
+                         examples_per_category=examples_per_category,
+                         heavy_hitter_capacity=heavy_hitter_capacity, rng=rng)
+
+        if schemes is not None:
+            # the spans of the first scheme were validated by the constructor of NEREvaluator.
+            self.pred_entity_span_lists_by_scheme[schemes[0]] = self.pred_entity_span_lists
+        if tag_scheme is not None:
+            self.validation_report["gold_invalid_transitions"] = gold_invalid_transitions[tag_scheme]
+            self.validation_report["predicted_invalid_transitions"] = self.invalid_transition_counts_by_scheme[schemes[0]]
+
+    def __tagged_lists_to_spans_with_cache(self, tag_scheme: Optional[str], config: Tuple, compute_token_metrics: bool
+                                           ) -> Tuple[List[List[Span]], List[List[Span]], int, int]:
+        """Decodes the gold and predicted tags of the documents missing from the result cache, the spans of
+        the other documents are taken from the cache.
 
-        gold_entity_spans = self.__tagged_list_to_span(
-            self.gold_tag_lists, self.tokens)
-        pred_entity_spans = self.__tagged_list_to_span(
-            self.pred_tag_lists, self.tokens)
+        Returns:
+            Tuple[List[List[Span]], List[List[Span]], int, int]: gold and predicted span lists and the # of invalid
+                transitions in the gold and predicted tags.
+        """
+        # the cache (and pickle) is only imported when a cache is used.
+        from .cache import DocumentResultCache
+
+        if len(self.gold_tag_lists) != len(self.tokens) or len(self.pred_tag_lists) != len(self.tokens):
+            raise Exception(
+                'Exception: Number of tags lists and tokens lists are not the same.')
+
+        decoding_scheme = tag_scheme if tag_scheme is not None else 'lenient'
+        gold_entity_spans, pred_entity_spans = [], []
+        gold_invalid_transitions, pred_invalid_transitions = 0, 0
+        # (key, cached entry or None, decoded gold spans, decoded predicted spans, # of invalid gold transitions,
+        # # of invalid predicted transitions) of every doc, the spans are cached as (type, start_idx, end_idx)
+        # before being validated.
+        self.__cached_docs = []
+        for token_list, gold_tag_list, pred_tag_list in zip(self.tokens, self.gold_tag_lists, self.pred_tag_lists):
+            key = DocumentResultCache.make_key(config, token_list, gold_tag_list, pred_tag_list)
+            entry = self.result_cache.get(key)
+            if entry is not None:
+                decoded_gold_spans, decoded_pred_spans, doc_gold_invalid_transitions, doc_pred_invalid_transitions = \
+                    entry[:4]
+                gold_spans = [self.__make_span(span, token_list) for span in decoded_gold_spans]
+                pred_spans = [self.__make_span(span, token_list) for span in decoded_pred_spans]
+                if compute_token_metrics:
+                    for gold_tag, pred_tag in zip(gold_tag_list, pred_tag_list):
+                        self.token_results.add(gold_tag, pred_tag)
+            else:
+                gold_spans_by_scheme, gold_counts = self.__tagged_list_to_spans_by_scheme(
+                    [gold_tag_list], [token_list], [decoding_scheme])
+                pred_spans_by_scheme, pred_counts = self.__tagged_list_to_spans_by_scheme(
+                    [pred_tag_list], [token_list], [decoding_scheme],
+                    [gold_tag_list] if compute_token_metrics else None)
+                gold_spans, pred_spans = gold_spans_by_scheme[decoding_scheme][0], pred_spans_by_scheme[decoding_scheme][0]
+                doc_gold_invalid_transitions = gold_counts[decoding_scheme]
+                doc_pred_invalid_transitions = pred_counts[decoding_scheme]
+
+            gold_entity_spans.append(gold_spans)
+            pred_entity_spans.append(pred_spans)
+            gold_invalid_transitions += doc_gold_invalid_transitions
+            pred_invalid_transitions += doc_pred_invalid_transitions
+            self.__cached_docs.append((key, entry,
+                                       [(span.span_type, span.start_idx, span.end_idx) for span in gold_spans],
+                                       [(span.span_type, span.start_idx, span.end_idx) for span in pred_spans],
+                                       doc_gold_invalid_transitions, doc_pred_invalid_transitions))
+        return gold_entity_spans, pred_entity_spans, gold_invalid_transitions, pred_invalid_transitions
+
+    def _calculate_metrics_for_doc(self, doc_idx: int, gold_entity_spans: List[Span],
+                                   pred_entity_spans: List[Span]) -> Tuple[ResultAggregator, Dict[str, ResultAggregator]]:
+        if self.__cached_docs is None:
+            return super()._calculate_metrics_for_doc(doc_idx, gold_entity_spans, pred_entity_spans)
+
+        # the cache keeps the (compact) matches of the document and the aggregators are rebuilt from them.
+        key, entry, *decoded_doc = self.__cached_docs[doc_idx]
+        if entry is not None:
+            scenario_counts, scenario_rows = entry[4:]
+            gold_entity_spans.sort(key=lambda span: (span.start_idx, span.end_idx))
+            pred_entity_spans.sort(key=lambda span: (span.start_idx, span.end_idx))
+        else:
+            scenario_counts, scenario_rows = self._match_doc_spans(gold_entity_spans, pred_entity_spans)
+            self.result_cache.put(key, (*decoded_doc, scenario_counts, scenario_rows))
+        return self._results_from_matches(gold_entity_spans, pred_entity_spans, scenario_counts, scenario_rows)
+
+    def evaluate_schemes(self) -> Dict[str, Tuple[ResultAggregator, Dict[str, ResultAggregator]]]:
+        """Evaluates the predictions decoded under every scheme against the shared gold spans.
+
+        Returns:
+            Dict[str, Tuple[ResultAggregator, Dict[str, ResultAggregator]]]: (Results, Results Grouped by tags)
+                of every scheme.
+        """
+        if self.pred_entity_span_lists_by_scheme is None:
+            raise Exception('Exception: No decoding schemes were provided to the evaluator.')
+
+        results_by_scheme = {}
+        for scheme_idx, (scheme, pred_entity_span_lists) in enumerate(self.pred_entity_span_lists_by_scheme.items()):
+            results_by_scheme[scheme] = self.evaluate() if scheme_idx == 0 else \
+                self.evaluate_predictions(pred_entity_span_lists)
+        return results_by_scheme
+
+    @classmethod
+    def from_subword_predictions(cls, tokens: List[List[str]], gold_tag_lists: List[List[str]],
+                                 pred_subword_tag_id_lists: Optional[List[List[int]]], word_id_lists: List[List[Optional[int]]],
+                                 id_to_tag: Sequence[str], strategy: str = 'first',
+                                 pred_subword_logit_lists: Optional[List[List[List[float]]]] = None,
+                                 **kwargs) -> NERTagListEvaluator:
+        """Creates a tag list based evaluator from tag ids predicted for subwords (e.g. wordpieces).
 
-        super().__init__(gold_entity_spans, pred_entity_spans)
+        Args:
+            tokens (List[List[str]]): List of (word) token lists for different documents.
+            gold_tag_lists (List[List[str]]): List of golden (word) tag lists for different documents.
+            pred_subword_tag_id_lists (List[List[int]]): List of subword tag id lists for different documents.
+            word_id_lists (List[List[Optional[int]]]): List of lists mapping every subword to the index of its word.
+            id_to_tag (Sequence[str]): tag of every tag id, e.g. ['O', 'B-PER', 'I-PER'].
+            strategy (str, optional): subword aggregation strategy, refer `aggregate_subword_tag_ids`.
+                Defaults to 'first'.
+            pred_subword_logit_lists (List[List[List[float]]], optional): List of subword logits lists for
+                different documents, required by the 'max_prob' strategy.
+            **kwargs: other arguments passed to the constructor.
 
-    def __tagged_list_to_span(self, tag_lists: List[List[str]], token_lists: List[List[str]]):
+        Returns:
+            NERTagListEvaluator: evaluator for the word level tags.
         """
-            Create a list of tagged entities with span offsets.
+        if len(word_id_lists) != len(gold_tag_lists):
+            raise Exception(
+                'Exception: Number of word id lists and gold tag lists are not the same.')
+
+        pred_tag_lists = []
+        for doc_idx, word_ids in enumerate(word_id_lists):
+            word_tag_ids = aggregate_subword_tag_ids(
+                pred_subword_tag_id_lists[doc_idx] if pred_subword_tag_id_lists is not None else None,
+                word_ids,
+                strategy,
+                pred_subword_logit_lists[doc_idx] if pred_subword_logit_lists is not None else None)
+            pred_tag_lists.append([id_to_tag[tag_id] for tag_id in word_tag_ids])
+
+        return cls(tokens, gold_tag_lists, pred_tag_lists, **kwargs)
+
+    def __tagged_list_to_spans_by_scheme(self, tag_lists: List[List[str]], token_lists: List[List[str]],
+                                         schemes: Sequence[str],
+                                         reference_tag_lists: List[List[str]] = None
+                                         ) -> Tuple[Dict[str, List[List[Span]]], Dict[str, int]]:
+        """
+            Create the lists of tagged entities under several decoding schemes in a single pass over the tags.
 
             Parameters:
                 tag_list (List[List[str]]): List of tag lists for different documents
+                schemes (Sequence[str]): names of the decoding schemes, refer `DECODERS`.
+                reference_tag_lists (List[List[str]], optional): List of gold tag lists, if provided every
+                                        tag is also scored against the gold tag in `token_results`.
             Returns:
-                List of entity span lists for each document.
+                Dicts of entity span lists for each document and of the # of invalid transitions keyed by the scheme.
         """
-        results = []
-        start_offset = None
-        end_offset = None
-        label = None
-        valid_token_tag_prefix = ('B', 'I', 'L', 'O', 'U')
-
-        def get_context_tokens(token_list, start_offset, end_offset): return (
-            token_list[max(0, start_offset-self.entity_context_padding):
-                        min(end_offset+self.entity_context_padding+1, len(token_list))]
-        )
+        if not schemes:
+            raise Exception('Exception: At least one decoding scheme is required.')
+        tag_schemes = [get_decoder(scheme) for scheme in schemes]
 
         if len(tag_lists) != len(token_lists):
             raise Exception(
                 'Exception: Number of tags lists and tokens lists are not the same.')
 
-        for tag_list, token_list in zip(tag_lists, token_lists):
-            # reset everything
-            labelled_entities = []
-
-            start_offset = None
-            end_offset = None
-            label = None
-
+        results = {scheme: [] for scheme in schemes}
+        invalid_transition_counts = {scheme: 0 for scheme in schemes}
+        for doc_idx, (tag_list, token_list) in enumerate(zip(tag_lists, token_lists)):
             if len(tag_list) != len(token_list):
                 raise Exception(
                     f'Exception: Number of tags and tokens are not the same.'
                     f'Tag List:{tag_list} Token List: {token_list}'
                 )
 
-            for offset, (token_tag, _) in enumerate(zip(tag_list, token_list)):
-                if token_tag == "O":
-                    # if a sequence of non-"O" tags was seen last and
-                    # a "O" tag is encountered => Label has ended.
-                    if label is not None and start_offset is not None:
-                        end_offset = offset - 1
-                        labelled_entities.append(
-                            Span(label, start_offset,
-                                          end_offset, token_list[start_offset:end_offset+1], 
-                                          get_context_tokens(token_list, start_offset, end_offset))
-                        )
-                        start_offset = None
-                        end_offset = None
-                        label = None
-                # if a non-"O" tag is encoutered => new label has started
-                elif label is None and token_tag.startswith(valid_token_tag_prefix):
-                    label = token_tag[2:]
-                    start_offset = offset
-                # if another label begins => last labelled seq has ended
-                elif (label != token_tag[2:] and token_tag.startswith(valid_token_tag_prefix)) or (
-                    label == token_tag[2:] and (
-                        token_tag[:1] == "B" or token_tag[:1] == "U")
-                ):
-
-                    end_offset = offset - 1
-                    labelled_entities.append(
-                        Span(label, start_offset,
-                                      end_offset, token_list[start_offset:end_offset+1], 
-                                      get_context_tokens(token_list, start_offset, end_offset))
-                    )
-
-                    # start of a new label
-                    label = token_tag[2:]
-                    start_offset = offset
-                    end_offset = None
-                elif not token_tag.startswith(valid_token_tag_prefix):
-                    # TODO: Add line information
-                    raise Exception(f'Unknown Token Tag: {token_tag}')
-
-            if label is not None and start_offset is not None and end_offset is None:
-                end_offset = len(tag_list) - 1
-                labelled_entities.append(
-                    Span(label, start_offset, end_offset, token_list[start_offset:end_offset+1], 
-                    get_context_tokens(token_list, start_offset, end_offset))
+            reference_tag_list = reference_tag_lists[doc_idx] if reference_tag_lists is not None else None
+            if reference_tag_list is not None and len(reference_tag_list) != len(tag_list):
+                raise Exception(
+                    f'Exception: Number of gold and predicted tags are not the same.'
+                    f'Gold Tag List:{reference_tag_list} Predicted Tag List: {tag_list}'
                 )
 
-            if len(labelled_entities) > 0:
-                results.append(labelled_entities)
-                labelled_entities = []
+            if len(tag_schemes) == 1 and reference_tag_list is None:
+                # a single scheme decodes the whole tag id array at once.
+                decoded_spans_by_scheme = [tag_schemes[0].decode(tag_list)]
+            else:
+                decoders = [tag_scheme.decoder() for tag_scheme in tag_schemes]
+                for offset, token_tag in enumerate(tag_list):
+                    if reference_tag_list is not None:
+                        self.token_results.add(reference_tag_list[offset], token_tag)
+                    for decoder in decoders:
+                        decoder.step(offset, token_tag)
+                decoded_spans_by_scheme = [(decoder.finish(len(tag_list)), decoder.invalid_transitions)
+                                           for decoder in decoders]
+
+            for scheme, (decoded_spans, invalid_transitions) in zip(schemes, decoded_spans_by_scheme):
+                invalid_transition_counts[scheme] += invalid_transitions
+                results[scheme].append([self.__make_span(decoded_span, token_list) for decoded_span in decoded_spans])
+
+        return results, invalid_transition_counts
+
+    def __make_span(self, decoded_span: Tuple[str, int, int], token_list: List[str]) -> Span:
+        """Creates the span of a decoded (type, start_idx, end_idx) along with its tokens and context.
+        """
+        label, start_offset, end_offset = decoded_span
+        return Span(label, start_offset, end_offset, token_list[start_offset:end_offset+1],
+                    token_list[max(0, start_offset-self.entity_context_padding):
+                               min(end_offset+self.entity_context_padding+1, len(token_list))])
+
 
-        return results
+class NERCharOffsetEvaluator(NEREvaluator):
+    def __init__(self, gold_offset_lists: List[List[Tuple[int, int, str]]], pred_offset_lists: List[List[Tuple[int, int, str]]],
+                 texts: Optional[List[str]] = None, entity_context_padding=0, validation_policy='strict',
+                 allow_overlapping_spans=True, breakdowns: Optional[Sequence[Union[str, BucketedCounts]]] = None,
+                 examples_per_category: Optional[int] = None, heavy_hitter_capacity: Optional[int] = None):
+        """Constructor for character offset based evaluator, allows comparing the predictions of models using
+        different tokenizers with the gold annotations without aligning them to a common tokenization.
+
+        Args:
+            gold_offset_lists (List[List[Tuple[int, int, str]]]): List of gold (start_char, end_char, type) lists for
+                different documents, end_char is exclusive.
+            pred_offset_lists (List[List[Tuple[int, int, str]]]): List of predicted (start_char, end_char, type) lists
+                for different documents, end_char is exclusive. A confidence score may follow the type.
+            texts (List[str], optional): Raw text of the documents, used to check the offsets and to get the text
+                (and context) of the spans when they are accessed.
+            entity_context_padding (int, optional): # of characters around a span kept as its context. Defaults to 0.
+            validation_policy (str, optional): Refer NEREvaluator. Defaults to 'strict'.
+            allow_overlapping_spans (bool, optional): Refer NEREvaluator. Defaults to True.
+            breakdowns (Sequence[Union[str, BucketedCounts]], optional): Refer NEREvaluator, lengths and positions
+                are in characters. Defaults to None.
+            examples_per_category (int, optional): Refer NEREvaluator. Defaults to None.
+            heavy_hitter_capacity (int, optional): Refer NEREvaluator. Defaults to None.
+        """
+        if texts is not None and len(texts) != len(gold_offset_lists):
+            raise Exception(
+                'Exception: Number of texts and gold offset lists are not the same.')
+
+        self.texts = texts
+        self.entity_context_padding = entity_context_padding
+
+        gold_entity_spans = self.__offsets_to_span(gold_offset_lists)
+        pred_entity_spans = self.__offsets_to_span(pred_offset_lists)
+
+        super().__init__(gold_entity_spans, pred_entity_spans, validation_policy, allow_overlapping_spans,
+                         doc_lengths=[len(text) for text in texts] if texts is not None else None,
+                         breakdowns=breakdowns, examples_per_category=examples_per_category,
+                         heavy_hitter_capacity=heavy_hitter_capacity)
+
+    def __offsets_to_span(self, offset_lists: List[List[Tuple[int, int, str]]]) -> List[List[CharSpan]]:
+        """
+            Create a list of character spans from the offsets.
+
+            Parameters:
+                offset_lists (List[List[Tuple[int, int, str]]]): List of (start_char, end_char, type) lists for
+                                                                 different documents
+            Returns:
+                List of entity span lists for each document.
+        """
+        return [
+            [CharSpan(offset[2], offset[0], offset[1],
+                      self.texts[doc_idx] if self.texts is not None and doc_idx < len(self.texts) else None,
+                      self.entity_context_padding,
+                      offset[3] if len(offset) > 3 else None)
+             for offset in offset_list]
+            for doc_idx, offset_list in enumerate(offset_lists)
+        ]
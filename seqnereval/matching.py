@@ -0,0 +1,137 @@
+from __future__ import annotations
+import heapq
+from typing import List, Sequence, Tuple
+
+from .decoder import DecodedSpan
+from .models import ConfusionMatrix, CountAggregator
+
+# (start_idx, end_idx) of a span
+Bounds = Tuple[int, int]
+
+
+def find_overlapping_pairs(gold_bounds: Sequence[Bounds],
+                           pred_bounds: Sequence[Bounds]) -> Tuple[List[Tuple[int, int]], bytearray, bytearray]:
+    """Finds every overlapping gold/predicted pair in a single sweep over the spans in the order of their start,
+    keeping the spans that started but haven't ended yet in heaps keyed by their end. A pair is found when the later
+    of its two spans starts, so only the pairs that actually overlap are visited and the sweep takes
+    O((n + m) log(n + m) + k log(k)) time for n gold spans, m predicted spans and k overlapping pairs.
+
+    Args:
+        gold_bounds (Sequence[Bounds]): bounds of the gold spans sorted by (start_idx, end_idx).
+        pred_bounds (Sequence[Bounds]): bounds of the predicted spans sorted by (start_idx, end_idx).
+
+    Returns:
+        Tuple[List[Tuple[int, int]], bytearray, bytearray]: sorted (gold index, predicted index) of the overlapping
+            pairs, and whether every gold/predicted span overlaps any span of the other list.
+    """
+    # (end_idx, idx) of the gold/predicted spans that started before the current span.
+    active_gold_spans, active_pred_spans = [], []
+    gold_overlaps, pred_overlaps = bytearray(len(gold_bounds)), bytearray(len(pred_bounds))
+    pairs = []
+
+    gold_idx, pred_idx = 0, 0
+    while gold_idx < len(gold_bounds) or pred_idx < len(pred_bounds):
+        # on ties gold spans go first, a predicted span starting along with a gold span then finds it active.
+        if pred_idx == len(pred_bounds) or (gold_idx < len(gold_bounds) and
+                                            gold_bounds[gold_idx][0] <= pred_bounds[pred_idx][0]):
+            start_idx, end_idx = gold_bounds[gold_idx]
+            while active_pred_spans and active_pred_spans[0][0] < start_idx:
+                heapq.heappop(active_pred_spans)
+            # the remaining active predicted spans start before the gold span and end after it starts.
+            for _, active_pred_idx in active_pred_spans:
+                pairs.append((gold_idx, active_pred_idx))
+                pred_overlaps[active_pred_idx] = 1
+                gold_overlaps[gold_idx] = 1
+            heapq.heappush(active_gold_spans, (end_idx, gold_idx))
+            gold_idx += 1
+        else:
+            start_idx, end_idx = pred_bounds[pred_idx]
+            while active_gold_spans and active_gold_spans[0][0] < start_idx:
+                heapq.heappop(active_gold_spans)
+            for _, active_gold_idx in active_gold_spans:
+                pairs.append((active_gold_idx, pred_idx))
+                gold_overlaps[active_gold_idx] = 1
+                pred_overlaps[pred_idx] = 1
+            heapq.heappush(active_pred_spans, (end_idx, pred_idx))
+            pred_idx += 1
+
+    pairs.sort()
+    return pairs, gold_overlaps, pred_overlaps
+
+
+def assign_overlapping_pairs(gold_bounds: Sequence[Bounds], gold_types: Sequence[str], pred_bounds: Sequence[Bounds],
+                             pred_types: Sequence[str]) -> Tuple[List[Tuple[int, int]], bytearray, bytearray]:
+    """Matches every gold span with at most one overlapping predicted span and vice versa. The overlapping pairs
+    (refer `find_overlapping_pairs`) are assigned greedily in the order of: exact bounds and type match, exact
+    bounds match, longest overlap with the same type, longest overlap. Pairs only exist within a cluster of
+    transitively overlapping spans, so every cluster is assigned on its own in O(k log(k)) time for k pairs.
+
+    Args:
+        gold_bounds (Sequence[Bounds]): bounds of the gold spans sorted by (start_idx, end_idx).
+        gold_types (Sequence[str]): types of the gold spans.
+        pred_bounds (Sequence[Bounds]): bounds of the predicted spans sorted by (start_idx, end_idx).
+        pred_types (Sequence[str]): types of the predicted spans.
+
+    Returns:
+        Tuple[List[Tuple[int, int]], bytearray, bytearray]: sorted (gold index, predicted index) of the assigned
+            pairs, and whether every gold/predicted span is assigned to a span of the other list.
+    """
+    overlapping_pairs, _, _ = find_overlapping_pairs(gold_bounds, pred_bounds)
+
+    candidate_pairs = []
+    for gold_idx, pred_idx in overlapping_pairs:
+        (gold_start_idx, gold_end_idx), (pred_start_idx, pred_end_idx) = gold_bounds[gold_idx], pred_bounds[pred_idx]
+        overlap_length = min(gold_end_idx, pred_end_idx) - max(gold_start_idx, pred_start_idx) + 1
+        candidate_pairs.append((gold_bounds[gold_idx] != pred_bounds[pred_idx],
+                                gold_types[gold_idx] != pred_types[pred_idx], -overlap_length, gold_idx, pred_idx))
+    candidate_pairs.sort()
+
+    gold_assigned, pred_assigned = bytearray(len(gold_bounds)), bytearray(len(pred_bounds))
+    pairs = []
+    for _, _, _, gold_idx, pred_idx in candidate_pairs:
+        if gold_assigned[gold_idx] or pred_assigned[pred_idx]:
+            continue
+        gold_assigned[gold_idx], pred_assigned[pred_idx] = 1, 1
+        pairs.append((gold_idx, pred_idx))
+
+    pairs.sort()
+    return pairs, gold_assigned, pred_assigned
+
+
+def count_decoded_spans(gold_spans: Sequence[DecodedSpan], pred_spans: Sequence[DecodedSpan],
+                        counts: CountAggregator, confusion_matrix: ConfusionMatrix) -> None:
+    """Matches the decoded spans of a document like NEREvaluator does, but only adds to the scenario counts
+    (per tag) and the confusion matrix, without creating any Span or ResultAggregator.
+
+    Args:
+        gold_spans (Sequence[DecodedSpan]): (type, start_idx, end_idx) of the gold spans.
+        pred_spans (Sequence[DecodedSpan]): (type, start_idx, end_idx) of the predicted spans.
+        counts (CountAggregator): counts added to, pairs and missed spans count for the gold type and
+            spurious spans for the predicted type.
+        confusion_matrix (ConfusionMatrix): confusion matrix added to.
+    """
+    gold_spans = sorted(gold_spans, key=lambda span: (span[1], span[2]))
+    pred_spans = sorted(pred_spans, key=lambda span: (span[1], span[2]))
+    pairs, gold_assigned, pred_assigned = assign_overlapping_pairs(
+        [(start_idx, end_idx) for _, start_idx, end_idx in gold_spans], [span[0] for span in gold_spans],
+        [(start_idx, end_idx) for _, start_idx, end_idx in pred_spans], [span[0] for span in pred_spans])
+
+    for gold_idx, pred_idx in pairs:
+        gold_type, gold_start_idx, gold_end_idx = gold_spans[gold_idx]
+        pred_type, pred_start_idx, pred_end_idx = pred_spans[pred_idx]
+        if gold_start_idx == pred_start_idx and gold_end_idx == pred_end_idx:
+            scenario = 'type_match_bounds_match' if gold_type == pred_type else 'type_mismatch_bounds_match'
+        else:
+            scenario = 'type_match_bounds_partial' if gold_type == pred_type else 'type_mismatch_bounds_partial'
+        counts.add(scenario, gold_type)
+        confusion_matrix.add(gold_type, pred_type)
+
+    for (gold_type, _, _), assigned in zip(gold_spans, gold_assigned):
+        if not assigned:
+            counts.add('missed_gold_span', gold_type)
+            confusion_matrix.add_missed(gold_type)
+
+    for (pred_type, _, _), assigned in zip(pred_spans, pred_assigned):
+        if not assigned:
+            counts.add('unecessary_predicted_span', pred_type)
+            confusion_matrix.add_spurious(pred_type)
@@ -1,4 +1,29 @@
 from .span import Span
+from .reservoir import Reservoir
+from .char_span import CharSpan
 from .god_predicted_pair import GoldPredictedPair
 from .scorecard import ScoreCard
-from .results_aggregator import ResultAggregator
\ No newline at end of file
+from .confusion_matrix import ConfusionMatrix
+from .pair_statistics import PairStatistics
+from .prediction_scores import PredictionScores
+from .heavy_hitters import HeavyHitters
+from .token_scorecard import TokenScoreCard
+from .results_aggregator import ResultAggregator
+from .bucketed_counts import BucketedCounts
+from .count_aggregator import CountAggregator, SlidingWindowAggregator
+
+# the snapshots (and json, mmap and struct) are only imported once they are used, refer seqnereval/__init__.py.
+_LAZY_ATTRIBUTES = {
+    "ResultSnapshot": "result_snapshot",
+    "merge_files": "result_snapshot",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(__import__(f"{__name__}.{module_name}", fromlist=[name]), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,89 @@
+from __future__ import annotations
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence
+
+from . import Span, ResultAggregator
+
+
+class BucketedCounts:
+    """Scenario counts broken down into buckets of a span property, e.g. the length of the span
+    (1, 2, 3-5, 6+ tokens) or its position in the document.
+
+    Pairs are bucketed by their gold span, spurious spans by the predicted span. The counts are
+    plain integer lists per scenario, so recording a span doesn't allocate anything.
+    """
+
+    DIMENSIONS = ('length', 'position')
+    DEFAULT_BOUNDARIES = {
+        'length': (1, 2, 3, 6),
+        'position': (0, 16, 32, 64, 128),
+    }
+
+    def __init__(self, dimension: str, boundaries: Optional[Sequence[int]] = None):
+        """
+        Constructor for BucketedCounts
+
+        Args:
+            dimension (str): 'length' (# of tokens in the span) or 'position' (start_idx of the span).
+            boundaries (Sequence[int], optional): increasing lower bounds of the buckets, values below the first
+                boundary are counted in the first bucket. Defaults to DEFAULT_BOUNDARIES of the dimension.
+        """
+        if dimension not in BucketedCounts.DIMENSIONS:
+            raise Exception(f'Unknown breakdown dimension: {dimension}, expected one of {BucketedCounts.DIMENSIONS}')
+
+        self.dimension = dimension
+        self.boundaries = list(boundaries if boundaries is not None else BucketedCounts.DEFAULT_BOUNDARIES[dimension])
+        if not self.boundaries or any(lower >= upper for lower, upper in zip(self.boundaries, self.boundaries[1:])):
+            raise Exception(f'Exception: Bucket boundaries must be non empty and increasing, got {self.boundaries}')
+
+        self.counts: Dict[str, List[int]] = {
+            scenario: [0] * len(self.boundaries) for scenario in ResultAggregator.SCENARIOS}
+
+    def copy_empty(self) -> BucketedCounts:
+        """Returns a breakdown of the same dimension and buckets without any counts.
+        """
+        return BucketedCounts(self.dimension, self.boundaries)
+
+    def get_bucket(self, span: Span) -> int:
+        """Index of the bucket of a span.
+        """
+        value = span.end_idx - span.start_idx + 1 if self.dimension == 'length' else span.start_idx
+        return max(0, bisect_right(self.boundaries, value) - 1)
+
+    def add(self, scenario: str, span: Span) -> None:
+        """Counts a span (the gold span of a pair) in a scenario.
+        """
+        self.counts[scenario][self.get_bucket(span)] += 1
+
+    def merge(self, other: BucketedCounts) -> None:
+        """Adds the counts of other into self.
+        """
+        if other.dimension != self.dimension or other.boundaries != self.boundaries:
+            raise Exception(f'Exception: Cannot merge {other.dimension} breakdown with buckets {other.boundaries} '
+                            f'into {self.dimension} breakdown with buckets {self.boundaries}.')
+        for scenario, counts in other.counts.items():
+            self_counts = self.counts[scenario]
+            for bucket, count in enumerate(counts):
+                self_counts[bucket] += count
+
+    def bucket_labels(self) -> List[str]:
+        """Labels of the buckets e.g. ['1', '2', '3-5', '6+'].
+        """
+        labels = []
+        for lower, upper in zip(self.boundaries, self.boundaries[1:]):
+            labels.append(str(lower) if upper == lower + 1 else f'{lower}-{upper - 1}')
+        labels.append(f'{self.boundaries[-1]}+')
+        return labels
+
+    def get_scenario_counts(self, bucket: int) -> Dict[str, int]:
+        """Count of each scenario in a bucket.
+        """
+        return {scenario: counts[bucket] for scenario, counts in self.counts.items()}
+
+    def summarize_result(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Summarizes the four scorecards of every bucket, keyed by the bucket labels.
+        """
+        return {
+            label: ResultAggregator.summarize_scenario_counts(self.get_scenario_counts(bucket))
+            for bucket, label in enumerate(self.bucket_labels())
+        }
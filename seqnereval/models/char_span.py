@@ -0,0 +1,67 @@
+from __future__ import annotations
+from typing import Optional
+
+from . import Span
+
+
+class CharSpan(Span):
+    """Span over character offsets of the raw document text.
+
+    Internally the span is stored with inclusive bounds (like token spans) so the
+    same matching logic applies, the text spanned and its context are only sliced
+    out of the document text when they are accessed.
+    """
+
+    def __init__(self,
+                 span_type: str,
+                 start_char: int,
+                 end_char: int,
+                 text: Optional[str] = None,
+                 context_padding: int = 0,
+                 score: Optional[float] = None):
+        """
+        Construct a new CharSpan.
+
+        Parameters:
+            span_type (str): type/label of span.
+            start_char (int): offset of the first character that is a part of the span.
+            end_char (int): offset of the character right after the span (exclusive, as in text[start_char:end_char]).
+            text [optional, default = None] (str): raw text of the document the span belongs to.
+            context_padding [optional, default = 0] (int): # of characters around the span included in its context.
+            score [optional, default = None] (float): confidence of the model in a predicted span.
+        """
+        self.span_type = span_type
+        self.start_idx = start_char
+        self.end_idx = end_char - 1
+        self.text = text
+        self.context_padding = context_padding
+        if score is not None:
+            self.score = score
+
+    @property
+    def start_char(self) -> int:
+        return self.start_idx
+
+    @property
+    def end_char(self) -> int:
+        return self.end_idx + 1
+
+    @property
+    def spanned_tokens(self) -> Optional[str]:
+        if self.text is None:
+            return None
+        return self.text[self.start_idx:self.end_idx + 1]
+
+    @property
+    def span_context(self) -> Optional[str]:
+        if self.text is None:
+            return None
+        return self.text[max(0, self.start_idx - self.context_padding):
+                         min(self.end_idx + self.context_padding + 1, len(self.text))]
+
+    def __str__(self):
+        return (f'(Type: "{self.span_type}", Char Span:({self.start_char},'
+                f' {self.end_char}), Text:{self.spanned_tokens!r}, Context:{self.span_context!r})')
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+
+class ConfusionMatrix:
+    """Dense gold type x predicted type confusion matrix.
+
+    Entity types are interned into integer ids, index 0 is reserved for
+    "no entity" so that missed gold spans end up in column 0 and spurious
+    predicted spans end up in row 0.
+    """
+
+    NO_ENTITY = None
+
+    def __init__(self) -> None:
+        """
+        Constructor for ConfusionMatrix
+        """
+        self.types: List[Optional[str]] = [ConfusionMatrix.NO_ENTITY]
+        self.type_ids: Dict[Optional[str], int] = {ConfusionMatrix.NO_ENTITY: 0}
+        self.counts: List[List[int]] = [[0]]
+
+    def intern_type(self, span_type: Optional[str]) -> int:
+        """Returns the id of a span type, growing the matrix if the type is new.
+
+        Args:
+            span_type (str): type/label of a span.
+
+        Returns:
+            int: id of the type in the matrix.
+        """
+        type_id = self.type_ids.get(span_type)
+        if type_id is None:
+            type_id = len(self.types)
+            self.types.append(span_type)
+            self.type_ids[span_type] = type_id
+            for row in self.counts:
+                row.append(0)
+            self.counts.append([0] * len(self.types))
+        return type_id
+
+    def add(self, gold_type: Optional[str], pred_type: Optional[str], count: int = 1) -> None:
+        """Records a gold/predicted type pair.
+
+        Args:
+            gold_type (str): type of the gold span, None if the predicted span is spurious.
+            pred_type (str): type of the predicted span, None if the gold span was missed.
+            count (int, optional): number of occurences to add. Defaults to 1.
+        """
+        self.counts[self.intern_type(gold_type)][self.intern_type(pred_type)] += count
+
+    def add_missed(self, gold_type: str) -> None:
+        """Records a gold span for which no span was predicted.
+        """
+        self.counts[self.intern_type(gold_type)][0] += 1
+
+    def add_spurious(self, pred_type: str) -> None:
+        """Records a predicted span that doesn't exist in the gold spans.
+        """
+        self.counts[0][self.intern_type(pred_type)] += 1
+
+    def merge(self, other: ConfusionMatrix) -> None:
+        """Adds the counts of another confusion matrix into self.
+
+        Matrices sharing the same type table are merged by plain element-wise
+        addition, otherwise the types of the other matrix are remapped first.
+
+        Args:
+            other (ConfusionMatrix): confusion matrix to be merged.
+        """
+        if other.types == self.types:
+            for row, other_row in zip(self.counts, other.counts):
+                for idx, count in enumerate(other_row):
+                    row[idx] += count
+            return
+
+        id_map = [self.intern_type(span_type) for span_type in other.types]
+        for other_gold_id, other_row in enumerate(other.counts):
+            row = self.counts[id_map[other_gold_id]]
+            for other_pred_id, count in enumerate(other_row):
+                if count:
+                    row[id_map[other_pred_id]] += count
+
+    def get(self, gold_type: Optional[str], pred_type: Optional[str]) -> int:
+        """Returns the number of times a gold type was predicted as pred type.
+        """
+        gold_id = self.type_ids.get(gold_type)
+        pred_id = self.type_ids.get(pred_type)
+        if gold_id is None or pred_id is None:
+            return 0
+        return self.counts[gold_id][pred_id]
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        """Converts the matrix into a nested dictionary of non-zero counts.
+
+        Returns:
+            Dict[str, Dict[str, int]]: {gold type: {predicted type: count}}, missed
+                spans are keyed by predicted type None and spurious spans by gold type None.
+        """
+        return {
+            self.types[gold_id]: {self.types[pred_id]: count
+                                  for pred_id, count in enumerate(row) if count}
+            for gold_id, row in enumerate(self.counts) if any(row)
+        }
+
+    def __eq__(self, other: ConfusionMatrix) -> bool:
+        return self.to_dict() == other.to_dict()
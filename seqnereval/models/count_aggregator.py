@@ -0,0 +1,179 @@
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+from . import ResultAggregator
+
+
+class CountAggregator:
+    """Counts of the six scenarios for every tag, without the spans themselves.
+
+    Unlike ResultAggregator counts can be subtracted as well as added, which makes
+    them suitable for sliding windows. Counts are kept in one integer list per
+    scenario indexed by interned tag ids.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor for CountAggregator
+        """
+        self.tags: List[str] = []
+        self.tag_ids: Dict[str, int] = {}
+        self.counts: Dict[str, List[int]] = {scenario: [] for scenario in ResultAggregator.SCENARIOS}
+
+    @classmethod
+    def from_results_grouped_by_tags(cls, results_grouped_by_tags: Dict[str, ResultAggregator]) -> CountAggregator:
+        """Creates a count aggregator from the results grouped by tags returned by an evaluator.
+
+        Args:
+            results_grouped_by_tags (Dict[str, ResultAggregator]): results keyed by tags.
+
+        Returns:
+            CountAggregator: counts of the results.
+        """
+        count_aggregator = cls()
+        for tag, results_for_tag in results_grouped_by_tags.items():
+            tag_id = count_aggregator.intern_tag(tag)
+            for scenario, count in results_for_tag.get_scenario_counts().items():
+                count_aggregator.counts[scenario][tag_id] += count
+        return count_aggregator
+
+    def intern_tag(self, tag: str) -> int:
+        """Returns the id of a tag, allocating its counters if the tag is new.
+        """
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tags)
+            self.tags.append(tag)
+            self.tag_ids[tag] = tag_id
+            for counts_for_scenario in self.counts.values():
+                counts_for_scenario.append(0)
+        return tag_id
+
+    def add(self, scenario: str, tag: str, count: int = 1) -> None:
+        """Adds to the count of a scenario for a tag.
+
+        Args:
+            scenario (str): name of the scenario e.g. 'missed_gold_span'.
+            tag (str): tag the span(s) belong to.
+            count (int, optional): count to add. Defaults to 1.
+        """
+        self.counts[scenario][self.intern_tag(tag)] += count
+
+    def append_count_aggregator(self, other: CountAggregator, sign: int = 1) -> None:
+        """Adds (or subtracts with sign=-1) the counts of another count aggregator to self.
+
+        Args:
+            other (CountAggregator): counts to be added.
+            sign (int, optional): 1 to add, -1 to subtract. Defaults to 1.
+        """
+        if other.tags == self.tags:
+            for scenario, counts_for_scenario in self.counts.items():
+                other_counts_for_scenario = other.counts[scenario]
+                for tag_id in range(len(counts_for_scenario)):
+                    counts_for_scenario[tag_id] += sign * other_counts_for_scenario[tag_id]
+            return
+
+        tag_ids = [self.intern_tag(tag) for tag in other.tags]
+        for scenario, counts_for_scenario in self.counts.items():
+            for other_tag_id, count in enumerate(other.counts[scenario]):
+                counts_for_scenario[tag_ids[other_tag_id]] += sign * count
+
+    def subtract_count_aggregator(self, other: CountAggregator) -> None:
+        """Subtracts the counts of another count aggregator from self.
+        """
+        self.append_count_aggregator(other, -1)
+
+    def get_scenario_counts(self, tag: Optional[str] = None) -> Dict[str, int]:
+        """Returns the count of each scenario for a tag, or over all the tags if no tag is given.
+        """
+        if tag is None:
+            return {scenario: sum(counts_for_scenario) for scenario, counts_for_scenario in self.counts.items()}
+
+        tag_id = self.tag_ids.get(tag)
+        return {scenario: counts_for_scenario[tag_id] if tag_id is not None else 0
+                for scenario, counts_for_scenario in self.counts.items()}
+
+    def summarize_result(self, tag: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Summarizes the four scorecards for a tag, or over all the tags if no tag is given.
+        """
+        return ResultAggregator.summarize_scenario_counts(self.get_scenario_counts(tag))
+
+    def summarize_result_by_tags(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Summarizes the four scorecards for every tag.
+        """
+        return {tag: self.summarize_result(tag) for tag in self.tags}
+
+
+class SlidingWindowAggregator:
+    """Ring buffer of count aggregators (buckets), keeping the total counts of the buckets in the window.
+
+    A bucket can hold a single document (metrics over the last N documents) or all the documents
+    of a period of time (e.g. metrics over the last 24 hours with hourly buckets). Adding to the
+    current bucket, rotating buckets and reading the window metrics are all O(# of tags).
+    """
+
+    def __init__(self, bucket_count: int) -> None:
+        """
+        Constructor for SlidingWindowAggregator
+
+        Args:
+            bucket_count (int): # of buckets in the window.
+        """
+        if bucket_count < 1:
+            raise Exception(f'Exception: A window needs at least one bucket, got {bucket_count}.')
+
+        self.bucket_count = bucket_count
+        self.buckets: List[Optional[CountAggregator]] = [None] * bucket_count
+        self.buckets[0] = CountAggregator()
+        self.current_bucket_idx = 0
+        self.window = CountAggregator()
+
+    @property
+    def current_bucket(self) -> CountAggregator:
+        return self.buckets[self.current_bucket_idx]
+
+    def add(self, counts: CountAggregator, age: int = 0) -> None:
+        """Adds counts to the current bucket, or to an older bucket still in the window (e.g. for late data).
+
+        Args:
+            counts (CountAggregator): counts to be added.
+            age (int, optional): # of rotations since the bucket was the current one. Defaults to 0.
+        """
+        if not 0 <= age < self.bucket_count:
+            raise Exception(f'Exception: Bucket age must be between 0 and {self.bucket_count - 1}, got {age}.')
+
+        bucket_idx = (self.current_bucket_idx - age) % self.bucket_count
+        if self.buckets[bucket_idx] is None:
+            self.buckets[bucket_idx] = CountAggregator()
+        self.buckets[bucket_idx].append_count_aggregator(counts)
+        self.window.append_count_aggregator(counts)
+
+    def add_results_grouped_by_tags(self, results_grouped_by_tags: Dict[str, ResultAggregator]) -> None:
+        """Adds the results grouped by tags returned by an evaluator to the current bucket.
+        """
+        self.add(CountAggregator.from_results_grouped_by_tags(results_grouped_by_tags))
+
+    def rotate(self) -> None:
+        """Starts a new current bucket, evicting the oldest bucket from the window if the window is full.
+        """
+        self.current_bucket_idx = (self.current_bucket_idx + 1) % self.bucket_count
+        oldest_bucket = self.buckets[self.current_bucket_idx]
+        if oldest_bucket is not None:
+            self.window.subtract_count_aggregator(oldest_bucket)
+        self.buckets[self.current_bucket_idx] = CountAggregator()
+
+    def add_bucket(self, counts: CountAggregator) -> None:
+        """Rotates the window and adds counts as the new current bucket.
+        """
+        self.rotate()
+        self.add(counts)
+
+    def summarize_result(self, tag: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Summarizes the four scorecards over the window for a tag, or over all the tags if no tag is given.
+        """
+        return self.window.summarize_result(tag)
+
+    def summarize_result_by_tags(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Summarizes the four scorecards over the window for every tag.
+        """
+        return self.window.summarize_result_by_tags()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+import heapq
+import itertools
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from . import Span
+
+# (scenario, gold type, predicted type, surface form)
+ErrorKey = Tuple[str, Optional[str], Optional[str], Optional[str]]
+
+
+def surface_form(span: Span) -> Optional[str]:
+    """Text of a span, its tokens joined by spaces.
+    """
+    spanned_tokens = span.spanned_tokens
+    if spanned_tokens is None or isinstance(spanned_tokens, str):
+        return spanned_tokens
+    return ' '.join(spanned_tokens)
+
+
+class HeavyHitters:
+    """Space-Saving summary of the most frequent keys of a stream, e.g. the most often missed entity strings.
+
+    At most `capacity` keys are counted, a new key replaces the key with the smallest count and inherits
+    that count as its error, so counts are over-estimated by at most `error(key)`. Any key occurring more
+    than (# of keys added / capacity) times is guaranteed to be in the summary.
+    """
+
+    def __init__(self, capacity: int = 1000) -> None:
+        """
+        Constructor for HeavyHitters
+
+        Args:
+            capacity (int, optional): max # of keys counted. Defaults to 1000.
+        """
+        if capacity <= 0:
+            raise Exception(f'Exception: Heavy hitters capacity must be > 0, got {capacity}')
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self.total = 0
+        # min heap of (count, tie breaker, key), entries are refreshed lazily when their count is stale.
+        self.__heap: List[Tuple[int, int, Hashable]] = []
+        self.__sequence = itertools.count()
+
+    def add(self, key: Hashable, count: int = 1) -> None:
+        """Counts an occurrence of a key.
+        """
+        self.total += count
+        if key in self.counts:
+            self.counts[key] += count
+            return
+
+        error = 0
+        if len(self.counts) >= self.capacity:
+            error = self.__pop_min()
+        self.counts[key] = error + count
+        self.errors[key] = error
+        heapq.heappush(self.__heap, (error + count, next(self.__sequence), key))
+
+    def __pop_min(self) -> int:
+        """Evicts the key with the smallest count and returns its count.
+        """
+        while True:
+            count, _, key = heapq.heappop(self.__heap)
+            current_count = self.counts.get(key)
+            if current_count == count:
+                del self.counts[key]
+                del self.errors[key]
+                return count
+            if current_count is not None:
+                heapq.heappush(self.__heap, (current_count, next(self.__sequence), key))
+
+    def min_count(self) -> int:
+        """Smallest count in the summary if it is full, else 0 (i.e. an upper bound of the count of any absent key).
+        """
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def error(self, key: Hashable) -> int:
+        """Max over-estimation of the count of a key.
+        """
+        return self.errors.get(key, self.min_count())
+
+    def merge(self, other: HeavyHitters) -> None:
+        """Merges the summary of other (e.g. of another worker) into self, keys absent from a full summary
+        are assumed to have its min count.
+        """
+        self_min_count, other_min_count = self.min_count(), other.min_count()
+        counts, errors = {}, {}
+        for key in itertools.chain(self.counts, (key for key in other.counts if key not in self.counts)):
+            counts[key] = self.counts.get(key, self_min_count) + other.counts.get(key, other_min_count)
+            errors[key] = self.errors.get(key, self_min_count) + other.errors.get(key, other_min_count)
+
+        self.capacity = max(self.capacity, other.capacity)
+        top_keys = heapq.nlargest(self.capacity, counts, key=counts.__getitem__)
+        self.counts = {key: counts[key] for key in top_keys}
+        self.errors = {key: errors[key] for key in top_keys}
+        self.total += other.total
+        self.__heap = [(count, next(self.__sequence), key) for key, count in self.counts.items()]
+        heapq.heapify(self.__heap)
+
+    def top(self, n: int = 50, scenario: Optional[str] = None, gold_type: Optional[str] = None,
+            pred_type: Optional[str] = None) -> List[Tuple[Hashable, int]]:
+        """Most frequent keys, optionally only the (scenario, gold type, predicted type, surface form) keys
+        matching the given fields.
+
+        Args:
+            n (int, optional): # of keys to return. Defaults to 50.
+            scenario (str, optional): only keys of this scenario e.g. 'missed_gold_span'.
+            gold_type (str, optional): only keys of this gold type.
+            pred_type (str, optional): only keys of this predicted type.
+
+        Returns:
+            List[Tuple[Hashable, int]]: (key, count) pairs in decreasing order of the counts.
+        """
+        def is_selected(key) -> bool:
+            return ((scenario is None or key[0] == scenario) and
+                    (gold_type is None or key[1] == gold_type) and
+                    (pred_type is None or key[2] == pred_type))
+
+        filtering = scenario is not None or gold_type is not None or pred_type is not None
+        candidate_keys = [key for key in self.counts if is_selected(key)] if filtering else self.counts
+        return [(key, self.counts[key]) for key in heapq.nlargest(n, candidate_keys, key=self.counts.__getitem__)]
+
+    def __getstate__(self):
+        return {"capacity": self.capacity, "counts": self.counts, "errors": self.errors, "total": self.total}
+
+    def __setstate__(self, state):
+        self.capacity = state["capacity"]
+        self.counts = state["counts"]
+        self.errors = state["errors"]
+        self.total = state["total"]
+        self.__sequence = itertools.count()
+        self.__heap = [(count, next(self.__sequence), key) for key, count in self.counts.items()]
+        heapq.heapify(self.__heap)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Sequence
+
+from . import Span, ScoreCard
+
+
+class PairStatistics:
+    """Boundary statistics of the matched (overlapping) gold/predicted span pairs, kept in flat integer
+    arrays with one entry per pair, along with the # of missed and spurious spans.
+
+    Tolerant scores (boundaries within ±k tokens, IoU ≥ threshold) for any number of thresholds are
+    derived from these arrays afterwards, without matching the spans again.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor for PairStatistics
+        """
+        self.type_matches = array('b')
+        self.overlap_lengths = array('q')
+        self.gold_lengths = array('q')
+        self.pred_lengths = array('q')
+        # pred - gold
+        self.start_offsets = array('q')
+        self.end_offsets = array('q')
+
+        self.missed_count = 0
+        self.spurious_count = 0
+
+    def __len__(self) -> int:
+        return len(self.type_matches)
+
+    def add_pair(self, gold_span: Span, pred_span: Span) -> None:
+        """Records a matched gold/predicted span pair.
+        """
+        self.type_matches.append(gold_span.span_type == pred_span.span_type)
+        self.overlap_lengths.append(max(0, min(gold_span.end_idx, pred_span.end_idx) -
+                                        max(gold_span.start_idx, pred_span.start_idx) + 1))
+        self.gold_lengths.append(gold_span.end_idx - gold_span.start_idx + 1)
+        self.pred_lengths.append(pred_span.end_idx - pred_span.start_idx + 1)
+        self.start_offsets.append(pred_span.start_idx - gold_span.start_idx)
+        self.end_offsets.append(pred_span.end_idx - gold_span.end_idx)
+
+    def add_missed(self) -> None:
+        self.missed_count += 1
+
+    def add_spurious(self) -> None:
+        self.spurious_count += 1
+
+    def merge(self, other: PairStatistics) -> None:
+        """Merges the statistics of other into self.
+        """
+        self.type_matches.extend(other.type_matches)
+        self.overlap_lengths.extend(other.overlap_lengths)
+        self.gold_lengths.extend(other.gold_lengths)
+        self.pred_lengths.extend(other.pred_lengths)
+        self.start_offsets.extend(other.start_offsets)
+        self.end_offsets.extend(other.end_offsets)
+        self.missed_count += other.missed_count
+        self.spurious_count += other.spurious_count
+
+    def boundary_distances(self) -> List[int]:
+        """Largest of the start and end boundary offsets of every pair.
+        """
+        return [max(abs(start_offset), abs(end_offset))
+                for start_offset, end_offset in zip(self.start_offsets, self.end_offsets)]
+
+    def ious(self) -> List[float]:
+        """Intersection over union of the token ranges of every pair.
+        """
+        return [overlap_length / (gold_length + pred_length - overlap_length)
+                for overlap_length, gold_length, pred_length in
+                zip(self.overlap_lengths, self.gold_lengths, self.pred_lengths)]
+
+    def __summarize(self, correct_counts: Sequence[int], thresholds: Sequence[float]) -> Dict[float, Dict[str, float]]:
+        pair_count = len(self)
+        return {
+            threshold: ScoreCard.summarize_counts(correct_count, pair_count - correct_count, 0,
+                                                  self.missed_count, self.spurious_count)
+            for threshold, correct_count in zip(thresholds, correct_counts)
+        }
+
+    def score_boundary_tolerance(self, tolerances: Sequence[int],
+                                 require_type_match: bool = True) -> Dict[int, Dict[str, float]]:
+        """Scores the pairs whose start and end boundaries are both within ±k tokens of the gold span as correct,
+        for every k at once. Pairs that are not correct count as incorrect, like in the strict scorecard.
+
+        Args:
+            tolerances (Sequence[int]): boundary tolerances (k) to score.
+            require_type_match (bool, optional): only pairs of the same type can be correct. Defaults to True.
+
+        Returns:
+            Dict[int, Dict[str, float]]: summary (counts, precision, recall, f1) for each tolerance.
+        """
+        distances = sorted(distance for distance, type_match in zip(self.boundary_distances(), self.type_matches)
+                           if type_match or not require_type_match)
+        return self.__summarize([bisect_right(distances, tolerance) for tolerance in tolerances], tolerances)
+
+    def score_iou(self, thresholds: Sequence[float], require_type_match: bool = True) -> Dict[float, Dict[str, float]]:
+        """Scores the pairs whose IoU with the gold span is at least the threshold as correct, for every threshold
+        at once. Pairs that are not correct count as incorrect, like in the strict scorecard.
+
+        Args:
+            thresholds (Sequence[float]): IoU thresholds to score.
+            require_type_match (bool, optional): only pairs of the same type can be correct. Defaults to True.
+
+        Returns:
+            Dict[float, Dict[str, float]]: summary (counts, precision, recall, f1) for each threshold.
+        """
+        ious = sorted(iou for iou, type_match in zip(self.ious(), self.type_matches)
+                      if type_match or not require_type_match)
+        return self.__summarize([len(ious) - bisect_left(ious, threshold) for threshold in thresholds], thresholds)
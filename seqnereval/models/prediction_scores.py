@@ -0,0 +1,193 @@
+from __future__ import annotations
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from . import Span
+
+PRED_SPAN_SCENARIOS = ('type_match_bounds_match', 'unecessary_predicted_span', 'type_mismatch_bounds_match',
+                       'type_match_bounds_partial', 'type_mismatch_bounds_partial')
+
+# (start_idx, end_idx, type) of a gold span and (start_idx, end_idx, type, score) of a predicted span.
+GoldBounds = Tuple[int, int, str]
+PredBounds = Tuple[int, int, str, float]
+
+
+class PredictionScores:
+    """Confidence score of every predicted span, kept in one float array per scenario, along with
+    the # of missed gold spans.
+
+    Dropping a predicted span scored below a threshold turns its gold span into a missed span, unless
+    another predicted span overlapping the gold span is kept. So the spans of documents with scored
+    predicted spans are recorded (refer `add_spans`) in clusters of overlapping spans, and a cluster
+    is matched again whenever a threshold keeps another of its predicted spans. The precision/recall of
+    every scorecard at every threshold then follows from a single sort of the scores and running counts,
+    matching the evaluation of only the predicted spans scored at least the threshold. Spans without a
+    score are never dropped.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor for PredictionScores
+        """
+        self.scores: Dict[str, array] = {scenario: array('d') for scenario in PRED_SPAN_SCENARIOS}
+        self.missed_count = 0
+        # (tag, gold spans, predicted spans) of the clusters with a scored predicted span.
+        self.clusters: List[Tuple[Optional[str], Tuple[GoldBounds, ...], Tuple[PredBounds, ...]]] = []
+
+    def add(self, scenario: str, pred_span: Span) -> None:
+        """Records the score of a predicted span in the scenario it ended up in.
+        """
+        self.scores[scenario].append(pred_span.score if pred_span.score is not None else float('inf'))
+
+    def add_missed(self) -> None:
+        self.missed_count += 1
+
+    def add_spans(self, gold_spans: Sequence[Span], pred_spans: Sequence[Span], tag: Optional[str] = None) -> None:
+        """Records the spans of a document rather than the scenarios they ended up in, so they are matched again
+        (refer `assign_overlapping_pairs`) with the predicted spans kept at every threshold. The spans are split
+        into clusters of overlapping spans, the clusters without a scored predicted span are matched once and
+        added like `add` and `add_missed` would.
+
+        Args:
+            gold_spans (Sequence[Span]): gold spans of the document.
+            pred_spans (Sequence[Span]): predicted spans of the document.
+            tag (str, optional): only the pairs and missed spans of gold spans of this type and the spurious
+                predicted spans of this type are counted, for the results grouped by tags. Defaults to None.
+        """
+        spans = sorted([(span.start_idx, span.end_idx, span.span_type) for span in gold_spans] +
+                       [(span.start_idx, span.end_idx, span.span_type,
+                         span.score if span.score is not None else float('inf')) for span in pred_spans])
+
+        span_idx = 0
+        while span_idx < len(spans):
+            # sweep over the spans (in the order of their start) until the next gap to get a cluster.
+            cluster_end_idx, cluster_gold_spans, cluster_pred_spans = spans[span_idx][1], [], []
+            while span_idx < len(spans) and spans[span_idx][0] <= cluster_end_idx:
+                cluster_end_idx = max(cluster_end_idx, spans[span_idx][1])
+                (cluster_gold_spans if len(spans[span_idx]) == 3 else cluster_pred_spans).append(spans[span_idx])
+                span_idx += 1
+
+            if any(pred_span[3] != float('inf') for pred_span in cluster_pred_spans):
+                self.clusters.append((tag, tuple(cluster_gold_spans), tuple(cluster_pred_spans)))
+                continue
+            for scenario, count in PredictionScores.__count_cluster(tag, cluster_gold_spans, cluster_pred_spans).items():
+                if scenario == 'missed_gold_span':
+                    self.missed_count += count
+                else:
+                    self.scores[scenario].extend([float('inf')] * count)
+
+    @staticmethod
+    def __count_cluster(tag: Optional[str], gold_spans: Sequence[GoldBounds],
+                        pred_spans: Sequence[PredBounds]) -> Counter:
+        """Matches the spans of a cluster and counts the scenarios they end up in.
+        """
+        from ..matching import assign_overlapping_pairs
+
+        pairs, gold_assigned, pred_assigned = assign_overlapping_pairs(
+            [gold_span[:2] for gold_span in gold_spans], [gold_span[2] for gold_span in gold_spans],
+            [pred_span[:2] for pred_span in pred_spans], [pred_span[2] for pred_span in pred_spans])
+
+        counts = Counter()
+        for gold_idx, pred_idx in pairs:
+            gold_span, pred_span = gold_spans[gold_idx], pred_spans[pred_idx]
+            if tag is not None and gold_span[2] != tag:
+                continue
+            if gold_span[:2] == pred_span[:2]:
+                scenario = 'type_match_bounds_match' if gold_span[2] == pred_span[2] else 'type_mismatch_bounds_match'
+            else:
+                scenario = 'type_match_bounds_partial' if gold_span[2] == pred_span[2] else \
+                    'type_mismatch_bounds_partial'
+            counts[scenario] += 1
+        for gold_span, assigned in zip(gold_spans, gold_assigned):
+            if not assigned and (tag is None or gold_span[2] == tag):
+                counts['missed_gold_span'] += 1
+        for pred_span, assigned in zip(pred_spans, pred_assigned):
+            if not assigned and (tag is None or pred_span[2] == tag):
+                counts['unecessary_predicted_span'] += 1
+        return counts
+
+    def merge(self, other: PredictionScores) -> None:
+        """Merges the scores of other into self.
+        """
+        for scenario, scores in other.scores.items():
+            self.scores[scenario].extend(scores)
+        self.missed_count += other.missed_count
+        self.clusters.extend(other.clusters)
+
+    def __summarize_thresholds(self) -> List[Tuple[float, Dict[str, Dict[str, float]]]]:
+        from .results_aggregator import ResultAggregator
+
+        # (score, scenario, cluster index) of every predicted span, the scenario of the spans recorded by `add` and
+        # the cluster of the spans recorded by `add_spans`.
+        scored_spans = sorted([(score, scenario, None) for scenario, scores in self.scores.items() for score in scores] +
+                              [(pred_span[3], None, cluster_idx) for cluster_idx, (_, _, pred_spans)
+                               in enumerate(self.clusters) for pred_span in pred_spans],
+                              key=lambda scored_span: scored_span[0], reverse=True)
+
+        # until their predicted spans are kept, the gold spans of the pairs are missed.
+        counts = Counter({scenario: 0 for scenario in ResultAggregator.SCENARIOS})
+        counts['missed_gold_span'] += self.missed_count + sum(len(scores) for scenario, scores in self.scores.items()
+                                                              if scenario != 'unecessary_predicted_span')
+        cluster_counts = [PredictionScores.__count_cluster(tag, gold_spans, ()) for tag, gold_spans, _ in self.clusters]
+        for counts_of_cluster in cluster_counts:
+            counts.update(counts_of_cluster)
+
+        summaries, changed_clusters = [], set()
+        for span_idx, (score, scenario, cluster_idx) in enumerate(scored_spans):
+            if scenario is None:
+                changed_clusters.add(cluster_idx)
+            else:
+                counts[scenario] += 1
+                if scenario != 'unecessary_predicted_span':
+                    counts['missed_gold_span'] -= 1
+            # spans with the same score are kept or dropped together.
+            if span_idx + 1 < len(scored_spans) and scored_spans[span_idx + 1][0] == score:
+                continue
+
+            for changed_cluster_idx in changed_clusters:
+                tag, gold_spans, pred_spans = self.clusters[changed_cluster_idx]
+                counts.subtract(cluster_counts[changed_cluster_idx])
+                cluster_counts[changed_cluster_idx] = PredictionScores.__count_cluster(
+                    tag, gold_spans, [pred_span for pred_span in pred_spans if pred_span[3] >= score])
+                counts.update(cluster_counts[changed_cluster_idx])
+            changed_clusters.clear()
+            summaries.append((score, ResultAggregator.summarize_scenario_counts(counts)))
+        return summaries
+
+    def precision_recall_curves(self) -> Dict[str, Dict[str, List[float]]]:
+        """Precision, recall and f1 of every scorecard when only the predicted spans scored at least the threshold
+        are kept, for every distinct score (in decreasing order) as the threshold.
+
+        Returns:
+            Dict[str, Dict[str, List[float]]]: "thresholds", "precision", "recall" and "f1" lists keyed by
+                the scorecard names.
+        """
+        summaries = self.__summarize_thresholds()
+        return {
+            scorecard: {
+                "thresholds": [threshold for threshold, _ in summaries],
+                "precision": [summary[scorecard]["precision"] for _, summary in summaries],
+                "recall": [summary[scorecard]["recall"] for _, summary in summaries],
+                "f1": [summary[scorecard]["f1"] for _, summary in summaries],
+            }
+            for scorecard in ('strict_match', 'type_match', 'partial_match', 'bounds_match')
+        }
+
+    def precision_recall_curve(self, scorecard: str = 'strict_match') -> Dict[str, List[float]]:
+        """Precision/recall curve of a scorecard, refer `precision_recall_curves`.
+        """
+        return self.precision_recall_curves()[scorecard]
+
+    def best_f1_threshold(self, scorecard: str = 'strict_match') -> Tuple[Optional[float], Optional[Dict[str, float]]]:
+        """Threshold maximizing the f1 of a scorecard.
+
+        Returns:
+            Tuple[Optional[float], Optional[Dict[str, float]]]: (threshold, summary of the scorecard at the threshold),
+                both are None if there are no predicted spans.
+        """
+        best_threshold, best_summary = None, None
+        for threshold, summary in self.__summarize_thresholds():
+            if best_summary is None or summary[scorecard]["f1"] > best_summary["f1"]:
+                best_threshold, best_summary = threshold, summary[scorecard]
+        return best_threshold, best_summary
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import random
+from typing import Iterable, List, Optional, Sized
+
+
+class Reservoir(list):
+    """List keeping a uniform random sample of at most `capacity` of the items appended to it,
+    along with the exact # of items seen.
+
+    Extending a reservoir with another reservoir merges the samples weighted by the # of items each
+    has seen, so samples of different shards merge into a uniform sample of all the items.
+    """
+
+    def __init__(self, capacity: int, items: Iterable = (), rng: Optional[random.Random] = None):
+        """
+        Constructor for Reservoir
+
+        Args:
+            capacity (int): max # of items kept, 0 keeps only the count.
+            items (Iterable, optional): items appended to the reservoir.
+            rng (random.Random, optional): generator the sample is drawn with, e.g. a seeded one for reproducible
+                samples. It isn't pickled along with the reservoir. Defaults to None i.e. the global generator.
+        """
+        super().__init__()
+        if capacity < 0:
+            raise Exception(f'Exception: Reservoir capacity must be >= 0, got {capacity}')
+        self.capacity = capacity
+        self.seen = 0
+        self.rng = rng if rng is not None else random
+        self.extend(items)
+
+    @classmethod
+    def from_sample(cls, capacity: int, seen: int, items: Iterable,
+                    rng: Optional[random.Random] = None) -> Reservoir:
+        """Restores a reservoir from its sample and the # of items it has seen, e.g. after serialization.
+        """
+        reservoir = cls(capacity, rng=rng)
+        list.extend(reservoir, items)
+        reservoir.seen = seen
+        return reservoir
+
+    def append(self, item) -> None:
+        self.seen += 1
+        if len(self) < self.capacity:
+            super().append(item)
+        else:
+            replaced_idx = self.rng.randrange(self.seen)
+            if replaced_idx < self.capacity:
+                self[replaced_idx] = item
+
+    def extend(self, items: Iterable) -> None:
+        if not isinstance(items, Reservoir):
+            for item in items:
+                self.append(item)
+            return
+
+        # a merged sample is only uniform up to the smaller of the two capacities.
+        self.capacity = min(self.capacity, items.capacity)
+        # draw the merged sample without replacement from the two populations, an item of a population
+        # is drawn uniformly from its sample which is itself a uniform sample of the population.
+        samples = [list(self), list(items)]
+        remaining = [self.seen, items.seen]
+        merged_sample = []
+        while len(merged_sample) < self.capacity and remaining[0] + remaining[1] > 0:
+            source = 0 if self.rng.randrange(remaining[0] + remaining[1]) < remaining[0] else 1
+            sample = samples[source]
+            drawn_idx = self.rng.randrange(len(sample))
+            sample[drawn_idx], sample[-1] = sample[-1], sample[drawn_idx]
+            merged_sample.append(sample.pop())
+            remaining[source] -= 1
+
+        self.seen += items.seen
+        self[:] = merged_sample
+
+    def __reduce__(self):
+        # list subclasses are unpickled by appending their items, which would be sampled (and counted) again,
+        # and the generator is left out like in ResultAggregator.
+        return _restore_reservoir, (self.capacity, self.seen, list(self))
+
+
+def _restore_reservoir(capacity: int, seen: int, items: List) -> Reservoir:
+    return Reservoir.from_sample(capacity, seen, items)
+
+
+def example_count(examples: Sized) -> int:
+    """# of examples added to a list of examples, which is more than its length for a Reservoir.
+    """
+    return examples.seen if isinstance(examples, Reservoir) else len(examples)
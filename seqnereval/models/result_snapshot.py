@@ -0,0 +1,321 @@
+from __future__ import annotations
+import json
+import mmap
+import random
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Sequence, Union
+
+from . import Span, Reservoir, GoldPredictedPair, ConfusionMatrix, ResultAggregator
+
+GOLD_SPAN_SCENARIOS = ('missed_gold_span',)
+PRED_SPAN_SCENARIOS = ('unecessary_predicted_span',)
+
+GOLD_COLUMNS = ('gold_type', 'gold_start', 'gold_end')
+PRED_COLUMNS = ('pred_type', 'pred_start', 'pred_end')
+
+
+def scenario_columns(scenario: str) -> Sequence[str]:
+    """Names of the columns stored for the examples of a scenario.
+    """
+    if scenario in GOLD_SPAN_SCENARIOS:
+        return GOLD_COLUMNS
+    if scenario in PRED_SPAN_SCENARIOS:
+        return PRED_COLUMNS
+    return GOLD_COLUMNS + PRED_COLUMNS
+
+
+class ResultSnapshot:
+    """Compact, columnar snapshot of a ResultAggregator.
+
+    Holds the scenario counts, the confusion matrix and, for every scenario, a table of
+    examples with one int64 column per span field (type ids into an interned type vocabulary,
+    start and end indices). Tokens and context of the spans are not kept. A snapshot of a sampled
+    aggregator (refer `examples_per_category`) keeps the sampled examples along with the exact counts.
+
+    Binary layout:
+        MAGIC | uint32 format version | uint32 header length | JSON header | padding to 8 bytes | columns
+    where every column is a little-endian int64 array whose offset and length are listed in the header.
+    """
+
+    MAGIC = b'SNEVSNAP'
+    FORMAT_VERSION = 1
+    PREFIX = struct.Struct('<8sII')
+
+    def __init__(self,
+                 types: Optional[List[str]] = None,
+                 counts: Optional[Dict[str, int]] = None,
+                 columns: Optional[Dict[str, Dict[str, Sequence[int]]]] = None,
+                 confusion_matrix: Optional[ConfusionMatrix] = None,
+                 examples_per_category: Optional[int] = None):
+        """
+        Constructor for ResultSnapshot
+
+        Args:
+            types (List[str], optional): type vocabulary the type columns refer to.
+            counts (Dict[str, int], optional): count of each scenario.
+            columns (Dict[str, Dict[str, Sequence[int]]], optional): example columns keyed by scenario and column name.
+            confusion_matrix (ConfusionMatrix, optional): type confusion matrix.
+            examples_per_category (int, optional): capacity of the example samples, None if every example is kept.
+        """
+        self.types = types if types is not None else []
+        self.counts = counts if counts is not None else {scenario: 0 for scenario in ResultAggregator.SCENARIOS}
+        self.columns = columns if columns is not None else {
+            scenario: {column: array('q') for column in scenario_columns(scenario)}
+            for scenario in ResultAggregator.SCENARIOS
+        }
+        self.confusion_matrix = confusion_matrix if confusion_matrix is not None else ConfusionMatrix()
+        self.examples_per_category = examples_per_category
+
+    @classmethod
+    def from_result_aggregator(cls, results: ResultAggregator) -> ResultSnapshot:
+        """Creates a snapshot of a result aggregator.
+        """
+        snapshot = cls(counts=results.get_scenario_counts(), examples_per_category=results.examples_per_category)
+        snapshot.confusion_matrix.merge(results.confusion_matrix)
+        type_ids: Dict[str, int] = {}
+
+        def intern_type(span_type: str) -> int:
+            type_id = type_ids.get(span_type)
+            if type_id is None:
+                type_id = type_ids[span_type] = len(snapshot.types)
+                snapshot.types.append(span_type)
+            return type_id
+
+        def append_span(columns: Dict[str, array], prefix: str, span: Span) -> None:
+            columns[prefix + '_type'].append(intern_type(span.span_type))
+            columns[prefix + '_start'].append(span.start_idx)
+            columns[prefix + '_end'].append(span.end_idx)
+
+        for scenario in ResultAggregator.SCENARIOS:
+            columns = snapshot.columns[scenario]
+            for example in getattr(results, scenario):
+                if scenario in GOLD_SPAN_SCENARIOS:
+                    append_span(columns, 'gold', example)
+                elif scenario in PRED_SPAN_SCENARIOS:
+                    append_span(columns, 'pred', example)
+                else:
+                    append_span(columns, 'gold', example.gold_span)
+                    append_span(columns, 'pred', example.predicted_span)
+
+        return snapshot
+
+    def to_result_aggregator(self, rng: Optional[random.Random] = None) -> ResultAggregator:
+        """Materializes the examples of the snapshot into a result aggregator. The examples are appended
+        to the scenario and scorecard lists directly and the metrics are calculated once, the confusion
+        matrix and the # of missed/spurious spans of the pair statistics are restored from the snapshot.
+        The examples of a sampled snapshot are restored as reservoirs that have seen the exact counts, and
+        sample the examples added later with `rng` (refer ResultAggregator).
+        """
+        results = ResultAggregator(examples_per_category=self.examples_per_category, rng=rng)
+
+        def column_span(columns: Dict[str, Sequence[int]], prefix: str, row: int) -> Span:
+            return Span(self.types[columns[prefix + '_type'][row]],
+                        columns[prefix + '_start'][row],
+                        columns[prefix + '_end'][row])
+
+        examples = {}
+        for scenario in ResultAggregator.SCENARIOS:
+            columns = self.columns[scenario]
+            rows = range(self.example_count(scenario))
+            if scenario in GOLD_SPAN_SCENARIOS:
+                examples[scenario] = [column_span(columns, 'gold', row) for row in rows]
+            elif scenario in PRED_SPAN_SCENARIOS:
+                examples[scenario] = [column_span(columns, 'pred', row) for row in rows]
+            else:
+                examples[scenario] = [GoldPredictedPair(column_span(columns, 'gold', row),
+                                                        column_span(columns, 'pred', row)) for row in rows]
+                for pair in examples[scenario]:
+                    results.pair_statistics.add_pair(pair.gold_span, pair.predicted_span)
+            if self.examples_per_category is not None:
+                examples[scenario] = Reservoir.from_sample(self.examples_per_category, self.counts[scenario],
+                                                           examples[scenario], rng)
+                setattr(results, scenario, examples[scenario])
+            else:
+                getattr(results, scenario).extend(examples[scenario])
+
+        for scorecard_name, categories in ResultAggregator.SCORECARD_SCENARIOS.items():
+            scorecard = getattr(results, scorecard_name)
+            for category, scenarios in categories.items():
+                for scenario in scenarios:
+                    # the samples of the scenarios are merged weighted by their counts, refer `Reservoir.extend`.
+                    getattr(scorecard, category).extend(examples[scenario])
+
+        results.pair_statistics.missed_count = self.counts['missed_gold_span']
+        results.pair_statistics.spurious_count = self.counts['unecessary_predicted_span']
+        results.confusion_matrix.merge(self.confusion_matrix)
+        results.recalculate_metrics_for_all_scorecards()
+
+        return results
+
+    def example_count(self, scenario: str) -> int:
+        """# of examples stored for a scenario.
+        """
+        return len(self.columns[scenario][scenario_columns(scenario)[0]])
+
+    def summarize_result(self) -> Dict[str, Dict[str, float]]:
+        """Summarizes the four scorecards from the counts of the snapshot.
+        """
+        return ResultAggregator.summarize_scenario_counts(self.counts)
+
+    def merge(self, other: ResultSnapshot) -> None:
+        """Merges other snapshot into self, remapping its type ids into the type vocabulary of self.
+        If either snapshot is sampled the examples of every scenario are resampled into a uniform sample
+        of both, weighted by their counts (refer `Reservoir.extend`).
+
+        Args:
+            other (ResultSnapshot): snapshot to be merged.
+        """
+        type_ids = {span_type: type_id for type_id, span_type in enumerate(self.types)}
+        for span_type in other.types:
+            if span_type not in type_ids:
+                type_ids[span_type] = len(self.types)
+                self.types.append(span_type)
+        type_id_map = [type_ids[span_type] for span_type in other.types]
+        remap_type_ids = type_id_map != list(range(len(type_id_map)))
+
+        capacities = [capacity for capacity in (self.examples_per_category, other.examples_per_category)
+                      if capacity is not None]
+        examples_per_category = min(capacities) if capacities else None
+
+        for scenario in ResultAggregator.SCENARIOS:
+            columns = self.columns[scenario]
+            other_columns = other.columns[scenario]
+            if examples_per_category is None:
+                kept_rows = None
+            else:
+                # the examples of a snapshot keeping every example are drawn from like a sample.
+                samples = [
+                    Reservoir.from_sample(
+                        snapshot.examples_per_category if snapshot.examples_per_category is not None
+                        else examples_per_category,
+                        snapshot.counts[scenario],
+                        [(source, row) for row in range(snapshot.example_count(scenario))])
+                    for source, snapshot in enumerate((self, other))
+                ]
+                samples[0].extend(samples[1])
+                kept_rows = sorted(samples[0])
+
+            self.counts[scenario] += other.counts[scenario]
+            for column, values in other_columns.items():
+                if remap_type_ids and column.endswith('_type'):
+                    values = [type_id_map[type_id] for type_id in values]
+                if kept_rows is None:
+                    if not isinstance(columns[column], array):
+                        columns[column] = array('q', columns[column])
+                    columns[column].extend(values)
+                else:
+                    sources = (columns[column], values)
+                    columns[column] = array('q', (sources[source][row] for source, row in kept_rows))
+
+        self.examples_per_category = examples_per_category
+        self.confusion_matrix.merge(other.confusion_matrix)
+
+    def to_bytes(self) -> bytes:
+        """Serializes the snapshot into the binary format.
+        """
+        column_data = []
+        column_index = []
+        offset = 0
+        for scenario in ResultAggregator.SCENARIOS:
+            for column in scenario_columns(scenario):
+                values = array('q', self.columns[scenario][column])
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                data = values.tobytes()
+                column_index.append([scenario, column, offset, len(values)])
+                column_data.append(data)
+                offset += len(data)
+
+        header = json.dumps({
+            "types": self.types,
+            "counts": self.counts,
+            "confusion_matrix": {
+                "types": self.confusion_matrix.types,
+                "counts": self.confusion_matrix.counts,
+            },
+            "columns": column_index,
+            "examples_per_category": self.examples_per_category,
+        }).encode('utf-8')
+        padding = b'\0' * (-(ResultSnapshot.PREFIX.size + len(header)) % 8)
+
+        return b''.join([ResultSnapshot.PREFIX.pack(ResultSnapshot.MAGIC, ResultSnapshot.FORMAT_VERSION, len(header)),
+                         header, padding, *column_data])
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview, mmap.mmap]) -> ResultSnapshot:
+        """Loads a snapshot from the binary format.
+
+        On little-endian machines the columns are memoryviews into `data`, so nothing is copied.
+
+        Args:
+            data (Union[bytes, bytearray, memoryview, mmap.mmap]): serialized snapshot.
+
+        Returns:
+            ResultSnapshot: the snapshot.
+        """
+        buffer = memoryview(data)
+        if len(buffer) < ResultSnapshot.PREFIX.size:
+            raise Exception('Exception: Not a seqnereval snapshot, data is too short.')
+
+        magic, format_version, header_length = ResultSnapshot.PREFIX.unpack_from(buffer)
+        if magic != ResultSnapshot.MAGIC:
+            raise Exception('Exception: Not a seqnereval snapshot.')
+        if format_version != ResultSnapshot.FORMAT_VERSION:
+            raise Exception(f'Exception: Unsupported snapshot format version {format_version}.')
+
+        header_end = ResultSnapshot.PREFIX.size + header_length
+        header = json.loads(bytes(buffer[ResultSnapshot.PREFIX.size:header_end]).decode('utf-8'))
+        data_start = header_end + (-header_end % 8)
+
+        columns = {scenario: {} for scenario in ResultAggregator.SCENARIOS}
+        for scenario, column, offset, length in header["columns"]:
+            column_bytes = buffer[data_start + offset:data_start + offset + 8 * length]
+            if sys.byteorder == 'little':
+                columns[scenario][column] = column_bytes.cast('q')
+            else:
+                values = array('q', bytes(column_bytes))
+                values.byteswap()
+                columns[scenario][column] = values
+
+        confusion_matrix = ConfusionMatrix()
+        confusion_matrix.types = header["confusion_matrix"]["types"]
+        confusion_matrix.type_ids = {span_type: type_id for type_id, span_type in enumerate(confusion_matrix.types)}
+        confusion_matrix.counts = header["confusion_matrix"]["counts"]
+
+        return cls(header["types"], header["counts"], columns, confusion_matrix, header.get("examples_per_category"))
+
+    def save(self, path: str) -> None:
+        """Writes the snapshot to a file.
+        """
+        with open(path, 'wb') as snapshot_file:
+            snapshot_file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> ResultSnapshot:
+        """Memory maps a snapshot file, the example columns are read lazily from the mapping.
+        """
+        with open(path, 'rb') as snapshot_file:
+            mapping = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_bytes(mapping)
+
+
+def merge_files(paths: Sequence[str], output_path: Optional[str] = None) -> ResultSnapshot:
+    """Merges snapshot files (e.g. of shards evaluated on different machines) without creating any span objects.
+
+    Args:
+        paths (Sequence[str]): paths of the snapshot files.
+        output_path (str, optional): if provided the merged snapshot is written to this path.
+
+    Returns:
+        ResultSnapshot: the merged snapshot.
+    """
+    merged_snapshot = ResultSnapshot()
+    for path in paths:
+        merged_snapshot.merge(ResultSnapshot.load(path))
+
+    if output_path is not None:
+        merged_snapshot.save(output_path)
+
+    return merged_snapshot
@@ -1,11 +1,65 @@
 from __future__ import annotations
-from typing import List, Tuple, Dict
-from . import Span, GoldPredictedPair, ScoreCard
+import random
+from typing import TYPE_CHECKING, List, Dict, Optional, Sequence
+from . import Span, GoldPredictedPair, ScoreCard, ConfusionMatrix, PairStatistics, PredictionScores
+from .reservoir import Reservoir, example_count
+from .heavy_hitters import HeavyHitters, surface_form
+
+if TYPE_CHECKING:
+    from .bucketed_counts import BucketedCounts
+
 
 class ResultAggregator:
-    def __init__(self):
+    SCENARIOS = ('type_match_bounds_match', 'unecessary_predicted_span', 'missed_gold_span',
+                 'type_mismatch_bounds_match', 'type_match_bounds_partial', 'type_mismatch_bounds_partial')
+    # scenarios whose spans/span pairs end up in each category of each scorecard.
+    SCORECARD_SCENARIOS = {
+        'strict_match': {
+            'correct': ('type_match_bounds_match',),
+            'incorrect': ('type_mismatch_bounds_match', 'type_match_bounds_partial', 'type_mismatch_bounds_partial'),
+            'partial': (),
+            'missed': ('missed_gold_span',),
+            'spurious': ('unecessary_predicted_span',),
+        },
+        'type_match': {
+            'correct': ('type_match_bounds_match', 'type_match_bounds_partial'),
+            'incorrect': ('type_mismatch_bounds_match', 'type_mismatch_bounds_partial'),
+            'partial': (),
+            'missed': ('missed_gold_span',),
+            'spurious': ('unecessary_predicted_span',),
+        },
+        'partial_match': {
+            'correct': ('type_match_bounds_match', 'type_mismatch_bounds_match'),
+            'incorrect': (),
+            'partial': ('type_match_bounds_partial', 'type_mismatch_bounds_partial'),
+            'missed': ('missed_gold_span',),
+            'spurious': ('unecessary_predicted_span',),
+        },
+        'bounds_match': {
+            'correct': ('type_match_bounds_match', 'type_mismatch_bounds_match'),
+            'incorrect': ('type_match_bounds_partial', 'type_mismatch_bounds_partial'),
+            'partial': (),
+            'missed': ('missed_gold_span',),
+            'spurious': ('unecessary_predicted_span',),
+        },
+    }
+
+    def __init__(self, breakdowns: Optional[Sequence['BucketedCounts']] = None,
+                 examples_per_category: Optional[int] = None, heavy_hitter_capacity: Optional[int] = None,
+                 rng: Optional[random.Random] = None):
         """
-        Constructor for ResultAggregator 
+        Constructor for ResultAggregator
+
+        Args:
+            breakdowns (Sequence[BucketedCounts], optional): breakdowns (e.g. by span length) in which the
+                scenario counts are also recorded, only their dimensions and buckets are used.
+            examples_per_category (int, optional): if provided only a uniform random sample of this many
+                spans/span pairs is kept per scenario (and scorecard category), the counts stay exact.
+                0 keeps the counts only. Defaults to None i.e. every example is kept.
+            heavy_hitter_capacity (int, optional): if provided the most frequent errors keyed by (scenario, gold type,
+                predicted type, surface form) are tracked in `heavy_hitters` with this many counters. Defaults to None.
+            rng (random.Random, optional): generator the examples are sampled with (refer Reservoir), it isn't
+                pickled along with the aggregator. Defaults to None i.e. the global generator.
         """
         self.strict_match = ScoreCard()
         self.type_match = ScoreCard(is_partial_or_type_scorecard=True)
@@ -19,6 +73,32 @@ class ResultAggregator:
         self.type_match_bounds_partial: List[GoldPredictedPair] = []
         self.type_mismatch_bounds_partial: List[GoldPredictedPair] = []
 
+        self.confusion_matrix = ConfusionMatrix()
+        self.pair_statistics = PairStatistics()
+        self.prediction_scores = PredictionScores()
+        self.breakdowns = {breakdown.dimension: breakdown.copy_empty() for breakdown in breakdowns or ()}
+
+        self.heavy_hitters = HeavyHitters(heavy_hitter_capacity) if heavy_hitter_capacity is not None else None
+
+        self.rng = rng
+        self.examples_per_category = None
+        if examples_per_category is not None:
+            self.__use_reservoirs(examples_per_category)
+
+    def __getstate__(self):
+        # the state of a generator takes a few kB and only matters to the process sampling with it.
+        return {**self.__dict__, "rng": None}
+
+    def __use_reservoirs(self, examples_per_category: int) -> None:
+        """Replaces the example lists of the scenarios and scorecards with reservoirs of the given capacity.
+        """
+        self.examples_per_category = examples_per_category
+        for scenario in ResultAggregator.SCENARIOS:
+            setattr(self, scenario, Reservoir(examples_per_category, getattr(self, scenario), self.rng))
+        for scorecard in (self.strict_match, self.type_match, self.partial_match, self.bounds_match):
+            for category in ('correct', 'incorrect', 'partial', 'missed', 'spurious'):
+                setattr(scorecard, category, Reservoir(examples_per_category, getattr(scorecard, category), self.rng))
+
     def summarize_result(self):
         """Summarizes the results into numbers.
         """
@@ -28,12 +108,53 @@ class ResultAggregator:
             "type_match": self.type_match.get_summary(),
             "partial_match": self.partial_match.get_summary(),
             "bounds_match": self.bounds_match.get_summary(),
-            "type_match_bounds_match": len(self.type_match_bounds_match),
-            "unecessary_predicted_span": len(self.unecessary_predicted_span),
-            "missed_gold_span": len(self.missed_gold_span),
-            "type_mismatch_bounds_match": len(self.type_mismatch_bounds_match),
-            "type_match_bounds_partial": len(self.type_match_bounds_partial),
-            "type_mismatch_bounds_partial": len(self.type_mismatch_bounds_partial)
+            "type_match_bounds_match": example_count(self.type_match_bounds_match),
+            "unecessary_predicted_span": example_count(self.unecessary_predicted_span),
+            "missed_gold_span": example_count(self.missed_gold_span),
+            "type_mismatch_bounds_match": example_count(self.type_mismatch_bounds_match),
+            "type_match_bounds_partial": example_count(self.type_match_bounds_partial),
+            "type_mismatch_bounds_partial": example_count(self.type_mismatch_bounds_partial)
+        }
+
+    def get_scenario_counts(self) -> Dict[str, int]:
+        """Counts the spans/span pairs in each of the six scenarios.
+        """
+        return {scenario: example_count(getattr(self, scenario)) for scenario in ResultAggregator.SCENARIOS}
+
+    @staticmethod
+    def summarize_scenario_counts(scenario_counts: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+        """Computes the summaries of the four scorecards from the scenario counts alone.
+
+        Args:
+            scenario_counts (Dict[str, float]): count of each scenario keyed by the scenario names.
+
+        Returns:
+            Dict[str, Dict[str, float]]: summary of each scorecard keyed by the scorecard names.
+        """
+        type_match_bounds_match = scenario_counts["type_match_bounds_match"]
+        unecessary_predicted_span = scenario_counts["unecessary_predicted_span"]
+        missed_gold_span = scenario_counts["missed_gold_span"]
+        type_mismatch_bounds_match = scenario_counts["type_mismatch_bounds_match"]
+        type_match_bounds_partial = scenario_counts["type_match_bounds_partial"]
+        type_mismatch_bounds_partial = scenario_counts["type_mismatch_bounds_partial"]
+
+        return {
+            "strict_match": ScoreCard.summarize_counts(
+                type_match_bounds_match,
+                type_mismatch_bounds_match + type_match_bounds_partial + type_mismatch_bounds_partial,
+                0, missed_gold_span, unecessary_predicted_span),
+            "type_match": ScoreCard.summarize_counts(
+                type_match_bounds_match + type_match_bounds_partial,
+                type_mismatch_bounds_match + type_mismatch_bounds_partial,
+                0, missed_gold_span, unecessary_predicted_span, True),
+            "partial_match": ScoreCard.summarize_counts(
+                type_match_bounds_match + type_mismatch_bounds_match,
+                0, type_match_bounds_partial + type_mismatch_bounds_partial,
+                missed_gold_span, unecessary_predicted_span, True),
+            "bounds_match": ScoreCard.summarize_counts(
+                type_match_bounds_match + type_mismatch_bounds_match,
+                type_match_bounds_partial + type_mismatch_bounds_partial,
+                0, missed_gold_span, unecessary_predicted_span),
         }
 
     def append_result_aggregator(self, otherResultAggregator: ResultAggregator) -> None:
@@ -42,6 +163,9 @@ class ResultAggregator:
         Args:
             otherResultAggregator (ResultAggregator): Result to be appended.
         """
+        if self.examples_per_category is None and otherResultAggregator.examples_per_category is not None:
+            # sampled examples can't be appended to complete lists of examples without skewing them.
+            self.__use_reservoirs(otherResultAggregator.examples_per_category)
 
         self.strict_match.mergeScoreCard(otherResultAggregator.strict_match)
         self.type_match.mergeScoreCard(otherResultAggregator.type_match)
@@ -55,7 +179,33 @@ class ResultAggregator:
         self.type_match_bounds_partial.extend(otherResultAggregator.type_match_bounds_partial)
         self.type_mismatch_bounds_partial.extend(otherResultAggregator.type_mismatch_bounds_partial)
 
-        self.recalculate_metrics_for_all_scorecards() 
+        self.confusion_matrix.merge(otherResultAggregator.confusion_matrix)
+        self.pair_statistics.merge(otherResultAggregator.pair_statistics)
+        self.prediction_scores.merge(otherResultAggregator.prediction_scores)
+        for dimension, other_breakdown in otherResultAggregator.breakdowns.items():
+            if dimension not in self.breakdowns:
+                self.breakdowns[dimension] = other_breakdown.copy_empty()
+            self.breakdowns[dimension].merge(other_breakdown)
+        if otherResultAggregator.heavy_hitters is not None:
+            if self.heavy_hitters is None:
+                self.heavy_hitters = HeavyHitters(otherResultAggregator.heavy_hitters.capacity)
+            self.heavy_hitters.merge(otherResultAggregator.heavy_hitters)
+
+        self.recalculate_metrics_for_all_scorecards()
+
+    def to_bytes(self) -> bytes:
+        """Serializes the counts, confusion matrix and a compact table of the examples (types and bounds
+        of the spans, without their tokens) into a binary snapshot. Refer ResultSnapshot.
+        """
+        from .result_snapshot import ResultSnapshot
+        return ResultSnapshot.from_result_aggregator(self).to_bytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> ResultAggregator:
+        """Loads a result aggregator from a binary snapshot created by `to_bytes`.
+        """
+        from .result_snapshot import ResultSnapshot
+        return ResultSnapshot.from_bytes(data).to_result_aggregator()
 
     # Scenario I
     def add_type_match_bounds_match(self, gold_span: Span, pred_span: Span) -> None:
@@ -73,12 +223,18 @@ class ResultAggregator:
         self.partial_match.correct.append(GoldPredictedPair(gold_span, pred_span))
         self.bounds_match.correct.append(GoldPredictedPair(gold_span, pred_span))
 
+        self.confusion_matrix.add(gold_span.span_type, pred_span.span_type)
+        self.pair_statistics.add_pair(gold_span, pred_span)
+        self.prediction_scores.add('type_match_bounds_match', pred_span)
+        for breakdown in self.breakdowns.values():
+            breakdown.add('type_match_bounds_match', gold_span)
+
         self.recalculate_metrics_for_all_scorecards()
 
     # Scenario II
 
     def add_unecessary_predicted_span(self, uncessary_pred_span: Span) -> None:
-        """Add wrongly predicted span to the Scenario II aggregate: predicted 
+        """Add wrongly predicted span to the Scenario II aggregate: predicted
            span doesn't exist in golden dataset.
 
         Args:
@@ -92,11 +248,20 @@ class ResultAggregator:
         self.partial_match.spurious.append(uncessary_pred_span)
         self.bounds_match.spurious.append(uncessary_pred_span)
 
+        self.confusion_matrix.add_spurious(uncessary_pred_span.span_type)
+        self.pair_statistics.add_spurious()
+        self.prediction_scores.add('unecessary_predicted_span', uncessary_pred_span)
+        for breakdown in self.breakdowns.values():
+            breakdown.add('unecessary_predicted_span', uncessary_pred_span)
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.add(('unecessary_predicted_span', None, uncessary_pred_span.span_type,
+                                    surface_form(uncessary_pred_span)))
+
         self.recalculate_metrics_for_all_scorecards()
 
     # Scenario III
     def add_missed_gold_span(self, missed_gold_span: Span) -> None:
-        """Add missed span to Scenario III aggregate: missed span that 
+        """Add missed span to Scenario III aggregate: missed span that
             wasn't predicted
 
         Args:
@@ -110,11 +275,20 @@ class ResultAggregator:
         self.partial_match.missed.append(missed_gold_span)
         self.bounds_match.missed.append(missed_gold_span)
 
+        self.confusion_matrix.add_missed(missed_gold_span.span_type)
+        self.pair_statistics.add_missed()
+        self.prediction_scores.add_missed()
+        for breakdown in self.breakdowns.values():
+            breakdown.add('missed_gold_span', missed_gold_span)
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.add(('missed_gold_span', missed_gold_span.span_type, None,
+                                    surface_form(missed_gold_span)))
+
         self.recalculate_metrics_for_all_scorecards()
 
     # Scenario IV
     def add_type_mismatch_bounds_match(self, gold_span: Span, pred_span: Span) -> None:
-        """Add Gold and predicted pair for which bounds were predicted correctly but the 
+        """Add Gold and predicted pair for which bounds were predicted correctly but the
           type was incorrect.
 
         Args:
@@ -131,18 +305,27 @@ class ResultAggregator:
         self.partial_match.correct.append(GoldPredictedPair(gold_span, pred_span))
         self.bounds_match.correct.append(GoldPredictedPair(gold_span, pred_span))
 
+        self.confusion_matrix.add(gold_span.span_type, pred_span.span_type)
+        self.pair_statistics.add_pair(gold_span, pred_span)
+        self.prediction_scores.add('type_mismatch_bounds_match', pred_span)
+        for breakdown in self.breakdowns.values():
+            breakdown.add('type_mismatch_bounds_match', gold_span)
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.add(('type_mismatch_bounds_match', gold_span.span_type, pred_span.span_type,
+                                    surface_form(gold_span)))
+
         self.recalculate_metrics_for_all_scorecards()
 
     # Scenario V
     def add_type_match_bounds_partial(self, gold_span: Span, pred_span: Span) -> None:
-        """Add Gold and predicted span pair for which bounds were predicted partially correctly whereas the 
-             type was predicted correctly. 
+        """Add Gold and predicted span pair for which bounds were predicted partially correctly whereas the
+             type was predicted correctly.
 
         Args:
             gold_span (Span): Gold span for which bounds were predicted partially correctly
-                whereas the type was predicted correctly. 
+                whereas the type was predicted correctly.
             pred_span (Span): Predicted span for which bounds were predicted partially correctly
-                whereas the type was predicted correctly. 
+                whereas the type was predicted correctly.
         """
 
         self.type_match_bounds_partial.append(GoldPredictedPair(gold_span, pred_span))
@@ -152,6 +335,15 @@ class ResultAggregator:
         self.partial_match.partial.append(GoldPredictedPair(gold_span, pred_span))
         self.bounds_match.incorrect.append(GoldPredictedPair(gold_span, pred_span))
 
+        self.confusion_matrix.add(gold_span.span_type, pred_span.span_type)
+        self.pair_statistics.add_pair(gold_span, pred_span)
+        self.prediction_scores.add('type_match_bounds_partial', pred_span)
+        for breakdown in self.breakdowns.values():
+            breakdown.add('type_match_bounds_partial', gold_span)
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.add(('type_match_bounds_partial', gold_span.span_type, pred_span.span_type,
+                                    surface_form(gold_span)))
+
         self.recalculate_metrics_for_all_scorecards()
 
     # Scenario VI
@@ -161,9 +353,9 @@ class ResultAggregator:
 
         Args:
             gold_span (Span): Gold span for which bounds were predicted partially correctly
-                whereas the type was predicted incorrectly. 
+                whereas the type was predicted incorrectly.
             pred_span (Span): Predicted Entity span for which bounds were predicted partially correctly
-                whereas the type was predicted incorrectly. 
+                whereas the type was predicted incorrectly.
         """
 
         self.type_mismatch_bounds_partial.append(
@@ -174,10 +366,19 @@ class ResultAggregator:
         self.partial_match.partial.append(GoldPredictedPair(gold_span, pred_span))
         self.bounds_match.incorrect.append(GoldPredictedPair(gold_span, pred_span))
 
+        self.confusion_matrix.add(gold_span.span_type, pred_span.span_type)
+        self.pair_statistics.add_pair(gold_span, pred_span)
+        self.prediction_scores.add('type_mismatch_bounds_partial', pred_span)
+        for breakdown in self.breakdowns.values():
+            breakdown.add('type_mismatch_bounds_partial', gold_span)
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.add(('type_mismatch_bounds_partial', gold_span.span_type, pred_span.span_type,
+                                    surface_form(gold_span)))
+
         self.recalculate_metrics_for_all_scorecards()
 
     def recalculate_metrics_for_all_scorecards(self) -> None:
         """Recalculates the metrics for all scorecards in the results aggregator.
         """
         for scoreCard in [self.strict_match, self.type_match, self.partial_match, self.bounds_match]:
-            scoreCard.recalculate_metrics()
\ No newline at end of file
+            scoreCard.recalculate_metrics()
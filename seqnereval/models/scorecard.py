@@ -1,5 +1,8 @@
 from __future__ import annotations
 from typing import Dict
+
+from .reservoir import example_count
+
 class ScoreCard:
     def __init__(self, is_partial_or_type_scorecard=False):
         self.correct = []
@@ -18,63 +21,83 @@ class ScoreCard:
 
     def get_score_counts(self) -> Dict[str, int]:
         return {
-            "correct_counts": len(self.correct),
-            "incorrect_counts": len(self.incorrect),
-            "partial_counts": len(self.partial),
-            "missed_counts": len(self.missed),
-            "spurious_counts": len(self.spurious)
+            "correct_counts": example_count(self.correct),
+            "incorrect_counts": example_count(self.incorrect),
+            "partial_counts": example_count(self.partial),
+            "missed_counts": example_count(self.missed),
+            "spurious_counts": example_count(self.spurious)
         }
 
     def get_summary(self) -> Dict[str, int]:
         return {
             **self.get_score_counts(),
-            "possible": 0,
-            "actual": 0,
-            "precision": 0,
-            "recall": 0,
-            "f1": 0,
+            "possible": self.possible,
+            "actual": self.actual,
+            "precision": self.precision,
+            "recall": self.recall,
+            "f1": self.f1,
         }
 
-    def __compute_actual_possible(self) -> None:
-        """Calculates the number of the actual and possible
-        """
-        scorecard_counts = self.get_score_counts()
-
-        correct = scorecard_counts["correct_counts"]
-        incorrect = scorecard_counts["incorrect_counts"]
-        partial = scorecard_counts["partial_counts"]
-        missed = scorecard_counts["missed_counts"]
-        spurious = scorecard_counts["spurious_counts"]
-
-        self.possible = correct + incorrect + partial + missed
-        self.actual = correct + incorrect + partial + spurious
-
-    def recalculate_metrics(self) -> None:
-        """Compute precision and recall for the results dictionary.
+    @staticmethod
+    def summarize_counts(correct: float, incorrect: float, partial: float, missed: float, spurious: float,
+                         is_partial_or_type_scorecard=False) -> Dict[str, float]:
+        """Computes the summary of a scorecard from its counts alone.
 
         Args:
-            partial_or_type (bool, optional): [description]. Defaults to False.
+            correct (float): # of correct (COR) spans.
+            incorrect (float): # of incorrect (INC) spans.
+            partial (float): # of partially correct (PAR) spans.
+            missed (float): # of missed (MIS) spans.
+            spurious (float): # of spurious (SPU) spans.
+            is_partial_or_type_scorecard (bool, optional): whether partial spans get half the credit. Defaults to False.
+
+        Returns:
+            Dict[str, float]: counts along with possible, actual, precision, recall and f1.
         """
+        possible = correct + incorrect + partial + missed
+        actual = correct + incorrect + partial + spurious
 
-        self.__compute_actual_possible()
+        if is_partial_or_type_scorecard:
+            precision = (correct + 0.5 * partial) / actual if actual > 0 else 0
+            recall = (correct + 0.5 * partial) / possible if possible > 0 else 0
+        else:
+            precision = correct / actual if actual > 0 else 0
+            recall = correct / possible if possible > 0 else 0
 
-        partial_count = len(self.partial)
-        correct_count = len(self.correct)
+        f1 = (
+            2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+        )
 
-        if self.is_partial_or_type_scorecard:
-            self.precision = (correct_count + 0.5 * partial_count) / \
-                self.actual if self.actual > 0 else 0
-            self.recall = (correct_count + 0.5 * partial_count) / \
-                self.possible if self.possible > 0 else 0
+        return {
+            "correct_counts": correct,
+            "incorrect_counts": incorrect,
+            "partial_counts": partial,
+            "missed_counts": missed,
+            "spurious_counts": spurious,
+            "possible": possible,
+            "actual": actual,
+            "precision": precision,
+            "recall": recall,
+            "f1": f1,
+        }
 
-        else:
-            self.precision = correct_count / self.actual if self.actual > 0 else 0
-            self.recall = correct_count / self.possible if self.possible > 0 else 0
+    def recalculate_metrics(self) -> None:
+        """Compute precision and recall for the results dictionary.
+        """
+        scorecard_counts = self.get_score_counts()
 
-        self.f1 = (
-            2 * (self.precision * self.recall) / (self.precision +
-                                                  self.recall) if (self.precision + self.recall) > 0 else 0
-        )
+        summary = ScoreCard.summarize_counts(scorecard_counts["correct_counts"],
+                                             scorecard_counts["incorrect_counts"],
+                                             scorecard_counts["partial_counts"],
+                                             scorecard_counts["missed_counts"],
+                                             scorecard_counts["spurious_counts"],
+                                             self.is_partial_or_type_scorecard)
+
+        self.possible = summary["possible"]
+        self.actual = summary["actual"]
+        self.precision = summary["precision"]
+        self.recall = summary["recall"]
+        self.f1 = summary["f1"]
 
     def mergeScoreCard(self, scoreCardToMerge: ScoreCard) -> None:
         """Merges other scorecard into self.
@@ -2,12 +2,16 @@ from __future__ import annotations
 from typing import List
 
 class Span:
+    # confidence of a predicted span, only set on the instance when provided.
+    score = None
+
     def __init__(self,
                  span_type: str,
                  start_idx: int, 
                  end_idx: int, 
                  spanned_tokens: List[str] = None, 
-                 span_context: List[str] = None):
+                 span_context: List[str] = None,
+                 score: float = None):
         """
         Construct a new Span.
 
@@ -18,6 +22,7 @@ class Span:
             spanned_tokens [optional, default = []] (List[str]): list of tokens spanned by the span.
             span_context [optional, default = spanned_tokens] (List[str]): list of tokens spanned by the span + 
                                         some surrounding tokens for context.
+            score [optional, default = None] (float): confidence of the model in a predicted span.
         """
 
         self.span_type = span_type 
@@ -28,6 +33,8 @@ class Span:
             self.span_context = self.spanned_tokens
         else:
             self.span_context = span_context
+        if score is not None:
+            self.score = score
 
     def __str__(self):
         return (f'(Type: "{self.span_type}", Token Span IDX:({self.start_idx},'
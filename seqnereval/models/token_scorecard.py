@@ -0,0 +1,128 @@
+from __future__ import annotations
+from typing import Dict, List
+
+
+class TokenScoreCard:
+    """Token level counterpart of the ScoreCard.
+
+    Keeps the number of correctly tagged tokens along with per-tag true positive,
+    false positive and false negative counts. Tags are the entity types obtained
+    by dropping the scheme prefix of a token tag (e.g. 'B-PER' -> 'PER'), tokens
+    tagged 'O' only contribute to the accuracy.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor for TokenScoreCard
+        """
+        self.tags: List[str] = []
+        self.tag_ids: Dict[str, int] = {}
+
+        self.true_positives: List[int] = []
+        self.false_positives: List[int] = []
+        self.false_negatives: List[int] = []
+
+        self.correct = 0
+        self.total = 0
+
+    def intern_tag(self, tag: str) -> int:
+        """Returns the id of the tag, allocating counters if the tag is new.
+
+        Args:
+            tag (str): entity type of a token.
+
+        Returns:
+            int: id of the tag.
+        """
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tags)
+            self.tags.append(tag)
+            self.tag_ids[tag] = tag_id
+            self.true_positives.append(0)
+            self.false_positives.append(0)
+            self.false_negatives.append(0)
+        return tag_id
+
+    def add(self, gold_token_tag: str, pred_token_tag: str) -> None:
+        """Scores the tag predicted for a single token.
+
+        Args:
+            gold_token_tag (str): gold tag of the token e.g. 'B-PER'.
+            pred_token_tag (str): predicted tag of the token e.g. 'I-PER'.
+        """
+        self.total += 1
+        if gold_token_tag == pred_token_tag:
+            self.correct += 1
+
+        gold_tag = gold_token_tag[2:] if gold_token_tag != 'O' else None
+        pred_tag = pred_token_tag[2:] if pred_token_tag != 'O' else None
+
+        if gold_tag == pred_tag:
+            if gold_tag is not None:
+                self.true_positives[self.intern_tag(gold_tag)] += 1
+            return
+
+        if gold_tag is not None:
+            self.false_negatives[self.intern_tag(gold_tag)] += 1
+        if pred_tag is not None:
+            self.false_positives[self.intern_tag(pred_tag)] += 1
+
+    def merge(self, other: TokenScoreCard) -> None:
+        """Merges other token scorecard into self.
+
+        Args:
+            other (TokenScoreCard): token scorecard to be merged.
+        """
+        for other_tag_id, tag in enumerate(other.tags):
+            tag_id = self.intern_tag(tag)
+            self.true_positives[tag_id] += other.true_positives[other_tag_id]
+            self.false_positives[tag_id] += other.false_positives[other_tag_id]
+            self.false_negatives[tag_id] += other.false_negatives[other_tag_id]
+
+        self.correct += other.correct
+        self.total += other.total
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.total if self.total > 0 else 0
+
+    def get_tag_summary(self, tag: str) -> Dict[str, float]:
+        """Computes token level precision, recall and f1 for a tag.
+
+        Args:
+            tag (str): entity type e.g. 'PER'.
+
+        Returns:
+            Dict[str, float]: counts and metrics for the tag.
+        """
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is None:
+            true_positives, false_positives, false_negatives = 0, 0, 0
+        else:
+            true_positives = self.true_positives[tag_id]
+            false_positives = self.false_positives[tag_id]
+            false_negatives = self.false_negatives[tag_id]
+
+        predicted = true_positives + false_positives
+        expected = true_positives + false_negatives
+        precision = true_positives / predicted if predicted > 0 else 0
+        recall = true_positives / expected if expected > 0 else 0
+        f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
+
+        return {
+            "true_positives": true_positives,
+            "false_positives": false_positives,
+            "false_negatives": false_negatives,
+            "precision": precision,
+            "recall": recall,
+            "f1": f1,
+        }
+
+    def get_summary(self) -> Dict[str, object]:
+        return {
+            "correct": self.correct,
+            "total": self.total,
+            "accuracy": self.accuracy,
+            "tags": {tag: self.get_tag_summary(tag) for tag in self.tags},
+        }
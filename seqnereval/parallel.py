@@ -0,0 +1,227 @@
+from __future__ import annotations
+import os
+import time
+from array import array
+from multiprocessing import Pool, shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .decoder import TagScheme, get_decoder
+from .evaluator import NEREvaluator
+from .matching import count_decoded_spans
+from .models import ConfusionMatrix, CountAggregator, ResultSnapshot, Span
+from .scheduling import add_worker_timing, largest_first, pack_document_ranges, tag_list_cost
+from .streaming import BatchResult
+
+OFFSET_SIZE = array('q').itemsize
+TAG_ID_SIZE = array('i').itemsize
+
+
+class SharedTagArrays:
+    """Gold and predicted tags of a corpus encoded to tag ids once and laid out in a single shared memory block,
+    so worker processes can decode and match any range of documents without the tags being pickled.
+
+    Layout: document offsets (int64, # of documents + 1) | gold tag ids (int32) | predicted tag ids (int32).
+
+    Example:
+        >>> with SharedTagArrays(gold_tag_lists, pred_tag_lists, 'BIO') as tag_arrays:
+        ...     batch_result = evaluate_shared(tag_arrays, jobs=32)
+    """
+
+    def __init__(self, gold_tag_lists: Sequence[Sequence[str]], pred_tag_lists: Sequence[Sequence[str]],
+                 tag_scheme: str = 'lenient'):
+        """
+        Constructor for SharedTagArrays
+
+        Args:
+            gold_tag_lists (Sequence[Sequence[str]]): List of golden tag lists for different documents.
+            pred_tag_lists (Sequence[Sequence[str]]): List of predicted tag lists for different documents.
+            tag_scheme (str, optional): decoding scheme of the tags, refer `DECODERS`. Defaults to 'lenient'.
+        """
+        if len(gold_tag_lists) != len(pred_tag_lists):
+            raise Exception('Exception: Number of gold and predicted tag lists are not the same.')
+
+        self.tag_scheme: TagScheme = get_decoder(tag_scheme)
+        offsets = array('q', [0])
+        gold_tag_ids, pred_tag_ids = array('i'), array('i')
+        # estimated cost of every document, refer `tag_list_cost`.
+        self.costs = array('q')
+        for doc_idx, (gold_tag_list, pred_tag_list) in enumerate(zip(gold_tag_lists, pred_tag_lists)):
+            if len(gold_tag_list) != len(pred_tag_list):
+                raise Exception(
+                    f'Exception: Number of gold and predicted tags are not the same in document #{doc_idx}.')
+            gold_tag_ids.extend(self.tag_scheme.encode(gold_tag_list))
+            pred_tag_ids.extend(self.tag_scheme.encode(pred_tag_list))
+            offsets.append(len(gold_tag_ids))
+            self.costs.append(tag_list_cost(gold_tag_list, pred_tag_list))
+
+        self.offsets = offsets
+        self.document_count = len(offsets) - 1
+        self.token_count = len(gold_tag_ids)
+        # SharedMemory can't be empty.
+        self.shared_memory = shared_memory.SharedMemory(create=True, size=max(1, self.__size()))
+        try:
+            offsets_view, gold_view, pred_view = self.views(self.shared_memory, self.document_count, self.token_count)
+            offsets_view[:] = offsets
+            gold_view[:] = gold_tag_ids
+            pred_view[:] = pred_tag_ids
+            for view in (offsets_view, gold_view, pred_view):
+                view.release()
+        except BaseException:
+            self.close()
+            raise
+
+    def __size(self) -> int:
+        return OFFSET_SIZE * (self.document_count + 1) + 2 * TAG_ID_SIZE * self.token_count
+
+    @staticmethod
+    def views(block: shared_memory.SharedMemory, document_count: int,
+              token_count: int) -> Tuple[memoryview, memoryview, memoryview]:
+        """Offsets, gold and predicted tag id arrays over a shared memory block, without copying.
+        The views have to be released before the block is closed.
+        """
+        gold_start = OFFSET_SIZE * (document_count + 1)
+        pred_start = gold_start + TAG_ID_SIZE * token_count
+        return (block.buf[:gold_start].cast('q'),
+                block.buf[gold_start:pred_start].cast('i'),
+                block.buf[pred_start:pred_start + TAG_ID_SIZE * token_count].cast('i'))
+
+    def document_ranges(self, chunk_cost: int) -> List[Tuple[int, int]]:
+        """Packs the documents into ranges of consecutive documents costing about `chunk_cost`,
+        refer `pack_document_ranges`.
+        """
+        return pack_document_ranges(self.costs, chunk_cost)
+
+    def close(self) -> None:
+        """Frees the shared memory block.
+        """
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+
+    def __enter__(self) -> SharedTagArrays:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def evaluate_tag_id_range(offsets: Sequence[int], gold_tag_ids: Sequence[int], pred_tag_ids: Sequence[int],
+                          tag_scheme: TagScheme, doc_start: int, doc_end: int,
+                          counts_only: bool = True) -> Tuple[CountAggregator, ConfusionMatrix, Optional[bytes]]:
+    """Decodes and matches the tag ids of the documents in [doc_start, doc_end), the counts only are matched
+    straight from the decoded (type, start_idx, end_idx) tuples (refer `count_decoded_spans`).
+
+    Returns:
+        Tuple[CountAggregator, ConfusionMatrix, Optional[bytes]]: counts, confusion matrix and, unless counts_only,
+            the ResultSnapshot (examples without tokens) of the documents.
+    """
+    if counts_only:
+        counts, confusion_matrix = CountAggregator(), ConfusionMatrix()
+        for doc_idx in range(doc_start, doc_end):
+            token_start, token_end = offsets[doc_idx], offsets[doc_idx + 1]
+            count_decoded_spans(tag_scheme.decode_ids(gold_tag_ids[token_start:token_end])[0],
+                                tag_scheme.decode_ids(pred_tag_ids[token_start:token_end])[0],
+                                counts, confusion_matrix)
+        return counts, confusion_matrix, None
+
+    gold_span_lists, pred_span_lists, doc_lengths = [], [], []
+    for doc_idx in range(doc_start, doc_end):
+        token_start, token_end = offsets[doc_idx], offsets[doc_idx + 1]
+        gold_spans, _ = tag_scheme.decode_ids(gold_tag_ids[token_start:token_end])
+        pred_spans, _ = tag_scheme.decode_ids(pred_tag_ids[token_start:token_end])
+        gold_span_lists.append([Span(span_type, start_idx, end_idx) for span_type, start_idx, end_idx in gold_spans])
+        pred_span_lists.append([Span(span_type, start_idx, end_idx) for span_type, start_idx, end_idx in pred_spans])
+        doc_lengths.append(token_end - token_start)
+
+    results, results_grouped_by_tags = NEREvaluator(gold_span_lists, pred_span_lists, doc_lengths=doc_lengths).evaluate()
+    return (CountAggregator.from_results_grouped_by_tags(results_grouped_by_tags),
+            results.confusion_matrix,
+            results.to_bytes())
+
+
+# shared memory block and tag scheme of a worker process, attached once by `_attach_worker`.
+_worker_state = None
+
+
+def _attach_worker(shared_memory_name: str, document_count: int, token_count: int, tag_scheme: TagScheme) -> None:
+    global _worker_state
+    _worker_state = (shared_memory.SharedMemory(name=shared_memory_name), document_count, token_count, tag_scheme)
+
+
+def _evaluate_shared_range(args: Tuple[int, int, bool]) -> Tuple[CountAggregator, ConfusionMatrix, Optional[bytes],
+                                                                 int, float]:
+    start_time = time.perf_counter()
+    block, document_count, token_count, tag_scheme = _worker_state
+    views = SharedTagArrays.views(block, document_count, token_count)
+    try:
+        return (*evaluate_tag_id_range(*views, tag_scheme, *args), os.getpid(), time.perf_counter() - start_time)
+    finally:
+        for view in views:
+            view.release()
+
+
+def evaluate_shared(tag_arrays: SharedTagArrays, jobs: int = 1, counts_only: bool = True,
+                    ranges_per_job: int = 4, chunk_cost: Optional[int] = None) -> BatchResult:
+    """Evaluates the documents of shared tag arrays, packed into ranges of about the same cost that are
+    decoded and matched by worker processes reading the tag ids straight from the shared memory block.
+    The ranges are handed out largest first as the workers free up and their results are merged in document
+    order, so the results don't depend on the scheduling. Only the counts, the confusion matrix and the
+    compact snapshot of the examples of every range are sent back.
+
+    Args:
+        tag_arrays (SharedTagArrays): encoded tags of the documents.
+        jobs (int, optional): # of worker processes. Defaults to 1.
+        counts_only (bool, optional): only return the counts and not the examples. Defaults to True.
+        ranges_per_job (int, optional): # of document ranges per worker, more ranges balance the load better.
+            Defaults to 4.
+        chunk_cost (int, optional): target cost of a range (refer `tag_list_cost`), overrides ranges_per_job.
+            Defaults to None.
+
+    Returns:
+        BatchResult: results of the documents, `results` holds the examples without their tokens (refer
+            ResultSnapshot), the per tag counts are only in `counts`. `worker_timings` holds the ranges, documents,
+            tokens and seconds of every worker process.
+    """
+    if chunk_cost is None:
+        chunk_cost = max(1, -(-sum(tag_arrays.costs) // max(1, jobs * ranges_per_job)))
+    document_ranges = tag_arrays.document_ranges(chunk_cost)
+    schedule = largest_first([sum(tag_arrays.costs[start:end]) for start, end in document_ranges])
+
+    range_results = [None] * len(document_ranges)
+    if jobs > 1:
+        with Pool(jobs, _attach_worker, (tag_arrays.shared_memory.name, tag_arrays.document_count,
+                                         tag_arrays.token_count, tag_arrays.tag_scheme)) as pool:
+            range_args = [(*document_ranges[range_idx], counts_only) for range_idx in schedule]
+            for range_idx, range_result in zip(schedule, pool.imap(_evaluate_shared_range, range_args)):
+                range_results[range_idx] = range_result
+    else:
+        views = SharedTagArrays.views(tag_arrays.shared_memory, tag_arrays.document_count, tag_arrays.token_count)
+        try:
+            for range_idx in schedule:
+                start_time = time.perf_counter()
+                range_results[range_idx] = (
+                    *evaluate_tag_id_range(*views, tag_arrays.tag_scheme, *document_ranges[range_idx], counts_only),
+                    os.getpid(), time.perf_counter() - start_time)
+        finally:
+            for view in views:
+                view.release()
+
+    counts = CountAggregator()
+    confusion_matrix = ConfusionMatrix()
+    snapshot = None if counts_only else ResultSnapshot()
+    worker_timings: Dict[int, Dict[str, float]] = {}
+    # merged in document order whatever order the ranges were evaluated in.
+    for (start, end), (range_counts, range_confusion_matrix, range_snapshot, worker_id, seconds) in zip(
+            document_ranges, range_results):
+        counts.append_count_aggregator(range_counts)
+        confusion_matrix.merge(range_confusion_matrix)
+        if snapshot is not None:
+            snapshot.merge(ResultSnapshot.from_bytes(range_snapshot))
+        add_worker_timing(worker_timings, worker_id, end - start,
+                          tag_arrays.offsets[end] - tag_arrays.offsets[start], seconds)
+
+    return BatchResult(counts, confusion_matrix,
+                       None if counts_only else snapshot.to_result_aggregator(),
+                       None,
+                       tag_arrays.document_count,
+                       tag_arrays.token_count,
+                       worker_timings=worker_timings)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+
+
+def document_cost(token_count: int, entity_token_count: int) -> int:
+    """Estimated cost of evaluating a document, decoding is linear in the tokens and matching in the spans.
+    """
+    return token_count + entity_token_count
+
+
+def tag_list_cost(gold_tag_list: Sequence[str], pred_tag_list: Sequence[str]) -> int:
+    """Estimated cost of evaluating a document from its tags, the tags other than 'O' stand for the spans.
+    """
+    return document_cost(len(gold_tag_list),
+                         len(gold_tag_list) - gold_tag_list.count('O') + len(pred_tag_list) - pred_tag_list.count('O'))
+
+
+def pack_document_ranges(costs: Sequence[int], chunk_cost: int) -> List[Tuple[int, int]]:
+    """Greedily packs consecutive documents into ranges of about `chunk_cost`, a document costing more than
+    `chunk_cost` gets a range of its own.
+
+    Args:
+        costs (Sequence[int]): cost of every document, refer `document_cost`.
+        chunk_cost (int): target cost of a range.
+
+    Returns:
+        List[Tuple[int, int]]: [start, end) document indices of the ranges, in document order.
+    """
+    ranges = []
+    range_start, range_cost = 0, 0
+    for doc_idx, cost in enumerate(costs):
+        if doc_idx > range_start and range_cost + cost > chunk_cost:
+            ranges.append((range_start, doc_idx))
+            range_start, range_cost = doc_idx, 0
+        range_cost += cost
+    if range_start < len(costs):
+        ranges.append((range_start, len(costs)))
+    return ranges
+
+
+def largest_first(range_costs: Sequence[int]) -> List[int]:
+    """Indices of the ranges in decreasing order of their cost (ties in document order), handing the largest
+    ranges to the workers first keeps a large range from finishing last (LPT scheduling).
+    """
+    return sorted(range(len(range_costs)), key=lambda range_idx: -range_costs[range_idx])
+
+
+def add_worker_timing(worker_timings: Dict[int, Dict[str, float]], worker_id: int, document_count: int,
+                      token_count: int, seconds: float) -> None:
+    """Adds the time a worker spent on a chunk of documents to the per worker timings.
+    """
+    timing = worker_timings.setdefault(worker_id, {"chunks": 0, "documents": 0, "tokens": 0, "seconds": 0.0})
+    timing["chunks"] += 1
+    timing["documents"] += document_count
+    timing["tokens"] += token_count
+    timing["seconds"] += seconds
+
+
+def merge_worker_timings(worker_timings: Dict[int, Dict[str, float]], other: Dict[int, Dict[str, float]]) -> None:
+    """Merges the per worker timings of other (e.g. of a batch) into worker_timings.
+    """
+    for worker_id, timing in other.items():
+        merged_timing = worker_timings.setdefault(worker_id, {"chunks": 0, "documents": 0, "tokens": 0, "seconds": 0.0})
+        for key, value in timing.items():
+            merged_timing[key] += value
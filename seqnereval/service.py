@@ -0,0 +1,311 @@
+from __future__ import annotations
+import asyncio
+import math
+import time
+from collections import defaultdict
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .evaluator import NERTagListEvaluator
+from .models import ConfusionMatrix, CountAggregator, ResultAggregator, SlidingWindowAggregator
+from .streaming import count_tag_lists
+
+
+def evaluate_document(tokens: Optional[List[str]], gold_tags: List[str], pred_tags: List[str],
+                      entity_context_padding=0, examples_per_category: Optional[int] = None
+                      ) -> Tuple[ResultAggregator, Dict[str, ResultAggregator]]:
+    """Decodes and matches the spans of a single document.
+
+    Defined at the module level so that it can be sent to process pools.
+
+    Args:
+        tokens (List[str], optional): tokens of the document.
+        gold_tags (List[str]): gold tags of the document.
+        pred_tags (List[str]): predicted tags of the document.
+        entity_context_padding (int, optional): # of tokens around a span kept as its context. Defaults to 0.
+        examples_per_category (int, optional): keep a sample of this many spans per category, refer
+            ResultAggregator. Defaults to None.
+
+    Returns:
+        Tuple[ResultAggregator, Dict[str, ResultAggregator]]: (Results, Results Grouped by tags)
+    """
+    if tokens is None:
+        tokens = [None] * len(gold_tags)
+
+    results, results_grouped_by_tags = NERTagListEvaluator(
+        [tokens], [gold_tags], [pred_tags], entity_context_padding,
+        examples_per_category=examples_per_category).evaluate()
+
+    return results, dict(results_grouped_by_tags)
+
+
+def count_document(tokens: Optional[List[str]], gold_tags: List[str],
+                   pred_tags: List[str]) -> Tuple[CountAggregator, ConfusionMatrix]:
+    """Counts the scenarios (per tag) and the confusion matrix of a single document without creating any span,
+    refer `count_tag_lists`.
+
+    Defined at the module level so that it can be sent to process pools.
+    """
+    if tokens is None:
+        tokens = [None] * len(gold_tags)
+
+    return count_tag_lists([tokens], [gold_tags], [pred_tags])
+
+
+class EvaluationService:
+    """Asyncio based service keeping NER metrics up to date for a stream of annotated documents.
+
+    Documents are put on an async queue, decoded and matched in an executor and the results are merged
+    into the running aggregators from the event loop, so snapshots can be taken at any time without
+    locking and without blocking ingestion. Only the counts are kept unless `examples_per_category` is set,
+    so the memory used doesn't grow with the # of documents.
+
+    Example:
+        >>> async with EvaluationService(window_seconds=3600) as service:
+        ...     await service.submit(gold_tags, pred_tags, tokens)
+        ...     await service.join()
+        ...     print(service.snapshot()["window"])
+    """
+
+    def __init__(self,
+                 executor: Optional[Executor] = None,
+                 worker_count: int = 1,
+                 window_seconds: Optional[float] = None,
+                 decay_half_life_seconds: Optional[float] = None,
+                 entity_context_padding: int = 0,
+                 max_queue_size: int = 0,
+                 clock: Callable[[], float] = time.time,
+                 examples_per_category: Optional[int] = None,
+                 window_bucket_count: int = 60):
+        """
+        Constructor for EvaluationService
+
+        Args:
+            executor (Executor, optional): executor the documents are evaluated in, e.g. a ProcessPoolExecutor.
+                Defaults to the default executor of the event loop.
+            worker_count (int, optional): # of documents evaluated concurrently. Defaults to 1.
+            window_seconds (float, optional): if set, metrics over the documents received in the last
+                `window_seconds` are kept as well, in `window_bucket_count` buckets of `window_seconds /
+                window_bucket_count` seconds each (the window moves a bucket at a time).
+            decay_half_life_seconds (float, optional): if set, exponentially decayed metrics, in which a document
+                weighs half as much every `decay_half_life_seconds`, are kept as well.
+            entity_context_padding (int, optional): # of tokens around a span kept as its context. Defaults to 0.
+            max_queue_size (int, optional): # of documents that can wait in the queue, `submit` waits for
+                free space once it is full. Defaults to 0 (unbounded).
+            clock (Callable[[], float], optional): source of the timestamps in seconds. Defaults to time.time.
+            examples_per_category (int, optional): if set, a uniform sample of this many spans per category is
+                kept in `results` and `results_grouped_by_tags` along with the counts, refer ResultAggregator.
+                Defaults to None i.e. only the counts are kept.
+            window_bucket_count (int, optional): # of buckets of the window. Defaults to 60.
+        """
+        self.executor = executor
+        self.worker_count = worker_count
+        self.window_seconds = window_seconds
+        self.decay_half_life_seconds = decay_half_life_seconds
+        self.entity_context_padding = entity_context_padding
+        self.max_queue_size = max_queue_size
+        self.clock = clock
+        self.examples_per_category = examples_per_category
+
+        self.counts = CountAggregator()
+        self.confusion_matrix = ConfusionMatrix()
+        self.results = ResultAggregator(examples_per_category=examples_per_category) \
+            if examples_per_category is not None else None
+        self.results_grouped_by_tags: Optional[Dict[str, ResultAggregator]] = defaultdict(
+            lambda: ResultAggregator(examples_per_category=examples_per_category)) \
+            if examples_per_category is not None else None
+        self.documents_processed = 0
+        self.documents_failed = 0
+        self.last_exception: Optional[BaseException] = None
+
+        self.window = SlidingWindowAggregator(window_bucket_count) if window_seconds is not None else None
+        # # of documents in every bucket of the window, and the period (timestamp // bucket duration)
+        # of the current bucket.
+        self.__window_document_counts = [0] * window_bucket_count
+        self.__window_period: Optional[int] = None
+
+        self.__decayed_counts = self.__empty_scenario_counts()
+        self.__decayed_counts_grouped_by_tags = defaultdict(self.__empty_scenario_counts)
+        self.__decayed_at: Optional[float] = None
+
+        self.__queue: Optional[asyncio.Queue] = None
+        self.__workers: List[asyncio.Task] = []
+
+    @staticmethod
+    def __empty_scenario_counts() -> Dict[str, float]:
+        return {scenario: 0 for scenario in ResultAggregator.SCENARIOS}
+
+    async def start(self) -> None:
+        """Starts the workers consuming the queue.
+        """
+        if self.__queue is not None:
+            raise Exception('Exception: The evaluation service is already running.')
+
+        self.__queue = asyncio.Queue(self.max_queue_size)
+        self.__workers = [asyncio.create_task(self.__worker()) for _ in range(self.worker_count)]
+
+    async def stop(self) -> None:
+        """Waits for the queued documents to be evaluated and stops the workers.
+        """
+        if self.__queue is None:
+            return
+
+        await self.__queue.join()
+        for worker in self.__workers:
+            worker.cancel()
+        await asyncio.gather(*self.__workers, return_exceptions=True)
+
+        self.__queue = None
+        self.__workers = []
+
+    async def __aenter__(self) -> EvaluationService:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def submit(self, gold_tags: List[str], pred_tags: List[str], tokens: Optional[List[str]] = None,
+                     timestamp: Optional[float] = None) -> None:
+        """Queues an annotated document for evaluation, waits if the queue is full.
+
+        Args:
+            gold_tags (List[str]): gold tags of the document.
+            pred_tags (List[str]): predicted tags of the document.
+            tokens (List[str], optional): tokens of the document, used for the span tokens and context.
+            timestamp (float, optional): time the document was received at. Defaults to the time of submission.
+        """
+        if self.__queue is None:
+            raise Exception('Exception: The evaluation service is not running.')
+
+        await self.__queue.put((self.clock() if timestamp is None else timestamp, tokens, gold_tags, pred_tags))
+
+    async def join(self) -> None:
+        """Waits until all the documents submitted so far are evaluated.
+        """
+        if self.__queue is not None:
+            await self.__queue.join()
+
+    async def __worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            timestamp, tokens, gold_tags, pred_tags = await self.__queue.get()
+            try:
+                if self.examples_per_category is None:
+                    doc_counts, doc_confusion_matrix = await loop.run_in_executor(
+                        self.executor, count_document, tokens, gold_tags, pred_tags)
+                else:
+                    doc_results, doc_results_grouped_by_tags = await loop.run_in_executor(
+                        self.executor, evaluate_document, tokens, gold_tags, pred_tags, self.entity_context_padding,
+                        self.examples_per_category)
+                    doc_counts = CountAggregator.from_results_grouped_by_tags(doc_results_grouped_by_tags)
+                    doc_confusion_matrix = doc_results.confusion_matrix
+                    self.results.append_result_aggregator(doc_results)
+                    for tag, results_for_tag in doc_results_grouped_by_tags.items():
+                        self.results_grouped_by_tags[tag].append_result_aggregator(results_for_tag)
+                self.__add_document_counts(timestamp, doc_counts, doc_confusion_matrix)
+            except Exception as e:
+                self.documents_failed += 1
+                self.last_exception = e
+            finally:
+                self.__queue.task_done()
+
+    def __add_document_counts(self, timestamp: float, doc_counts: CountAggregator,
+                              doc_confusion_matrix: ConfusionMatrix) -> None:
+        """Merges the counts of a document into the running, windowed and decayed counts.
+        """
+        self.counts.append_count_aggregator(doc_counts)
+        self.confusion_matrix.merge(doc_confusion_matrix)
+        self.documents_processed += 1
+
+        if self.window is not None:
+            # documents may arrive out of order, a late document is added to the bucket of its timestamp
+            # and one older than the window is left out of it.
+            period = self.__get_window_period(timestamp)
+            self.__move_window(period)
+            age = self.__window_period - period
+            if age < self.window.bucket_count:
+                self.window.add(doc_counts, age)
+                self.__window_document_counts[(self.window.current_bucket_idx - age) % self.window.bucket_count] += 1
+
+        if self.decay_half_life_seconds is not None:
+            scenario_counts = doc_counts.get_scenario_counts()
+            scenario_counts_grouped_by_tags = {tag: doc_counts.get_scenario_counts(tag) for tag in doc_counts.tags}
+            self.__decay_counts(max(timestamp, self.__decayed_at or timestamp))
+            weight = 0.5 ** ((self.__decayed_at - timestamp) / self.decay_half_life_seconds)
+            self.__add_counts(self.__decayed_counts, self.__decayed_counts_grouped_by_tags,
+                              scenario_counts, scenario_counts_grouped_by_tags, weight)
+
+    @staticmethod
+    def __add_counts(counts: Dict[str, float], counts_grouped_by_tags: Dict[str, Dict[str, float]],
+                     counts_to_add: Dict[str, int], counts_to_add_grouped_by_tags: Dict[str, Dict[str, int]],
+                     weight: float) -> None:
+        for scenario, count in counts_to_add.items():
+            counts[scenario] += weight * count
+        for tag, counts_to_add_for_tag in counts_to_add_grouped_by_tags.items():
+            counts_for_tag = counts_grouped_by_tags[tag]
+            for scenario, count in counts_to_add_for_tag.items():
+                counts_for_tag[scenario] += weight * count
+
+    def __get_window_period(self, timestamp: float) -> int:
+        return math.floor(timestamp * self.window.bucket_count / self.window_seconds)
+
+    def __move_window(self, period: int) -> None:
+        """Rotates the window until its current bucket is the one of `period`, evicting the expired buckets.
+        """
+        if self.__window_period is None:
+            self.__window_period = period
+        # rotating as many times as there are buckets empties the window.
+        for _ in range(min(period - self.__window_period, self.window.bucket_count)):
+            self.window.rotate()
+            self.__window_document_counts[self.window.current_bucket_idx] = 0
+        self.__window_period = max(self.__window_period, period)
+
+    def __decay_counts(self, now: float) -> None:
+        if self.__decayed_at is not None and now > self.__decayed_at:
+            factor = 0.5 ** ((now - self.__decayed_at) / self.decay_half_life_seconds)
+            for counts in [self.__decayed_counts, *self.__decayed_counts_grouped_by_tags.values()]:
+                for scenario in counts:
+                    counts[scenario] *= factor
+        if self.__decayed_at is None or now > self.__decayed_at:
+            self.__decayed_at = now
+
+    def snapshot(self) -> Dict[str, object]:
+        """Summarizes the metrics of the documents evaluated so far.
+
+        Returns:
+            Dict[str, object]: summaries and scenario counts of all documents ("overall", "by_tags") and their
+                confusion matrix, along with the windowed and decayed summaries ("window", "decayed", None if
+                not enabled).
+        """
+        now = self.clock()
+        snapshot = {
+            "documents_processed": self.documents_processed,
+            "documents_failed": self.documents_failed,
+            "documents_pending": self.__queue.qsize() if self.__queue is not None else 0,
+            "overall": {**self.counts.summarize_result(), **self.counts.get_scenario_counts()},
+            "by_tags": {tag: {**self.counts.summarize_result(tag), **self.counts.get_scenario_counts(tag)}
+                        for tag in self.counts.tags},
+            "confusion_matrix": self.confusion_matrix.to_dict(),
+            "window": None,
+            "decayed": None,
+        }
+
+        if self.window is not None:
+            self.__move_window(self.__get_window_period(now))
+            snapshot["window"] = {
+                "documents": sum(self.__window_document_counts),
+                "overall": self.window.summarize_result(),
+                "by_tags": {tag: self.window.summarize_result(tag) for tag in self.window.window.tags
+                            if any(self.window.window.get_scenario_counts(tag).values())},
+            }
+
+        if self.decay_half_life_seconds is not None:
+            self.__decay_counts(now)
+            snapshot["decayed"] = {
+                "overall": ResultAggregator.summarize_scenario_counts(self.__decayed_counts),
+                "by_tags": {tag: ResultAggregator.summarize_scenario_counts(counts_for_tag)
+                            for tag, counts_for_tag in self.__decayed_counts_grouped_by_tags.items()},
+            }
+
+        return snapshot
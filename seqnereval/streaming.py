@@ -0,0 +1,394 @@
+from __future__ import annotations
+import heapq
+import itertools
+import os
+import queue
+import random
+import time
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .checkpoint import atomic_pickle_dump, pickle_load
+from .decoder import get_decoder
+from .evaluator import NERTagListEvaluator
+from .matching import count_decoded_spans
+from .models import ConfusionMatrix, CountAggregator, HeavyHitters, ResultAggregator
+from .scheduling import add_worker_timing, largest_first, merge_worker_timings, tag_list_cost
+
+# (tokens, gold tags, predicted tags) of a document
+Document = Tuple[List[str], List[str], List[str]]
+
+
+class BatchResult:
+    """Results of evaluating a batch of documents.
+    """
+
+    def __init__(self, counts: CountAggregator, confusion_matrix: ConfusionMatrix,
+                 results: Optional[ResultAggregator], results_grouped_by_tags: Optional[Dict[str, ResultAggregator]],
+                 document_count: int, token_count: int, heavy_hitters: Optional[HeavyHitters] = None,
+                 worker_timings: Optional[Dict[int, Dict[str, float]]] = None):
+        self.counts = counts
+        self.confusion_matrix = confusion_matrix
+        self.results = results
+        self.results_grouped_by_tags = results_grouped_by_tags
+        self.document_count = document_count
+        self.token_count = token_count
+        self.heavy_hitters = heavy_hitters
+        # chunks, documents, tokens and seconds spent by every worker process (keyed by pid) on the batch.
+        self.worker_timings = worker_timings if worker_timings is not None else {}
+
+
+def evaluate_batch(documents: List[Document], entity_context_padding: int = 0, counts_only: bool = False,
+                   examples_per_category: Optional[int] = None,
+                   heavy_hitter_capacity: Optional[int] = None, seed: Optional[int] = None) -> BatchResult:
+    """Evaluates a batch of documents, defined at the module level so that it can be sent to worker processes.
+
+    Args:
+        documents (List[Document]): (tokens, gold tags, predicted tags) of the documents.
+        entity_context_padding (int, optional): # of tokens around a span kept as its context. Defaults to 0.
+        counts_only (bool, optional): only return the counts, the tags are then matched without creating any
+            span unless heavy hitters are tracked. Defaults to False.
+        examples_per_category (int, optional): keep a sample of this many spans per category, refer
+            ResultAggregator. Defaults to None.
+        heavy_hitter_capacity (int, optional): track the most frequent errors with this many counters. Defaults to None.
+        seed (int, optional): seed of the generator the examples are sampled with. Defaults to None.
+
+    Returns:
+        BatchResult: results of the batch.
+    """
+    start_time = time.perf_counter()
+    tokens, gold_tag_lists, pred_tag_lists = zip(*documents) if documents else ([], [], [])
+    token_count = sum(len(token_list) for token_list in tokens)
+    worker_timings = {}
+    if counts_only and heavy_hitter_capacity is None:
+        # the spans are only needed for the surface forms of the heavy hitters.
+        counts, confusion_matrix = count_tag_lists(tokens, gold_tag_lists, pred_tag_lists)
+        add_worker_timing(worker_timings, os.getpid(), len(documents), token_count, time.perf_counter() - start_time)
+        return BatchResult(counts, confusion_matrix, None, None, len(documents), token_count,
+                           worker_timings=worker_timings)
+
+    results, results_grouped_by_tags = NERTagListEvaluator(
+        tokens, gold_tag_lists, pred_tag_lists, entity_context_padding,
+        examples_per_category=examples_per_category, heavy_hitter_capacity=heavy_hitter_capacity,
+        rng=random.Random(seed) if seed is not None else None).evaluate()
+
+    add_worker_timing(worker_timings, os.getpid(), len(documents), token_count, time.perf_counter() - start_time)
+    return BatchResult(CountAggregator.from_results_grouped_by_tags(results_grouped_by_tags),
+                       results.confusion_matrix,
+                       None if counts_only else results,
+                       None if counts_only else dict(results_grouped_by_tags),
+                       len(documents),
+                       token_count,
+                       results.heavy_hitters,
+                       worker_timings)
+
+
+def count_tag_lists(tokens: Sequence[List[str]], gold_tag_lists: Sequence[List[str]],
+                    pred_tag_lists: Sequence[List[str]]) -> Tuple[CountAggregator, ConfusionMatrix]:
+    """Counts the scenarios (per tag) and the confusion matrix of documents, decoding their tags like
+    NERTagListEvaluator and matching the decoded spans with `count_decoded_spans`, without creating any span.
+
+    Returns:
+        Tuple[CountAggregator, ConfusionMatrix]: counts and confusion matrix of the documents.
+    """
+    if len(gold_tag_lists) != len(tokens) or len(pred_tag_lists) != len(tokens):
+        raise Exception('Exception: Number of tags lists and tokens lists are not the same.')
+
+    decoder = get_decoder('lenient')
+    counts, confusion_matrix = CountAggregator(), ConfusionMatrix()
+    for token_list, gold_tag_list, pred_tag_list in zip(tokens, gold_tag_lists, pred_tag_lists):
+        if len(gold_tag_list) != len(token_list) or len(pred_tag_list) != len(token_list):
+            raise Exception(
+                f'Exception: Number of tags and tokens are not the same.'
+                f'Gold Tag List:{gold_tag_list} Predicted Tag List: {pred_tag_list} Token List: {token_list}')
+        count_decoded_spans(decoder.decode(gold_tag_list)[0], decoder.decode(pred_tag_list)[0],
+                            counts, confusion_matrix)
+    return counts, confusion_matrix
+
+
+def _evaluate_batch_star(args) -> BatchResult:
+    return evaluate_batch(*args)
+
+
+class StreamingEvaluator:
+    """Evaluates an iterable of documents batch by batch, so the documents never have to be held in memory at once.
+
+    Example:
+        >>> evaluator = StreamingEvaluator(counts_only=True, jobs=4)
+        >>> evaluator.evaluate(zip(token_lists, gold_tag_lists, pred_tag_lists))
+        >>> evaluator.summarize_result()
+    """
+    CHECKPOINT_FORMAT_VERSION = 2
+    SETTINGS = ('counts_only', 'batch_size', 'entity_context_padding', 'examples_per_category',
+                'heavy_hitter_capacity', 'batch_cost')
+    STATE = ('counts', 'confusion_matrix', 'heavy_hitters', 'document_count', 'token_count', 'elapsed_seconds',
+             'worker_timings')
+
+    def __init__(self, counts_only: bool = False, jobs: int = 1, batch_size: int = 1000,
+                 entity_context_padding: int = 0, examples_per_category: Optional[int] = None,
+                 heavy_hitter_capacity: Optional[int] = None, batch_cost: Optional[int] = None):
+        """
+        Constructor for StreamingEvaluator
+
+        Args:
+            counts_only (bool, optional): only keep the counts and drop the spans of every batch. Defaults to False.
+            jobs (int, optional): # of worker processes evaluating the batches. Defaults to 1.
+            batch_size (int, optional): # of documents in a batch. Defaults to 1000.
+            entity_context_padding (int, optional): # of tokens around a span kept as its context. Defaults to 0.
+            examples_per_category (int, optional): keep a uniform sample of this many spans per category instead
+                of every span, refer ResultAggregator. Every batch is sampled with a seed of its position in the
+                stream, so the samples are the same whatever the # of jobs. Defaults to None.
+            heavy_hitter_capacity (int, optional): track the most frequent errors by surface form in `heavy_hitters`
+                (also in counts only mode) with this many counters. Defaults to None.
+            batch_cost (int, optional): close a batch once the cost (tokens + tags other than 'O', refer
+                `tag_list_cost`) of its documents would exceed this, so batches take about the same time whatever
+                the document lengths, a longer document gets a batch of its own. Batches still hold at most
+                batch_size documents. Defaults to None i.e. batches of batch_size documents.
+        """
+        self.counts_only = counts_only
+        self.jobs = jobs
+        self.batch_size = batch_size
+        self.entity_context_padding = entity_context_padding
+        self.examples_per_category = examples_per_category
+        self.heavy_hitter_capacity = heavy_hitter_capacity
+        self.batch_cost = batch_cost
+
+        # generator the examples are merged with, reseeded for every batch (refer `evaluate`).
+        self.rng = random.Random()
+        self.counts = CountAggregator()
+        self.confusion_matrix = ConfusionMatrix()
+        self.results = None if counts_only else ResultAggregator(rng=self.rng)
+        self.results_grouped_by_tags: Optional[Dict[str, ResultAggregator]] = None if counts_only else {}
+        self.heavy_hitters = HeavyHitters(heavy_hitter_capacity) if heavy_hitter_capacity is not None else None
+
+        self.document_count = 0
+        self.token_count = 0
+        self.elapsed_seconds = 0.0
+        # chunks, documents, tokens and seconds spent by every worker process (keyed by pid).
+        self.worker_timings: Dict[int, Dict[str, float]] = {}
+        # # of documents of the next stream that were already evaluated before the evaluator was restored.
+        self.resume_cursor = 0
+
+    def __document_batches(self, documents: Iterable[Document]) -> Iterator[Tuple[List[Document], int]]:
+        """Yields the batches of documents along with their cost.
+        """
+        if self.batch_cost is None:
+            iterator = iter(documents)
+            while True:
+                batch = list(itertools.islice(iterator, self.batch_size))
+                if not batch:
+                    return
+                yield batch, sum(tag_list_cost(gold_tags, pred_tags) for _, gold_tags, pred_tags in batch)
+
+        # greedy packing of consecutive documents, refer `pack_document_ranges`.
+        batch, batch_cost = [], 0
+        for document in documents:
+            cost = tag_list_cost(document[1], document[2])
+            if batch and (batch_cost + cost > self.batch_cost or len(batch) >= self.batch_size):
+                yield batch, batch_cost
+                batch, batch_cost = [], 0
+            batch.append(document)
+            batch_cost += cost
+        if batch:
+            yield batch, batch_cost
+
+    @staticmethod
+    def __seeded_batches(document_batches: Iterator[Tuple[List[Document], int]],
+                         first_doc_idx: int) -> Iterator[Tuple[int, List[Document], int]]:
+        for batch, batch_cost in document_batches:
+            yield first_doc_idx, batch, batch_cost
+            first_doc_idx += len(batch)
+
+    def __batch_args(self, batch: List[Document], seed: int) -> Tuple:
+        return (batch, self.entity_context_padding, self.counts_only, self.examples_per_category,
+                self.heavy_hitter_capacity, seed)
+
+    def __evaluate_in_pool(self, batches: Iterator[Tuple[int, List[Document], int]],
+                           add_batch_result: Callable[[int, BatchResult], None]) -> None:
+        """Evaluates the batches in worker processes, keeping at most 2 * jobs batches in flight and 4 * jobs
+        batches read but not merged yet. Batches read ahead of the workers are handed out largest first as soon
+        as a worker frees up (no barrier between groups of batches), and the results are merged in stream order,
+        buffering the ones finished before an earlier batch (in flight or still read ahead).
+        """
+        max_in_flight, max_unmerged = 2 * self.jobs, 4 * self.jobs
+        finished_batches: "queue.Queue[Tuple[int, Optional[BatchResult], Optional[BaseException]]]" = queue.Queue()
+        with Pool(self.jobs) as pool:
+            read_ahead: List[Tuple[int, List[Document], int]] = []
+            # results of the batches finished before an earlier batch, keyed by the index of their first document.
+            buffered_results: Dict[int, BatchResult] = {}
+            # heap of the first document index of every batch read and not merged yet, whether read ahead,
+            # in flight or buffered.
+            unmerged_batches: List[int] = []
+            in_flight = 0
+            while True:
+                for first_doc_idx, batch, batch_cost in itertools.islice(batches, max_unmerged - len(unmerged_batches)):
+                    read_ahead.append((first_doc_idx, batch, batch_cost))
+                    heapq.heappush(unmerged_batches, first_doc_idx)
+                while read_ahead and in_flight < max_in_flight:
+                    largest_batch_idx = largest_first([batch_cost for _, _, batch_cost in read_ahead])[0]
+                    first_doc_idx, batch, _ = read_ahead.pop(largest_batch_idx)
+                    pool.apply_async(
+                        _evaluate_batch_star, (self.__batch_args(batch, first_doc_idx),),
+                        callback=lambda batch_result, idx=first_doc_idx: finished_batches.put((idx, batch_result, None)),
+                        error_callback=lambda error, idx=first_doc_idx: finished_batches.put((idx, None, error)))
+                    in_flight += 1
+                if in_flight == 0:
+                    break
+
+                first_doc_idx, batch_result, error = finished_batches.get()
+                in_flight -= 1
+                if error is not None:
+                    raise error
+                buffered_results[first_doc_idx] = batch_result
+                while unmerged_batches and unmerged_batches[0] in buffered_results:
+                    merged_doc_idx = heapq.heappop(unmerged_batches)
+                    add_batch_result(merged_doc_idx, buffered_results.pop(merged_doc_idx))
+
+    def evaluate(self, documents: Iterable[Document], checkpoint_path: Optional[str] = None,
+                 checkpoint_every: int = 10) -> StreamingEvaluator:
+        """Evaluates the documents and adds their results to the running results.
+
+        Args:
+            documents (Iterable[Document]): (tokens, gold tags, predicted tags) of the documents. If the evaluator
+                was restored from a checkpoint, the documents it had already evaluated are skipped.
+            checkpoint_path (str, optional): periodically save a checkpoint to this path, refer `save_checkpoint`.
+                Defaults to None.
+            checkpoint_every (int, optional): # of batches between checkpoints. Defaults to 10.
+
+        Returns:
+            StreamingEvaluator: self.
+        """
+        start_time = time.perf_counter()
+        if self.resume_cursor > 0:
+            documents = itertools.islice(documents, self.resume_cursor, None)
+            self.resume_cursor = 0
+
+        batch_count = 0
+
+        def add_batch_result(first_doc_idx: int, batch_result: BatchResult) -> None:
+            nonlocal batch_count, start_time
+            # samples are merged with the seed of the batch as well, so they don't depend on the scheduling
+            # (or on resuming from a checkpoint).
+            self.rng.seed(first_doc_idx)
+            self.add_batch_result(batch_result)
+            batch_count += 1
+            if checkpoint_path is not None and batch_count % checkpoint_every == 0:
+                now = time.perf_counter()
+                self.elapsed_seconds += now - start_time
+                start_time = now
+                self.save_checkpoint(checkpoint_path)
+
+        # every batch is seeded with the index of its first document in the stream.
+        batches = self.__seeded_batches(self.__document_batches(documents), self.document_count)
+        if self.jobs > 1:
+            self.__evaluate_in_pool(batches, add_batch_result)
+        else:
+            for first_doc_idx, batch, _ in batches:
+                add_batch_result(first_doc_idx, evaluate_batch(*self.__batch_args(batch, first_doc_idx)))
+
+        self.elapsed_seconds += time.perf_counter() - start_time
+        if checkpoint_path is not None:
+            self.save_checkpoint(checkpoint_path)
+        return self
+
+    def save_checkpoint(self, path: str) -> None:
+        """Saves the running counts, confusion matrix and the # of documents evaluated (the cursor into the stream)
+        to a file, atomically replacing it so an interrupted write never corrupts the previous checkpoint.
+
+        The examples are saved as compact snapshots (refer ResultSnapshot) holding the types and bounds of the
+        spans, so the examples of a restored evaluator come without their tokens and context.
+        """
+        from .models.result_snapshot import ResultSnapshot
+
+        atomic_pickle_dump({
+            "format_version": StreamingEvaluator.CHECKPOINT_FORMAT_VERSION,
+            "settings": {setting: getattr(self, setting) for setting in StreamingEvaluator.SETTINGS},
+            "state": {attribute: getattr(self, attribute) for attribute in StreamingEvaluator.STATE},
+            "results": ResultSnapshot.from_result_aggregator(self.results).to_bytes()
+            if self.results is not None else None,
+            "results_grouped_by_tags": {
+                tag: ResultSnapshot.from_result_aggregator(results_for_tag).to_bytes()
+                for tag, results_for_tag in self.results_grouped_by_tags.items()
+            } if self.results_grouped_by_tags is not None else None,
+        }, path)
+
+    @classmethod
+    def from_checkpoint(cls, path: str, jobs: int = 1) -> StreamingEvaluator:
+        """Restores an evaluator from a checkpoint, evaluating the same stream of documents again resumes
+        after the last document of the checkpoint.
+
+        Only load checkpoints written by yourself, the file is unpickled.
+
+        Args:
+            path (str): path of the checkpoint, refer `save_checkpoint`.
+            jobs (int, optional): # of worker processes evaluating the remaining batches. Defaults to 1.
+
+        Returns:
+            StreamingEvaluator: the restored evaluator.
+        """
+        from .models.result_snapshot import ResultSnapshot
+
+        checkpoint = pickle_load(path)
+        if checkpoint.get("format_version") != StreamingEvaluator.CHECKPOINT_FORMAT_VERSION:
+            raise Exception(f'Exception: Unsupported checkpoint format version: {checkpoint.get("format_version")}')
+
+        evaluator = cls(jobs=jobs, **checkpoint["settings"])
+        for attribute, value in checkpoint["state"].items():
+            setattr(evaluator, attribute, value)
+        if checkpoint["results"] is not None:
+            evaluator.results = ResultSnapshot.from_bytes(checkpoint["results"]).to_result_aggregator(evaluator.rng)
+        if checkpoint["results_grouped_by_tags"] is not None:
+            evaluator.results_grouped_by_tags = {
+                tag: ResultSnapshot.from_bytes(results_for_tag).to_result_aggregator(evaluator.rng)
+                for tag, results_for_tag in checkpoint["results_grouped_by_tags"].items()
+            }
+        evaluator.resume_cursor = evaluator.document_count
+        return evaluator
+
+    def add_batch_result(self, batch_result: BatchResult) -> None:
+        """Merges the results of a batch into the running results.
+        """
+        self.counts.append_count_aggregator(batch_result.counts)
+        self.confusion_matrix.merge(batch_result.confusion_matrix)
+        if self.results is not None and batch_result.results is not None:
+            self.results.append_result_aggregator(batch_result.results)
+            for tag, results_for_tag in (batch_result.results_grouped_by_tags or {}).items():
+                self.results_grouped_by_tags.setdefault(tag, ResultAggregator(rng=self.rng)).append_result_aggregator(
+                    results_for_tag)
+        if self.heavy_hitters is not None and batch_result.heavy_hitters is not None:
+            self.heavy_hitters.merge(batch_result.heavy_hitters)
+        self.document_count += batch_result.document_count
+        self.token_count += batch_result.token_count
+        merge_worker_timings(self.worker_timings, batch_result.worker_timings)
+
+    def get_throughput(self) -> Dict[str, float]:
+        """Returns the # of documents/tokens evaluated and the rate at which they were evaluated.
+        """
+        return {
+            "documents": self.document_count,
+            "tokens": self.token_count,
+            "seconds": self.elapsed_seconds,
+            "documents_per_second": self.document_count / self.elapsed_seconds if self.elapsed_seconds > 0 else 0,
+            "tokens_per_second": self.token_count / self.elapsed_seconds if self.elapsed_seconds > 0 else 0,
+            "workers": self.worker_timings,
+        }
+
+    def summarize_result(self, per_tag: bool = False) -> Dict[str, object]:
+        """Summarizes the results from the counts.
+
+        Args:
+            per_tag (bool, optional): include the summaries of every tag. Defaults to False.
+        """
+        summary = {
+            "overall": {
+                **self.counts.summarize_result(),
+                **self.counts.get_scenario_counts(),
+            },
+            "confusion_matrix": self.confusion_matrix.to_dict(),
+        }
+        if per_tag:
+            summary["by_tags"] = {
+                tag: {**self.counts.summarize_result(tag), **self.counts.get_scenario_counts(tag)}
+                for tag in self.counts.tags
+            }
+        return summary
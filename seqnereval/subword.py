@@ -0,0 +1,79 @@
+import math
+from typing import Dict, List, Optional, Sequence
+
+SUBWORD_AGGREGATION_STRATEGIES = ('first', 'last', 'majority', 'max_prob')
+
+
+def aggregate_subword_tag_ids(tag_ids: Optional[Sequence[int]],
+                              word_ids: Sequence[Optional[int]],
+                              strategy: str = 'first',
+                              logits: Optional[Sequence[Sequence[float]]] = None) -> List[int]:
+    """Collapses the tag ids predicted for subwords (e.g. wordpieces) into one tag id per word.
+
+    Args:
+        tag_ids (Sequence[int]): tag id predicted for each subword, may be None for the 'max_prob' strategy.
+        word_ids (Sequence[Optional[int]]): index of the word each subword belongs to, None for
+            subwords that don't belong to any word (special tokens, padding).
+        strategy (str, optional): 'first' or 'last' takes the tag of the first/last subword of a word,
+            'majority' takes the most frequent tag (ties go to the tag seen first), 'max_prob' takes the
+            tag with the highest probability over all the subwords of a word. Defaults to 'first'.
+        logits (Sequence[Sequence[float]], optional): per subword scores for every tag id, required by 'max_prob'.
+
+    Returns:
+        List[int]: tag id of each word.
+    """
+    if strategy not in SUBWORD_AGGREGATION_STRATEGIES:
+        raise Exception(f'Unknown subword aggregation strategy: {strategy}, '
+                        f'expected one of {SUBWORD_AGGREGATION_STRATEGIES}')
+    if strategy == 'max_prob' and logits is None:
+        raise Exception('Exception: logits are required by the max_prob aggregation strategy.')
+    if strategy != 'max_prob' and tag_ids is None:
+        raise Exception(f'Exception: tag ids are required by the {strategy} aggregation strategy.')
+
+    subword_count = len(word_ids)
+    if tag_ids is not None and len(tag_ids) != subword_count:
+        raise Exception(
+            f'Exception: Number of subword tag ids ({len(tag_ids)}) and word ids ({subword_count}) are not the same.')
+    if logits is not None and len(logits) != subword_count:
+        raise Exception(
+            f'Exception: Number of subword logits ({len(logits)}) and word ids ({subword_count}) are not the same.')
+
+    word_count = max((word_id for word_id in word_ids if word_id is not None), default=-1) + 1
+    word_tag_ids: List[Optional[int]] = [None] * word_count
+
+    if strategy == 'first' or strategy == 'last':
+        for subword_idx, word_id in enumerate(word_ids):
+            if word_id is not None and (strategy == 'last' or word_tag_ids[word_id] is None):
+                word_tag_ids[word_id] = tag_ids[subword_idx]
+
+    elif strategy == 'majority':
+        # votes of every word keyed by tag id, the subwords of a word don't have to be contiguous.
+        votes_by_word: Dict[int, Dict[int, int]] = {}
+        for subword_idx, word_id in enumerate(word_ids):
+            if word_id is None:
+                continue
+            votes = votes_by_word.setdefault(word_id, {})
+            tag_id = tag_ids[subword_idx]
+            votes[tag_id] = votes.get(tag_id, 0) + 1
+        for word_id, votes in votes_by_word.items():
+            # dicts keep the insertion order so ties go to the tag seen first.
+            word_tag_ids[word_id] = max(votes, key=votes.get)
+
+    else:
+        best_probs = [-1.0] * word_count
+        for subword_idx, word_id in enumerate(word_ids):
+            if word_id is None:
+                continue
+            scores = logits[subword_idx]
+            max_score = max(scores)
+            normalizer = sum(math.exp(score - max_score) for score in scores)
+            best_tag_id = max(range(len(scores)), key=scores.__getitem__)
+            best_prob = 1 / normalizer
+            if best_prob > best_probs[word_id]:
+                best_probs[word_id] = best_prob
+                word_tag_ids[word_id] = best_tag_id
+
+    if None in word_tag_ids:
+        raise Exception(f'Exception: Word #{word_tag_ids.index(None)} has no subwords.')
+
+    return word_tag_ids
@@ -3,7 +3,7 @@ import os
 # read the contents of your README file
 from os import path
 
-from setuptools import setup
+from setuptools import find_packages, setup
 
 here = os.path.abspath(os.path.dirname(__file__))
 
@@ -29,7 +29,7 @@ setup(
     author=about["__author__"],
     author_email=about["__author_email__"],
     license=about["__license__"],
-    packages=["seqnereval"],
+    packages=find_packages(exclude=["test", "test.*"]),
     classifiers=[
         "Programming Language :: Python :: 3",
         "Operating System :: OS Independent",
@@ -37,4 +37,9 @@ setup(
     tests_require=["pytest"],
     include_package_data=True,
     zip_safe=True,
+    entry_points={
+        "console_scripts": [
+            "seqnereval=seqnereval.cli:main",
+        ],
+    },
 )
\ No newline at end of file
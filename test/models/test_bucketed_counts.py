@@ -0,0 +1,43 @@
+from seqnereval.models import BucketedCounts, ResultAggregator, Span
+import pytest
+
+
+def test_BucketedCounts_add():
+    breakdown = BucketedCounts('length')
+    assert breakdown.bucket_labels() == ['1', '2', '3-5', '6+']
+
+    breakdown.add('type_match_bounds_match', Span('PER', 0, 0))
+    breakdown.add('type_match_bounds_match', Span('PER', 3, 6))
+    breakdown.add('missed_gold_span', Span('PER', 10, 19))
+    breakdown.add('unecessary_predicted_span', Span('PER', 20, 21))
+
+    assert breakdown.counts['type_match_bounds_match'] == [1, 0, 1, 0]
+    assert breakdown.get_scenario_counts(3)['missed_gold_span'] == 1
+    summary = breakdown.summarize_result()
+    assert summary['6+']['strict_match']['recall'] == 0
+    assert summary['1']['strict_match']['f1'] == 1
+
+    assert BucketedCounts('position', [0, 10]).get_bucket(Span('PER', 12, 13)) == 1
+
+    with pytest.raises(Exception):
+        BucketedCounts('depth')
+
+    with pytest.raises(Exception):
+        breakdown.merge(BucketedCounts('length', [1, 5]))
+
+
+def test_BucketedCounts_merge():
+    results = ResultAggregator([BucketedCounts('length'), BucketedCounts('position', [0, 10])])
+    results.add_type_match_bounds_partial(Span('PER', 0, 2), Span('PER', 1, 2))
+
+    other_results = ResultAggregator([BucketedCounts('length')])
+    other_results.add_missed_gold_span(Span('LOC', 11, 11))
+
+    empty_results = ResultAggregator()
+    empty_results.append_result_aggregator(results)
+    empty_results.append_result_aggregator(other_results)
+
+    assert sorted(empty_results.breakdowns) == ['length', 'position']
+    assert empty_results.breakdowns['length'].counts['type_match_bounds_partial'] == [0, 0, 1, 0]
+    assert empty_results.breakdowns['length'].counts['missed_gold_span'] == [1, 0, 0, 0]
+    assert empty_results.breakdowns['position'].counts['type_match_bounds_partial'] == [1, 0]
@@ -0,0 +1,26 @@
+from seqnereval.models import CharSpan, Span
+
+
+def test_CharSpan_offsets():
+    span = CharSpan('PER', 4, 8)
+
+    assert span.start_char == 4 and span.end_char == 8
+    assert span.start_idx == 4 and span.end_idx == 7
+    assert span == Span('PER', 4, 7)
+    assert span.overlaps_with(CharSpan('PER', 7, 10))
+    assert not span.overlaps_with(CharSpan('PER', 8, 10))
+    assert span.spanned_tokens is None and span.span_context is None
+
+
+def test_CharSpan_text_and_context():
+    text = 'The John Doe Club'
+    span = CharSpan('PER', 4, 12, text, 2)
+
+    assert span.spanned_tokens == 'John Doe'
+    assert span.span_context == 'e John Doe C'
+    assert CharSpan('ORG', 13, 17, text, 10).span_context == ' John Doe Club'
+
+
+def test_CharSpan__str__():
+    assert CharSpan('PER', 4, 8, 'The John', 1).__str__() == \
+        "(Type: \"PER\", Char Span:(4, 8), Text:'John', Context:' John')"
@@ -0,0 +1,46 @@
+from seqnereval.models import ConfusionMatrix
+
+
+def test_ConfusionMatrix_add():
+    matrix = ConfusionMatrix()
+    matrix.add('PER', 'PER')
+    matrix.add('PER', 'ORG')
+    matrix.add('PER', 'ORG')
+    matrix.add_missed('LOC')
+    matrix.add_spurious('ORG')
+
+    assert matrix.types == [None, 'PER', 'ORG', 'LOC']
+    assert matrix.counts == [[0, 0, 1, 0],
+                             [0, 1, 2, 0],
+                             [0, 0, 0, 0],
+                             [1, 0, 0, 0]]
+    assert matrix.get('PER', 'ORG') == 2
+    assert matrix.get('LOC', None) == 1
+    assert matrix.get('MISC', 'PER') == 0
+    assert matrix.to_dict() == {
+        None: {'ORG': 1},
+        'PER': {'PER': 1, 'ORG': 2},
+        'LOC': {None: 1},
+    }
+
+
+def test_ConfusionMatrix_merge():
+    matrix = ConfusionMatrix()
+    matrix.add('PER', 'ORG')
+
+    same_types = ConfusionMatrix()
+    same_types.add('PER', 'ORG')
+    matrix.merge(same_types)
+    assert matrix.get('PER', 'ORG') == 2
+
+    other_types = ConfusionMatrix()
+    other_types.add('LOC', 'PER')
+    other_types.add('PER', 'ORG')
+    other_types.add_spurious('LOC')
+    matrix.merge(other_types)
+
+    assert matrix.to_dict() == {
+        None: {'LOC': 1},
+        'PER': {'ORG': 3},
+        'LOC': {'PER': 1},
+    }
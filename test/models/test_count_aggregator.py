@@ -0,0 +1,86 @@
+from seqnereval.models import CountAggregator, SlidingWindowAggregator, ResultAggregator, Span
+import pytest
+
+
+def generate_count_aggregator(tag: str, correct: int, missed: int) -> CountAggregator:
+    count_aggregator = CountAggregator()
+    count_aggregator.add('type_match_bounds_match', tag, correct)
+    count_aggregator.add('missed_gold_span', tag, missed)
+    return count_aggregator
+
+
+def test_CountAggregator_from_results_grouped_by_tags():
+    per_results = ResultAggregator()
+    per_results.add_type_match_bounds_match(Span('PER', 0, 1), Span('PER', 0, 1))
+    per_results.add_missed_gold_span(Span('PER', 4, 5))
+    loc_results = ResultAggregator()
+    loc_results.add_unecessary_predicted_span(Span('LOC', 7, 7))
+
+    count_aggregator = CountAggregator.from_results_grouped_by_tags({'PER': per_results, 'LOC': loc_results})
+
+    assert count_aggregator.tags == ['PER', 'LOC']
+    assert count_aggregator.get_scenario_counts('PER')['type_match_bounds_match'] == 1
+    assert count_aggregator.get_scenario_counts('LOC')['unecessary_predicted_span'] == 1
+    assert count_aggregator.get_scenario_counts('ORG')['missed_gold_span'] == 0
+    assert count_aggregator.get_scenario_counts() == {
+        'type_match_bounds_match': 1,
+        'unecessary_predicted_span': 1,
+        'missed_gold_span': 1,
+        'type_mismatch_bounds_match': 0,
+        'type_match_bounds_partial': 0,
+        'type_mismatch_bounds_partial': 0,
+    }
+    assert count_aggregator.summarize_result('PER')['strict_match'] == per_results.strict_match.get_summary()
+
+
+def test_CountAggregator_append_and_subtract():
+    count_aggregator = generate_count_aggregator('PER', 3, 1)
+    count_aggregator.append_count_aggregator(generate_count_aggregator('PER', 1, 0))
+    count_aggregator.append_count_aggregator(generate_count_aggregator('LOC', 2, 2))
+
+    assert count_aggregator.get_scenario_counts('PER')['type_match_bounds_match'] == 4
+    assert count_aggregator.get_scenario_counts('LOC')['missed_gold_span'] == 2
+
+    count_aggregator.subtract_count_aggregator(generate_count_aggregator('PER', 3, 1))
+    assert count_aggregator.get_scenario_counts('PER')['type_match_bounds_match'] == 1
+    assert count_aggregator.get_scenario_counts('PER')['missed_gold_span'] == 0
+    assert count_aggregator.summarize_result_by_tags()['LOC']['strict_match']['recall'] == 0.5
+
+
+def test_SlidingWindowAggregator():
+    window = SlidingWindowAggregator(2)
+    window.add(generate_count_aggregator('PER', 1, 0))
+    window.add(generate_count_aggregator('PER', 1, 0))
+    assert window.summarize_result()['strict_match']['correct_counts'] == 2
+
+    window.add_bucket(generate_count_aggregator('PER', 0, 2))
+    assert window.summarize_result()['strict_match']['recall'] == 0.5
+
+    # the first bucket is evicted
+    window.add_bucket(generate_count_aggregator('LOC', 1, 0))
+    assert window.summarize_result()['strict_match']['correct_counts'] == 1
+    assert window.summarize_result()['strict_match']['missed_counts'] == 2
+    assert window.summarize_result_by_tags()['LOC']['strict_match']['f1'] == 1
+
+    window.rotate()
+    window.rotate()
+    assert window.summarize_result()['strict_match']['possible'] == 0
+
+    with pytest.raises(Exception):
+        SlidingWindowAggregator(0)
+
+
+def test_SlidingWindowAggregator_add_late():
+    window = SlidingWindowAggregator(2)
+    window.rotate()
+    window.add(generate_count_aggregator('PER', 1, 0))
+    # late counts go to the previous bucket and are evicted with it.
+    window.add(generate_count_aggregator('PER', 0, 1), age=1)
+    assert window.summarize_result()['strict_match']['recall'] == 0.5
+
+    window.rotate()
+    assert window.summarize_result()['strict_match']['missed_counts'] == 0
+    assert window.summarize_result()['strict_match']['correct_counts'] == 1
+
+    with pytest.raises(Exception):
+        window.add(generate_count_aggregator('PER', 1, 0), age=2)
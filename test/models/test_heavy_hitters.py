@@ -0,0 +1,58 @@
+from seqnereval.models import HeavyHitters, ResultAggregator, Span
+import pickle
+import pytest
+
+
+def test_HeavyHitters_add():
+    heavy_hitters = HeavyHitters(3)
+    for key in ['a'] * 10 + ['b'] * 5 + ['c', 'd', 'e'] + ['b'] * 2:
+        heavy_hitters.add(key)
+
+    assert heavy_hitters.total == 20
+    assert len(heavy_hitters.counts) == 3
+    assert heavy_hitters.top(2) == [('a', 10), ('b', 7)]
+    assert heavy_hitters.error('a') == 0
+    # 'e' replaced 'd' which replaced 'c', inheriting its count
+    assert heavy_hitters.top(3)[2] == ('e', 3)
+    assert heavy_hitters.error('e') == 2
+
+    restored = pickle.loads(pickle.dumps(heavy_hitters))
+    restored.add('f')
+    assert restored.top(2) == [('a', 10), ('b', 7)]
+
+    with pytest.raises(Exception):
+        HeavyHitters(0)
+
+
+def test_HeavyHitters_merge():
+    heavy_hitters = HeavyHitters(2)
+    for key in ['a'] * 4 + ['b'] * 2:
+        heavy_hitters.add(key)
+    other_heavy_hitters = HeavyHitters(2)
+    for key in ['b'] * 5 + ['c'] * 1:
+        other_heavy_hitters.add(key)
+
+    heavy_hitters.merge(other_heavy_hitters)
+    assert heavy_hitters.top() == [('b', 7), ('a', 5)]
+    assert heavy_hitters.total == 12
+    assert heavy_hitters.error('a') == 1
+
+
+def test_HeavyHitters_results_aggregator():
+    results = ResultAggregator(heavy_hitter_capacity=10)
+    results.add_missed_gold_span(Span('ORG', 0, 1, ['Acme', 'Corp']))
+    results.add_type_mismatch_bounds_match(Span('ORG', 3, 3, ['Apple']), Span('PER', 3, 3, ['Apple']))
+
+    other_results = ResultAggregator(heavy_hitter_capacity=10)
+    other_results.add_missed_gold_span(Span('ORG', 5, 6, ['Acme', 'Corp']))
+    other_results.add_type_match_bounds_match(Span('PER', 8, 8, ['Jane']), Span('PER', 8, 8, ['Jane']))
+
+    empty_results = ResultAggregator()
+    empty_results.append_result_aggregator(results)
+    empty_results.append_result_aggregator(other_results)
+
+    assert empty_results.heavy_hitters.top(50, 'missed_gold_span') == [
+        (('missed_gold_span', 'ORG', None, 'Acme Corp'), 2)]
+    assert empty_results.heavy_hitters.top(gold_type='ORG', pred_type='PER') == [
+        (('type_mismatch_bounds_match', 'ORG', 'PER', 'Apple'), 1)]
+    assert empty_results.heavy_hitters.total == 3
@@ -0,0 +1,43 @@
+from seqnereval.models import PairStatistics, ResultAggregator, Span
+
+
+def test_PairStatistics_score():
+    statistics = PairStatistics()
+    statistics.add_pair(Span('PER', 0, 1), Span('PER', 0, 1))
+    statistics.add_pair(Span('PER', 5, 8), Span('PER', 6, 8))
+    statistics.add_pair(Span('LOC', 10, 11), Span('LOC', 9, 13))
+    statistics.add_pair(Span('ORG', 20, 21), Span('LOC', 20, 21))
+    statistics.add_missed()
+    statistics.add_spurious()
+
+    assert list(statistics.start_offsets) == [0, 1, -1, 0]
+    assert list(statistics.end_offsets) == [0, 0, 2, 0]
+    assert statistics.boundary_distances() == [0, 1, 2, 0]
+    assert statistics.ious() == [1.0, 0.75, 0.4, 1.0]
+
+    by_tolerance = statistics.score_boundary_tolerance([0, 1, 2])
+    assert [by_tolerance[k]["correct_counts"] for k in (0, 1, 2)] == [1, 2, 3]
+    assert by_tolerance[1]["incorrect_counts"] == 2
+    assert by_tolerance[2]["precision"] == 3 / 5
+    assert by_tolerance[2]["recall"] == 3 / 5
+
+    by_iou = statistics.score_iou([0.4, 0.5, 1.0])
+    assert [by_iou[t]["correct_counts"] for t in (0.4, 0.5, 1.0)] == [3, 2, 1]
+    assert statistics.score_iou([1.0], require_type_match=False)[1.0]["correct_counts"] == 2
+
+
+def test_PairStatistics_merge():
+    results = ResultAggregator()
+    results.add_type_match_bounds_partial(Span('PER', 5, 8), Span('PER', 6, 8))
+    results.add_missed_gold_span(Span('LOC', 0, 0))
+
+    other_results = ResultAggregator()
+    other_results.add_type_match_bounds_match(Span('PER', 0, 1), Span('PER', 0, 1))
+    other_results.add_unecessary_predicted_span(Span('ORG', 3, 3))
+
+    results.append_result_aggregator(other_results)
+    assert len(results.pair_statistics) == 2
+    assert list(results.pair_statistics.overlap_lengths) == [3, 2]
+    assert (results.pair_statistics.missed_count, results.pair_statistics.spurious_count) == (1, 1)
+    assert results.pair_statistics.score_boundary_tolerance([0])[0]["f1"] == \
+        results.strict_match.get_summary()["f1"]
@@ -0,0 +1,93 @@
+from seqnereval import NEREvaluator
+from seqnereval.models import PredictionScores, ResultAggregator, Span
+import pytest
+import random
+
+
+def test_PredictionScores_precision_recall_curve():
+    results = ResultAggregator()
+    results.add_type_match_bounds_match(Span('PER', 0, 1), Span('PER', 0, 1, score=0.9))
+    results.add_unecessary_predicted_span(Span('LOC', 3, 3, score=0.8))
+    results.add_type_match_bounds_partial(Span('ORG', 5, 7), Span('ORG', 5, 6, score=0.6))
+    results.add_type_match_bounds_match(Span('PER', 9, 9), Span('PER', 9, 9, score=0.6))
+    results.add_missed_gold_span(Span('PER', 12, 12))
+
+    curve = results.prediction_scores.precision_recall_curve()
+    assert curve["thresholds"] == [0.9, 0.8, 0.6]
+    assert curve["precision"] == [1, 0.5, 0.5]
+    assert curve["recall"] == [0.25, 0.25, 0.5]
+    # at the lowest threshold every span is kept
+    assert curve["f1"][-1] == results.strict_match.get_summary()["f1"]
+
+    partial_curve = results.prediction_scores.precision_recall_curves()["partial_match"]
+    assert partial_curve["precision"][-1] == 2.5 / 4
+
+    threshold, summary = results.prediction_scores.best_f1_threshold()
+    assert threshold == 0.6
+    assert summary["correct_counts"] == 2
+
+    assert PredictionScores().best_f1_threshold() == (None, None)
+
+
+def test_PredictionScores_merge():
+    scores = PredictionScores()
+    scores.add('type_match_bounds_match', Span('PER', 0, 1, score=0.5))
+    scores.add_missed()
+
+    other_scores = PredictionScores()
+    other_scores.add('unecessary_predicted_span', Span('PER', 0, 1))
+    scores.merge(other_scores)
+
+    assert list(scores.scores['type_match_bounds_match']) == [0.5]
+    assert list(scores.scores['unecessary_predicted_span']) == [float('inf')]
+    assert scores.missed_count == 1
+    assert scores.precision_recall_curve()["recall"] == [0, 0.5]
+
+
+def test_PredictionScores_gold_span_missed_only_when_every_prediction_dropped():
+    results, _ = NEREvaluator([[Span('PER', 0, 1)]],
+                              [[Span('PER', 0, 1, score=0.9), Span('PER', 1, 2, score=0.3)]]).evaluate()
+    curve = results.prediction_scores.precision_recall_curve()
+    assert curve["thresholds"] == [0.9, 0.3]
+    assert curve["recall"] == [1, 1]
+    assert curve["precision"] == [1, 0.5]
+
+    # once the exact prediction is dropped, the gold span is partially matched by the other one instead of missed.
+    results, _ = NEREvaluator([[Span('PER', 0, 5)]],
+                              [[Span('PER', 0, 5, score=0.3), Span('PER', 3, 8, score=0.9)]]).evaluate()
+    curve = results.prediction_scores.precision_recall_curves()["partial_match"]
+    assert curve["thresholds"] == [0.9, 0.3]
+    assert curve["recall"] == [0.5, 1]
+    assert curve["precision"] == [0.5, 0.5]
+
+
+def test_PredictionScores_precision_recall_curve_matches_evaluation_at_every_threshold():
+    rng = random.Random(11)
+    gold_span_lists, pred_span_lists = [], []
+    for _ in range(30):
+        gold_span_lists.append([Span(rng.choice(['PER', 'LOC']), start_idx, start_idx + rng.randint(0, 3))
+                                for start_idx in rng.sample(range(20), 4)])
+        pred_span_lists.append([Span(rng.choice(['PER', 'LOC']), start_idx, start_idx + rng.randint(0, 3),
+                                     score=rng.choice([0.2, 0.4, 0.6, 0.8, None]))
+                                for start_idx in rng.sample(range(20), 5)])
+
+    results, results_grouped_by_tags = NEREvaluator(
+        [list(spans) for spans in gold_span_lists], [list(spans) for spans in pred_span_lists]).evaluate()
+    curves = results.prediction_scores.precision_recall_curves()
+    assert curves["strict_match"]["thresholds"] == [float('inf'), 0.8, 0.6, 0.4, 0.2]
+
+    for threshold_idx, threshold in enumerate(curves["strict_match"]["thresholds"]):
+        kept_results, kept_results_grouped_by_tags = NEREvaluator(
+            [list(spans) for spans in gold_span_lists],
+            [[span for span in spans if span.score is None or span.score >= threshold] for spans in pred_span_lists]
+        ).evaluate()
+        for scorecard, curve in curves.items():
+            summary = getattr(kept_results, scorecard).get_summary()
+            assert [curve[metric][threshold_idx] for metric in ("precision", "recall", "f1")] == \
+                pytest.approx([summary[metric] for metric in ("precision", "recall", "f1")])
+
+        for tag, results_for_tag in results_grouped_by_tags.items():
+            curve = results_for_tag.prediction_scores.precision_recall_curve('type_match')
+            summary = kept_results_grouped_by_tags.get(tag, ResultAggregator()).type_match.get_summary()
+            assert [curve[metric][threshold_idx] for metric in ("precision", "recall", "f1")] == \
+                pytest.approx([summary[metric] for metric in ("precision", "recall", "f1")])
@@ -0,0 +1,56 @@
+from seqnereval.models import Reservoir, ResultAggregator, Span
+import pickle
+import random
+import pytest
+
+
+def test_Reservoir_append():
+    random.seed(0)
+    reservoir = Reservoir(5, range(1000))
+    assert len(reservoir) == 5
+    assert reservoir.seen == 1000
+    assert all(0 <= item < 1000 for item in reservoir)
+
+    counts_only = Reservoir(0, range(10))
+    assert list(counts_only) == [] and counts_only.seen == 10
+
+    restored = pickle.loads(pickle.dumps(reservoir))
+    assert isinstance(restored, Reservoir)
+    assert list(restored) == list(reservoir) and restored.seen == 1000
+
+    with pytest.raises(Exception):
+        Reservoir(-1)
+
+
+def test_Reservoir_merge():
+    random.seed(0)
+    first_shard_items = 0
+    for _ in range(500):
+        reservoir = Reservoir(10, range(100))
+        reservoir.extend(Reservoir(10, range(100, 400)))
+        assert len(reservoir) == 10 and reservoir.seen == 400
+        assert len(set(reservoir)) == 10
+        first_shard_items += sum(item < 100 for item in reservoir)
+
+    # the first shard holds a quarter of the items
+    assert abs(first_shard_items / 5000 - 0.25) < 0.03
+
+
+def test_Reservoir_results_aggregator():
+    random.seed(0)
+    results = ResultAggregator(examples_per_category=2)
+    for idx in range(10):
+        results.add_missed_gold_span(Span('PER', idx, idx))
+        results.add_type_match_bounds_match(Span('LOC', idx, idx), Span('LOC', idx, idx))
+
+    assert len(results.missed_gold_span) == 2
+    assert results.get_scenario_counts()["missed_gold_span"] == 10
+    assert results.strict_match.get_summary()["recall"] == 0.5
+
+    empty_results = ResultAggregator()
+    empty_results.append_result_aggregator(results)
+    empty_results.append_result_aggregator(results)
+    assert empty_results.examples_per_category == 2
+    assert len(empty_results.type_match_bounds_match) == 2
+    assert empty_results.get_scenario_counts()["type_match_bounds_match"] == 20
+    assert empty_results.strict_match.get_summary()["correct_counts"] == 20
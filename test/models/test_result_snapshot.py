@@ -0,0 +1,105 @@
+from seqnereval.models import ResultAggregator, ResultSnapshot, Span, merge_files
+import pytest
+
+
+def generate_results(span_type: str, offset: int) -> ResultAggregator:
+    results = ResultAggregator()
+    results.add_type_match_bounds_match(Span(span_type, offset, offset + 1), Span(span_type, offset, offset + 1))
+    results.add_type_mismatch_bounds_partial(Span(span_type, offset + 3, offset + 5), Span('MISC', offset + 4, offset + 6))
+    results.add_missed_gold_span(Span(span_type, offset + 8, offset + 8))
+    results.add_unecessary_predicted_span(Span('MISC', offset + 10, offset + 12))
+    return results
+
+
+def test_ResultAggregator_to_bytes_from_bytes():
+    results = generate_results('PER', 0)
+
+    loaded_results = ResultAggregator.from_bytes(results.to_bytes())
+
+    for scenario in ResultAggregator.SCENARIOS:
+        assert getattr(loaded_results, scenario) == getattr(results, scenario)
+    assert loaded_results.summarize_result() == results.summarize_result()
+    assert loaded_results.confusion_matrix == results.confusion_matrix
+    for scorecard_name in ResultAggregator.SCORECARD_SCENARIOS:
+        for category in ('correct', 'incorrect', 'partial', 'missed', 'spurious'):
+            assert getattr(getattr(loaded_results, scorecard_name), category) == \
+                getattr(getattr(results, scorecard_name), category)
+    assert len(loaded_results.pair_statistics) == 2
+    assert loaded_results.pair_statistics.missed_count == 1
+    assert loaded_results.pair_statistics.spurious_count == 1
+
+
+def test_ResultSnapshot_from_bytes():
+    snapshot = ResultSnapshot.from_result_aggregator(generate_results('PER', 0))
+    data = snapshot.to_bytes()
+
+    loaded_snapshot = ResultSnapshot.from_bytes(data)
+    assert loaded_snapshot.types == ['PER', 'MISC']
+    assert loaded_snapshot.counts == snapshot.counts
+    assert list(loaded_snapshot.columns['type_mismatch_bounds_partial']['pred_start']) == [4]
+    assert isinstance(loaded_snapshot.columns['missed_gold_span']['gold_end'], memoryview)
+
+    with pytest.raises(Exception):
+        ResultSnapshot.from_bytes(b'not a snapshot')
+
+    with pytest.raises(Exception):
+        ResultSnapshot.from_bytes(b'NOTASNAP' + data[8:])
+
+
+def test_merge_files(tmp_path):
+    paths = []
+    expected_results = ResultAggregator()
+    for shard_idx, span_type in enumerate(['PER', 'LOC', 'PER']):
+        results = generate_results(span_type, shard_idx * 100)
+        expected_results.append_result_aggregator(results)
+        path = str(tmp_path / f'shard-{shard_idx}.snap')
+        ResultSnapshot.from_result_aggregator(results).save(path)
+        paths.append(path)
+
+    merged_snapshot = merge_files(paths, str(tmp_path / 'merged.snap'))
+
+    assert merged_snapshot.types == ['PER', 'MISC', 'LOC']
+    assert merged_snapshot.counts == expected_results.get_scenario_counts()
+    assert merged_snapshot.summarize_result()['strict_match'] == expected_results.strict_match.get_summary()
+
+    merged_results = ResultSnapshot.load(str(tmp_path / 'merged.snap')).to_result_aggregator()
+    assert merged_results.missed_gold_span == expected_results.missed_gold_span
+    assert merged_results.type_mismatch_bounds_partial == expected_results.type_mismatch_bounds_partial
+    assert merged_results.confusion_matrix == expected_results.confusion_matrix
+
+
+def test_ResultAggregator_to_bytes_from_bytes_with_sampling(tmp_path):
+    results = ResultAggregator(examples_per_category=2)
+    for offset in range(5):
+        results.add_missed_gold_span(Span('PER', offset, offset))
+        results.add_type_mismatch_bounds_match(Span('PER', 10 + offset, 10 + offset), Span('LOC', 10 + offset, 10 + offset))
+
+    loaded_results = ResultAggregator.from_bytes(results.to_bytes())
+
+    assert loaded_results.examples_per_category == 2
+    assert loaded_results.summarize_result() == results.summarize_result()
+    assert loaded_results.strict_match.get_summary()['missed_counts'] == 5
+    assert loaded_results.partial_match.get_summary()['correct_counts'] == 5
+    assert len(loaded_results.missed_gold_span) == 2
+    assert len(loaded_results.strict_match.incorrect) == 2
+    assert loaded_results.missed_gold_span == results.missed_gold_span
+
+    paths = []
+    for shard_idx in range(3):
+        path = str(tmp_path / f'shard-{shard_idx}.snap')
+        ResultSnapshot.from_result_aggregator(results).save(path)
+        paths.append(path)
+    unsampled_results = generate_results('PER', 100)
+    ResultSnapshot.from_result_aggregator(unsampled_results).save(str(tmp_path / 'unsampled.snap'))
+    paths.append(str(tmp_path / 'unsampled.snap'))
+
+    merged_snapshot = merge_files(paths)
+    assert merged_snapshot.examples_per_category == 2
+    assert merged_snapshot.counts['missed_gold_span'] == 16
+    assert merged_snapshot.example_count('missed_gold_span') == 2
+    assert merged_snapshot.example_count('type_match_bounds_match') == 1
+
+    merged_results = merged_snapshot.to_result_aggregator()
+    assert merged_results.strict_match.get_summary()['missed_counts'] == 16
+    assert merged_results.strict_match.get_summary()['correct_counts'] == 1
+    assert len(merged_results.strict_match.incorrect) == 2
@@ -175,3 +175,18 @@ def test_ResultAggregator_add_type_mismatch_bounds_partial(mocker: MockerFixture
     assert len(result.bounds_match.incorrect)==1 and sum([len(agg) if type(agg) is list else 0
                                                                     for agg in result.type_match.__dict__.values()])==1
     assert spy.call_count==1
+
+def test_ResultAggregator_summarize_scenario_counts():
+    result = ResultAggregator()
+    for add_scenario in [result.add_type_match_bounds_match, result.add_type_mismatch_bounds_match,
+                         result.add_type_match_bounds_partial, result.add_type_mismatch_bounds_partial]:
+        add_scenario(generate_random_span('gold'), generate_random_span('pred'))
+    result.add_missed_gold_span(generate_random_span('gold'))
+    result.add_unecessary_predicted_span(generate_random_span('pred'))
+
+    summaries = ResultAggregator.summarize_scenario_counts(result.get_scenario_counts())
+
+    assert summaries["strict_match"] == result.strict_match.get_summary()
+    assert summaries["type_match"] == result.type_match.get_summary()
+    assert summaries["partial_match"] == result.partial_match.get_summary()
+    assert summaries["bounds_match"] == result.bounds_match.get_summary()
@@ -0,0 +1,40 @@
+from seqnereval.models import TokenScoreCard
+
+
+def test_TokenScoreCard_add():
+    scorecard = TokenScoreCard()
+    for gold_tag, pred_tag in zip(["B-PER", "I-PER", "O", "B-LOC", "O"],
+                                  ["B-PER", "B-PER", "B-ORG", "O", "O"]):
+        scorecard.add(gold_tag, pred_tag)
+
+    assert scorecard.total == 5
+    assert scorecard.correct == 2
+    assert scorecard.accuracy == 0.4
+    assert scorecard.get_tag_summary("PER") == {
+        "true_positives": 2,
+        "false_positives": 0,
+        "false_negatives": 0,
+        "precision": 1,
+        "recall": 1,
+        "f1": 1,
+    }
+    assert scorecard.get_tag_summary("ORG")["false_positives"] == 1
+    assert scorecard.get_tag_summary("LOC")["false_negatives"] == 1
+    assert scorecard.get_tag_summary("MISC")["f1"] == 0
+
+
+def test_TokenScoreCard_merge():
+    scorecard = TokenScoreCard()
+    scorecard.add("B-PER", "B-PER")
+
+    other_scorecard = TokenScoreCard()
+    other_scorecard.add("B-LOC", "B-PER")
+    other_scorecard.add("B-PER", "B-PER")
+
+    scorecard.merge(other_scorecard)
+
+    assert scorecard.total == 3
+    assert scorecard.correct == 2
+    assert scorecard.true_positives[scorecard.tag_ids["PER"]] == 2
+    assert scorecard.false_positives[scorecard.tag_ids["PER"]] == 1
+    assert scorecard.false_negatives[scorecard.tag_ids["LOC"]] == 1
@@ -0,0 +1,41 @@
+from seqnereval import annotator_agreement
+from seqnereval.agreement import AgreementCounts
+import pytest
+
+tag_lists_by_annotator = {
+    "ann1": [["B-PER", "I-PER", "O", "B-ORG", "I-ORG"], ["O", "B-LOC", "O"]],
+    "ann2": [["B-PER", "I-PER", "O", "B-ORG", "O"], ["O", "B-LOC", "O"]],
+    "ann3": [["B-PER", "O", "O", "O", "O"], ["O", "O", "B-LOC"]],
+}
+
+
+def test_annotator_agreement():
+    agreement = annotator_agreement(tag_lists_by_annotator)
+
+    assert list(agreement.span_counts) == [3, 3, 2]
+    strict = agreement.pairwise('strict')
+    assert strict[("ann1", "ann2")] == {"precision": 2 / 3, "recall": 2 / 3, "f1": pytest.approx(2 / 3)}
+    assert strict[("ann1", "ann3")] == {"precision": 0, "recall": 0, "f1": 0}
+    partial = agreement.pairwise('partial')
+    assert partial[("ann1", "ann2")]["f1"] == 1
+    assert partial[("ann2", "ann3")] == {"precision": 0.5, "recall": 1 / 3, "f1": pytest.approx(0.4)}
+
+    summary = agreement.summarize()
+    assert summary["unanimous_span_ratio"] == 0
+    assert summary["document_count"] == 2
+    assert summary["mean_strict_f1"] == pytest.approx(2 / 9)
+
+    batched_agreement = annotator_agreement(tag_lists_by_annotator, batch_size=1)
+    assert batched_agreement.pairwise('partial') == partial
+    assert annotator_agreement(tag_lists_by_annotator, jobs=2, batch_size=1).summarize() == summary
+
+    with pytest.raises(Exception):
+        annotator_agreement({"ann1": tag_lists_by_annotator["ann1"]})
+
+
+def test_AgreementCounts_add_document():
+    agreement = AgreementCounts(["ann1", "ann2"])
+    agreement.add_document([[("PER", 0, 1), ("LOC", 3, 3)], [("PER", 0, 1), ("LOC", 3, 3)]])
+
+    assert agreement.summarize() == {
+        "mean_strict_f1": 1, "mean_partial_f1": 1, "unanimous_span_ratio": 1, "document_count": 1}
@@ -0,0 +1,114 @@
+import pytest
+
+from seqnereval import NERTagListEvaluator
+from seqnereval.cache import DocumentResultCache
+
+tokens = [
+    ['The', 'John', 'Doe\'s', 'Basketball', 'Club'],
+    ['The', 'Canada', 'Place', 'is', 'best', '.'],
+    ['_', 'John', 'is', 'a', 'good', 'person', '.'],
+]
+gold = [
+    ["O", "B-PER", "I-PER", "B-ORG", "I-ORG"],
+    ["O", "B-LOC", "I-LOC", "O", "O", "O"],
+    ["O", "S-PER", "O", "O", "O", "O", "O"],
+]
+pred = [
+    ["O", "B-PER", "I-PER", "B-LOC", "I-LOC"],
+    ["O", "B-LOC", "O", "O", "O", "O"],
+    ["O", "O", "O", "O", "B-PER", "E-PER", "O"],
+]
+
+
+def test_DocumentResultCache_put():
+    cache = DocumentResultCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    # 'b' is the least recently used entry.
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_DocumentResultCache_make_key():
+    assert DocumentResultCache.make_key(['a b']) != DocumentResultCache.make_key(['a', 'b'])
+    assert DocumentResultCache.make_key(['a'], ['b']) != DocumentResultCache.make_key(['a', 'b'])
+    assert DocumentResultCache.make_key(['a'], ['b']) == DocumentResultCache.make_key(('a',), ('b',))
+
+
+def test_DocumentResultCache_save(tmp_path):
+    path = str(tmp_path / 'results.cache')
+    assert len(DocumentResultCache.load(path)) == 0
+
+    cache = DocumentResultCache(max_size=3)
+    cache.put('a', [1, 2])
+    cache.put('b', [3])
+    cache.save(path)
+
+    loaded_cache = DocumentResultCache.load(path)
+    assert loaded_cache.max_size == 3
+    assert list(loaded_cache.entries.items()) == [('a', [1, 2]), ('b', [3])]
+    assert len(DocumentResultCache.load(path, max_size=1)) == 1
+
+
+def test_NERTagListEvaluator_result_cache():
+    results, results_grouped_by_tags = NERTagListEvaluator(tokens, gold, pred, tag_scheme='BIOES').evaluate()
+
+    cache = DocumentResultCache()
+    evaluator = NERTagListEvaluator(tokens, gold, pred, tag_scheme='BIOES', result_cache=cache)
+    evaluator.evaluate()
+    assert cache.misses == 3 and len(cache) == 3
+
+    changed_pred = [pred[0], ["O", "B-LOC", "E-LOC", "O", "O", "O"], pred[2]]
+    NERTagListEvaluator(tokens, gold, changed_pred, tag_scheme='BIOES', result_cache=cache).evaluate()
+    assert cache.hits == 2 and cache.misses == 4
+
+    cached_evaluator = NERTagListEvaluator(tokens, gold, pred, tag_scheme='BIOES', result_cache=cache,
+                                           compute_token_metrics=True)
+    cached_results, cached_results_grouped_by_tags = cached_evaluator.evaluate()
+    assert cache.hits == 5
+    assert cached_results.summarize_result() == results.summarize_result()
+    assert cached_results.get_scenario_counts() == results.get_scenario_counts()
+    assert {tag: result.summarize_result() for tag, result in cached_results_grouped_by_tags.items()} == \
+        {tag: result.summarize_result() for tag, result in results_grouped_by_tags.items()}
+    assert cached_evaluator.validation_report["predicted_invalid_transitions"] == \
+        evaluator.validation_report["predicted_invalid_transitions"]
+    assert cached_evaluator.token_results.total == 18
+
+    # documents evaluated with other settings aren't reused.
+    NERTagListEvaluator(tokens, gold, pred, tag_scheme='BIOES', result_cache=cache,
+                        entity_context_padding=1).evaluate()
+    assert cache.hits == 5
+
+    with pytest.raises(Exception):
+        NERTagListEvaluator(tokens, gold, pred, schemes=['lenient', 'strict'], result_cache=cache)
+
+
+def test_DocumentResultCache_compact_entries(tmp_path):
+    cache = DocumentResultCache()
+    NERTagListEvaluator(tokens, gold, pred, tag_scheme='BIOES', result_cache=cache).evaluate()
+
+    # the entry of the first document.
+    gold_spans, pred_spans, _, _, scenario_counts, scenario_rows = next(iter(cache.entries.values()))
+    assert gold_spans == [('PER', 1, 2), ('ORG', 3, 4)] and pred_spans == [('PER', 1, 2), ('LOC', 3, 4)]
+    # one type_match_bounds_match and one type_mismatch_bounds_match pair.
+    assert list(scenario_counts) == [1, 0, 0, 1, 0, 0]
+    assert list(scenario_rows) == [0, 0, 1, 1]
+
+    cached_results, _ = NERTagListEvaluator(tokens, gold, pred, tag_scheme='BIOES', result_cache=cache).evaluate()
+    assert cache.hits == 3
+    assert cached_results.type_mismatch_bounds_match[0].gold_span.spanned_tokens == ['Basketball', 'Club']
+
+    # caches of another format version are discarded.
+    path = str(tmp_path / 'results.cache')
+    cache.save(path)
+    assert len(DocumentResultCache.load(path)) == 3
+    DocumentResultCache.FORMAT_VERSION, format_version = 1, DocumentResultCache.FORMAT_VERSION
+    try:
+        assert len(DocumentResultCache.load(path)) == 0
+    finally:
+        DocumentResultCache.FORMAT_VERSION = format_version
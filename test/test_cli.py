@@ -0,0 +1,97 @@
+from seqnereval.cli import main, read_documents, read_document_pairs
+from seqnereval import ResultAggregator, Span
+import json
+import pytest
+
+CONLL_GOLD = """-DOCSTART- O
+
+John B-PER
+Doe I-PER
+visited O
+Canada B-LOC
+
+Jane B-PER
+"""
+
+CONLL_PRED = """-DOCSTART- O
+
+John B-PER
+Doe O
+visited O
+Canada B-LOC
+
+Jane B-ORG
+"""
+
+
+def write(path, content):
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def test_read_documents(tmp_path):
+    conll_path = write(tmp_path / 'gold.conll', CONLL_GOLD)
+    assert list(read_documents(conll_path)) == [
+        (['John', 'Doe', 'visited', 'Canada'], ['B-PER', 'I-PER', 'O', 'B-LOC']),
+        (['Jane'], ['B-PER']),
+    ]
+
+    tsv_path = write(tmp_path / 'gold.tsv', 'New York\tB-LOC\nis\tO\n')
+    assert list(read_documents(tsv_path)) == [(['New York', 'is'], ['B-LOC', 'O'])]
+
+    jsonl_path = write(tmp_path / 'gold.jsonl', '{"tokens": ["Jane"], "tags": ["B-PER"]}\n\n{"tags": ["O"]}\n')
+    assert list(read_documents(jsonl_path)) == [(['Jane'], ['B-PER']), ([None], ['O'])]
+
+    with pytest.raises(Exception):
+        list(read_documents(write(tmp_path / 'bad.conll', 'John\n')))
+
+    with pytest.raises(Exception):
+        list(read_document_pairs(conll_path, write(tmp_path / 'short.conll', 'John B-PER\n')))
+
+
+def test_main_evaluate(tmp_path, capsys):
+    gold_path = write(tmp_path / 'gold.conll', CONLL_GOLD)
+    pred_path = write(tmp_path / 'pred.conll', CONLL_PRED)
+
+    assert main(['evaluate', gold_path, pred_path, '--output', 'json', '--per-tag', '--counts-only']) == 0
+    captured = capsys.readouterr()
+    output = json.loads(captured.out)
+
+    assert output['overall']['type_match_bounds_match'] == 1
+    assert output['overall']['type_match_bounds_partial'] == 1
+    assert output['overall']['type_mismatch_bounds_match'] == 1
+    assert output['by_tags']['PER']['strict_match']['possible'] == 2
+    assert output['throughput']['documents'] == 2
+    assert 'documents/s' in captured.err
+
+    assert main(['evaluate', gold_path, pred_path, '--jobs', '2', '--batch-size', '1']) == 0
+    assert 'strict_match' in capsys.readouterr().out
+
+
+def test_main_merge(tmp_path, capsys):
+    paths = []
+    for shard_idx in range(2):
+        results = ResultAggregator()
+        results.add_type_match_bounds_match(Span('PER', 0, 1), Span('PER', 0, 1))
+        paths.append(str(tmp_path / f'shard-{shard_idx}.snap'))
+        with open(paths[-1], 'wb') as snapshot_file:
+            snapshot_file.write(results.to_bytes())
+
+    assert main(['merge', *paths, '-o', str(tmp_path / 'merged.snap')]) == 0
+    assert json.loads(capsys.readouterr().out)['strict_match']['correct_counts'] == 2
+    assert (tmp_path / 'merged.snap').exists()
+
+
+def test_main_evaluate_resume(tmp_path, capsys):
+    gold_path = write(tmp_path / 'gold.conll', CONLL_GOLD)
+    pred_path = write(tmp_path / 'pred.conll', CONLL_PRED)
+    checkpoint_path = str(tmp_path / 'evaluation.ckpt')
+
+    assert main(['evaluate', gold_path, pred_path, '--output', 'json', '--resume', checkpoint_path]) == 0
+    first_output = json.loads(capsys.readouterr().out)
+
+    # everything was already evaluated, the results come from the checkpoint.
+    assert main(['evaluate', gold_path, pred_path, '--output', 'json', '--resume', checkpoint_path]) == 0
+    resumed_output = json.loads(capsys.readouterr().out)
+    assert resumed_output['overall'] == first_output['overall']
+    assert resumed_output['throughput']['documents'] == 2
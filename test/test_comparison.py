@@ -0,0 +1,49 @@
+from seqnereval import Span, compare
+import pytest
+
+
+def test_compare():
+    gold = [
+        [Span('PER', 0, 1), Span('ORG', 3, 4), Span('LOC', 6, 6)],
+        [Span('LOC', 1, 2)],
+    ]
+    pred_a = [
+        [Span('PER', 0, 1), Span('PER', 3, 4), Span('LOC', 8, 9)],
+        [Span('LOC', 1, 1), Span('PER', 4, 4)],
+    ]
+    pred_b = [
+        [Span('PER', 0, 0), Span('ORG', 3, 4), Span('LOC', 8, 9)],
+        [Span('LOC', 1, 2), Span('ORG', 5, 5)],
+    ]
+
+    comparison = compare(gold, pred_a, pred_b)
+
+    assert comparison.summarize() == {"fixed": 3, "broken": 2, "unchanged_error": 2, "unchanged_correct": 0}
+    assert comparison.get_spans('fixed') == [
+        (0, 3, 4, 'ORG', 'type_mismatch_bounds_match', 'type_match_bounds_match'),
+        (1, 1, 2, 'LOC', 'type_match_bounds_partial', 'type_match_bounds_match'),
+        (1, 4, 4, 'PER', 'unecessary_predicted_span', None),
+    ]
+    assert comparison.get_spans('broken') == [
+        (0, 0, 1, 'PER', 'type_match_bounds_match', 'type_match_bounds_partial'),
+        (1, 5, 5, 'ORG', None, 'unecessary_predicted_span'),
+    ]
+    assert comparison.get_spans('unchanged_error') == [
+        (0, 6, 6, 'LOC', 'missed_gold_span', 'missed_gold_span'),
+        (0, 8, 9, 'LOC', 'unecessary_predicted_span', 'unecessary_predicted_span'),
+    ]
+    assert comparison.get_counts('fixed') == {
+        'ORG': {'type_mismatch_bounds_match': 1},
+        'LOC': {'type_match_bounds_partial': 1},
+        'PER': {'unecessary_predicted_span': 1},
+    }
+    assert comparison.get_counts('broken') == {
+        'PER': {'type_match_bounds_partial': 1},
+        'ORG': {'unecessary_predicted_span': 1},
+    }
+
+    assert compare(gold, pred_a, pred_a).summarize() == {
+        "fixed": 0, "broken": 0, "unchanged_error": 5, "unchanged_correct": 1}
+
+    with pytest.raises(Exception):
+        compare(gold, pred_a, pred_b[:1])
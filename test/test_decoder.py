@@ -0,0 +1,69 @@
+from seqnereval import decode_tag_list, TagScheme
+import pytest
+
+
+def test_decode_tag_list():
+    tags = ['B-PER', 'I-PER', 'O', 'I-LOC', 'I-LOC', 'B-ORG', 'I-PER', 'U-MISC']
+
+    spans = decode_tag_list(tags, ['lenient', 'strict'])
+    assert spans['lenient'] == [('PER', 0, 1), ('LOC', 3, 4), ('ORG', 5, 5), ('PER', 6, 6), ('MISC', 7, 7)]
+    assert spans['strict'] == [('PER', 0, 1), ('ORG', 5, 5), ('MISC', 7, 7)]
+
+    assert decode_tag_list(['B-PER', 'E-PER', 'S-LOC', 'B-ORG', 'I-ORG'], ['strict']) == {
+        'strict': [('PER', 0, 1), ('LOC', 2, 2), ('ORG', 3, 4)]}
+
+    with pytest.raises(Exception):
+        decode_tag_list(tags, ['iobes'])
+
+    with pytest.raises(Exception):
+        decode_tag_list(['X-PER'], ['strict'])
+
+
+def test_tag_scheme_decode():
+    bioes_strict = TagScheme.from_name('BIOES', 'strict')
+    bioes_lenient = TagScheme.from_name('BIOES', 'lenient')
+    tags = ['B-PER', 'E-PER', 'O', 'B-LOC', 'I-LOC', 'O', 'I-ORG', 'E-ORG', 'S-MISC', 'B-PER']
+
+    assert bioes_strict.decode(tags) == ([('PER', 0, 1), ('MISC', 8, 8)], 4)
+    assert bioes_lenient.decode(tags) == (
+        [('PER', 0, 1), ('LOC', 3, 4), ('ORG', 6, 7), ('MISC', 8, 8), ('PER', 9, 9)], 3)
+
+    tag_ids = bioes_strict.encode(tags)
+    assert tag_ids[:3] == [0, 1, 2] and tag_ids[6] == bioes_strict.tag_ids['I-ORG']
+    assert bioes_strict.decode_ids(tag_ids) == bioes_strict.decode(tags)
+
+    bilou = TagScheme.from_name('BILOU', 'strict')
+    assert bilou.decode(['B-PER', 'I-PER', 'L-PER', 'U-LOC']) == ([('PER', 0, 2), ('LOC', 3, 3)], 0)
+
+    iob1 = TagScheme.from_name('IOB1')
+    assert iob1.decode(['I-PER', 'I-PER', 'B-PER', 'O', 'I-LOC']) == ([('PER', 0, 1), ('PER', 2, 2), ('LOC', 4, 4)], 0)
+    # a B- tag not following an entity of the same type starts an entity leniently, and the whole entity it
+    # starts is dropped in strict mode.
+    assert iob1.decode(['B-PER', 'I-PER', 'I-LOC', 'B-ORG']) == ([('PER', 0, 1), ('LOC', 2, 2), ('ORG', 3, 3)], 2)
+    iob1_strict = TagScheme.from_name('IOB1', 'strict')
+    assert iob1_strict.decode(['B-PER', 'I-PER', 'I-LOC', 'B-ORG']) == ([('LOC', 2, 2)], 2)
+    assert iob1_strict.decode(['B-PER', 'I-PER', 'O']) == ([], 1)
+    assert iob1_strict.decode(['I-LOC', 'B-PER', 'I-PER', 'B-PER']) == ([('LOC', 0, 0), ('PER', 3, 3)], 1)
+    assert iob1_strict.decode(['I-PER', 'B-PER']) == ([('PER', 0, 0), ('PER', 1, 1)], 0)
+    # like BIO-strict, which drops an entity without B- tag.
+    assert TagScheme.from_name('BIO', 'strict').decode(['I-PER', 'I-PER', 'O']) == ([], 2)
+    decoder = iob1_strict.decoder()
+    for offset, tag in enumerate(['B-PER', 'I-PER', 'O', 'I-LOC']):
+        decoder.step(offset, tag)
+    assert decoder.finish(4) == [('LOC', 3, 3)]
+
+    with pytest.raises(Exception):
+        bioes_strict.decode(['U-PER'])
+
+    with pytest.raises(Exception):
+        TagScheme.from_name('IOBES')
+
+
+def test_get_decoder_copies_the_registered_schemes():
+    from seqnereval.decoder import DECODERS, get_decoder
+
+    bio = get_decoder('BIO')
+    assert bio.decode(['B-PER', 'I-PER', 'B-LOC']) == ([('PER', 0, 1), ('LOC', 2, 2)], 0)
+    assert bio is not DECODERS['BIO'] and bio.transition_table is DECODERS['BIO'].transition_table
+    assert get_decoder('BIO').tag_ids == {}
+    assert DECODERS['BIO'].tag_ids == {}
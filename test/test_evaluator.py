@@ -1,5 +1,5 @@
 from seqnereval.models import GoldPredictedPair
-from seqnereval import NERTagListEvaluator, NEREvaluator, Span
+from seqnereval import NERTagListEvaluator, NEREvaluator, NERCharOffsetEvaluator, Span
 import pytest
 import json
 
@@ -596,3 +596,385 @@ def test_ner_evaluator_summarize_results():
         "recall": 0,
         "f1": 0,
     }}
+
+
+def test_ner_evaluator_confusion_matrix():
+    gold_entities = [
+        [Span("PER", 0, 1), Span("LOC", 5, 6), Span("ORG", 10, 12), Span("MISC", 20, 20)],
+        [Span("PER", 0, 1)],
+    ]
+    predicted_entities = [
+        [Span("PER", 0, 1), Span("ORG", 5, 6), Span("PER", 11, 13), Span("LOC", 30, 31)],
+        [Span("ORG", 0, 2)],
+    ]
+
+    evaluator = NEREvaluator(gold_entities, predicted_entities)
+    res, _ = evaluator.evaluate()
+
+    assert res.confusion_matrix.to_dict() == {
+        None: {"LOC": 1},
+        "PER": {"PER": 1, "ORG": 1},
+        "LOC": {"ORG": 1},
+        "ORG": {"PER": 1},
+        "MISC": {None: 1},
+    }
+
+
+def test_ner_taglist_eval_token_metrics():
+    tokens = [
+        ['The', 'John', 'Doe\'s', 'Basketball', 'Club'],
+        ['The', 'Canada', 'Place', 'is', 'best', '.'],
+    ]
+    gold = [
+        ["O", "B-PER", "I-PER", "B-ORG", "I-ORG"],
+        ["O", "B-LOC", "I-LOC", "O", "O", "O"],
+    ]
+    pred = [
+        ["O", "B-PER", "I-PER", "B-LOC", "I-ORG"],
+        ["O", "B-LOC", "O", "O", "O", "B-PER"],
+    ]
+
+    evaluator = NERTagListEvaluator(tokens, gold, pred, compute_token_metrics=True)
+    token_results = evaluator.token_results
+
+    assert token_results.total == 11
+    assert token_results.correct == 8
+    assert token_results.get_tag_summary("PER")["true_positives"] == 2
+    assert token_results.get_tag_summary("PER")["false_positives"] == 1
+    assert token_results.get_tag_summary("ORG")["false_negatives"] == 1
+    assert token_results.get_tag_summary("LOC")["false_positives"] == 1
+    assert token_results.get_tag_summary("LOC")["false_negatives"] == 1
+
+    assert NERTagListEvaluator(tokens, gold, pred).token_results is None
+
+    with pytest.raises(Exception):
+        NERTagListEvaluator([['X', 'X']], [['O', 'O']], [['O']], compute_token_metrics=True)
+
+
+def test_ner_evaluator_overlapping_spans():
+    gold_entities = [
+        [
+            Span("ORG", 0, 4),
+            Span("LOC", 3, 4),
+            Span("PER", 10, 11),
+            Span("GENE", 20, 25),
+            Span("PROTEIN", 21, 22),
+        ]
+    ]
+    predicted_entities = [
+        [
+            Span("LOC", 3, 4),
+            Span("ORG", 0, 3),
+            Span("PER", 10, 11),
+            Span("PROTEIN", 21, 22),
+            Span("PROTEIN", 23, 24),
+            Span("GENE", 19, 25),
+            Span("MISC", 30, 31),
+        ]
+    ]
+
+    evaluator = NEREvaluator(gold_entities, predicted_entities)
+    res, _ = evaluator.evaluate()
+
+    assert res.type_match_bounds_match == [
+        GoldPredictedPair(Span("LOC", 3, 4), Span("LOC", 3, 4)),
+        GoldPredictedPair(Span("PER", 10, 11), Span("PER", 10, 11)),
+        GoldPredictedPair(Span("PROTEIN", 21, 22), Span("PROTEIN", 21, 22)),
+    ]
+    assert res.type_match_bounds_partial == [
+        GoldPredictedPair(Span("ORG", 0, 4), Span("ORG", 0, 3)),
+        GoldPredictedPair(Span("GENE", 20, 25), Span("GENE", 19, 25)),
+    ]
+    assert res.type_mismatch_bounds_match == []
+    assert res.type_mismatch_bounds_partial == []
+    assert res.missed_gold_span == []
+    assert res.unecessary_predicted_span == [Span("PROTEIN", 23, 24), Span("MISC", 30, 31)]
+    assert res.strict_match.possible == 5
+    assert res.strict_match.actual == 7
+
+
+def test_ner_evaluator_overlapping_spans_assignment():
+    # a single predicted span can only be matched with one of the nested gold spans
+    gold_entities = [[Span("ORG", 0, 5), Span("PER", 0, 1)]]
+    predicted_entities = [[Span("PER", 0, 1)]]
+
+    evaluator = NEREvaluator(gold_entities, predicted_entities)
+    res, _ = evaluator.evaluate()
+
+    assert res.type_match_bounds_match == [GoldPredictedPair(Span("PER", 0, 1), Span("PER", 0, 1))]
+    assert res.missed_gold_span == [Span("ORG", 0, 5)]
+    assert res.unecessary_predicted_span == []
+
+    res, _ = NEREvaluator([[Span("PER", 0, 5), Span("LOC", 2, 3)]], [[Span("LOC", 2, 3)]]).evaluate()
+    assert res.type_match_bounds_match == [GoldPredictedPair(Span("LOC", 2, 3), Span("LOC", 2, 3))]
+    assert res.type_mismatch_bounds_partial == []
+    assert res.missed_gold_span == [Span("PER", 0, 5)]
+    assert res.strict_match.actual == 1
+
+    # a perfect nested prediction is a perfect score.
+    nested_entities = [Span("ORG", 0, 4), Span("LOC", 3, 4)]
+    res, _ = NEREvaluator([list(nested_entities)], [list(nested_entities)]).evaluate()
+    assert res.type_match_bounds_match == [GoldPredictedPair(span, span) for span in nested_entities]
+    assert res.type_mismatch_bounds_partial == []
+    assert (res.strict_match.precision, res.strict_match.recall, res.strict_match.f1) == (1, 1, 1)
+
+
+def test_ner_evaluator_overlapping_spans_same_policy():
+    # a nested span elsewhere in the document doesn't change how the other spans are matched, and a gold span
+    # following one partially matched by several predicted spans is still missed.
+    gold_entities = [Span("ORG", 0, 5), Span("LOC", 10, 12)]
+    predicted_entities = [Span("ORG", 0, 1), Span("ORG", 3, 8), Span("MISC", 20, 21)]
+    nested_gold_entity, nested_predicted_entity = Span("PER", 30, 35), Span("PER", 31, 32)
+
+    res, _ = NEREvaluator([list(gold_entities)], [list(predicted_entities)]).evaluate()
+    nested_res, _ = NEREvaluator([gold_entities + [nested_gold_entity, Span("PER", 33, 33)]],
+                                 [predicted_entities + [nested_predicted_entity]]).evaluate()
+
+    # the gold span is only matched with the predicted span overlapping it the most, the other one is spurious.
+    assert res.type_match_bounds_partial == [GoldPredictedPair(Span("ORG", 0, 5), Span("ORG", 3, 8))]
+    assert res.missed_gold_span == [Span("LOC", 10, 12)]
+    assert res.unecessary_predicted_span == [Span("ORG", 0, 1), Span("MISC", 20, 21)]
+
+    assert nested_res.type_match_bounds_partial == res.type_match_bounds_partial + [
+        GoldPredictedPair(nested_gold_entity, nested_predicted_entity)]
+    assert nested_res.missed_gold_span == [Span("LOC", 10, 12), Span("PER", 33, 33)]
+    assert nested_res.unecessary_predicted_span == res.unecessary_predicted_span
+
+
+def test_ner_evaluator_validation_policy():
+    gold_entities = [[Span("PER", 5, 2), Span("LOC", 0, 1), Span("ORG", 8, 12)], [Span("PER", 0, 1)]]
+    predicted_entities = [[Span("LOC", 0, 1), Span("LOC", 1, 3)]]
+
+    with pytest.raises(Exception):
+        NEREvaluator(gold_entities, predicted_entities)
+
+    with pytest.raises(Exception):
+        NEREvaluator([[Span("PER", 5, 2)]], [[]])
+
+    with pytest.raises(Exception):
+        NEREvaluator([[Span("PER", 0, 1), Span("PER", 1, 2)]], [[]], allow_overlapping_spans=False)
+
+    with pytest.raises(Exception):
+        NEREvaluator([[Span("PER", 8, 10)]], [[]], doc_lengths=[10])
+
+    with pytest.raises(Exception):
+        NEREvaluator([[]], [[]], validation_policy='ignore')
+
+    with pytest.warns(UserWarning):
+        evaluator = NEREvaluator(gold_entities, predicted_entities, validation_policy='warn',
+                                 allow_overlapping_spans=False, doc_lengths=[10])
+
+    assert evaluator.gold_entity_span_lists == [[Span("LOC", 0, 1)]]
+    assert evaluator.pred_entity_span_lists == [[Span("LOC", 0, 1)]]
+    assert evaluator.validation_report == {
+        "document_count_mismatch": 1,
+        "invalid_bounds": 1,
+        "out_of_range": 1,
+        "overlapping_spans": 1,
+    }
+
+    evaluator = NEREvaluator(gold_entities, predicted_entities, validation_policy='skip')
+    res, _ = evaluator.evaluate()
+    assert evaluator.validation_report["invalid_bounds"] == 1
+    assert res.missed_gold_span == [Span("ORG", 8, 12)]
+    assert res.type_match_bounds_match == [GoldPredictedPair(Span("LOC", 0, 1), Span("LOC", 0, 1))]
+    assert res.type_match_bounds_partial == []
+
+
+def test_ner_taglist_eval_keeps_documents_without_entities():
+    tokens = [['The', 'John'], ['is', 'here'], ['Jane', 'too']]
+    gold = [['O', 'B-PER'], ['O', 'O'], ['B-PER', 'O']]
+    pred = [['O', 'B-PER'], ['O', 'B-LOC'], ['O', 'O']]
+
+    evaluator = NERTagListEvaluator(tokens, gold, pred)
+    assert evaluator.gold_entity_span_lists[1] == []
+    assert evaluator.pred_entity_span_lists[2] == []
+
+    res, _ = evaluator.evaluate()
+    assert res.unecessary_predicted_span == [Span("LOC", 1, 1)]
+    assert res.missed_gold_span == [Span("PER", 0, 0)]
+
+
+def test_ner_char_offset_evaluator():
+    texts = ['The John Doe\'s Basketball Club', 'The Canada Place is best.']
+    gold = [[(4, 14, 'PER'), (15, 30, 'ORG')], [(4, 16, 'LOC')]]
+    pred = [[(4, 8, 'PER'), (15, 30, 'LOC')], [(4, 16, 'LOC'), (20, 24, 'MISC')]]
+
+    evaluator = NERCharOffsetEvaluator(gold, pred, texts)
+    res, _ = evaluator.evaluate()
+
+    assert res.type_match_bounds_match == [GoldPredictedPair(Span('LOC', 4, 15), Span('LOC', 4, 15))]
+    assert res.type_match_bounds_partial == [GoldPredictedPair(Span('PER', 4, 13), Span('PER', 4, 7))]
+    assert res.type_mismatch_bounds_match == [GoldPredictedPair(Span('ORG', 15, 29), Span('LOC', 15, 29))]
+    assert res.unecessary_predicted_span == [Span('MISC', 20, 23)]
+    assert res.type_match_bounds_partial[0].predicted_span.spanned_tokens == 'John'
+    assert res.unecessary_predicted_span[0].spanned_tokens == 'best'
+
+    with pytest.raises(Exception):
+        NERCharOffsetEvaluator([[(4, 40, 'PER')]], [[]], ['The John'])
+
+    with pytest.raises(Exception):
+        NERCharOffsetEvaluator([[]], [[]], ['The John', 'Doe'])
+
+
+def test_ner_taglist_eval_from_subword_predictions():
+    tokens = [['The', 'John', 'Doe\'s', 'Club']]
+    gold = [['O', 'B-PER', 'I-PER', 'O']]
+    id_to_tag = ['O', 'B-PER', 'I-PER', 'B-ORG']
+    # [CLS] The Jo ##hn Doe ' s Club [SEP]
+    word_ids = [[None, 0, 1, 1, 2, 2, 2, 3, None]]
+    subword_tag_ids = [[0, 0, 1, 2, 2, 0, 0, 3, 0]]
+
+    evaluator = NERTagListEvaluator.from_subword_predictions(tokens, gold, subword_tag_ids, word_ids, id_to_tag)
+    assert evaluator.pred_tag_lists == [['O', 'B-PER', 'I-PER', 'B-ORG']]
+
+    evaluator = NERTagListEvaluator.from_subword_predictions(tokens, gold, subword_tag_ids, word_ids, id_to_tag,
+                                                             'majority', entity_context_padding=1)
+    assert evaluator.pred_tag_lists == [['O', 'B-PER', 'O', 'B-ORG']]
+    assert evaluator.entity_context_padding == 1
+
+    res, _ = evaluator.evaluate()
+    assert res.type_match_bounds_partial == [GoldPredictedPair(Span('PER', 1, 2), Span('PER', 1, 1))]
+    assert res.unecessary_predicted_span == [Span('ORG', 3, 3)]
+
+
+def test_ner_evaluator_results_grouped_by_tags():
+    gold_entities = [[Span("PER", 0, 1), Span("LOC", 5, 6)], [Span("PER", 2, 3)]]
+    predicted_entities = [[Span("PER", 0, 1)], [Span("PER", 2, 3), Span("ORG", 8, 9)]]
+
+    res, res_by_tags = NEREvaluator(gold_entities, predicted_entities).evaluate()
+
+    assert sorted(res_by_tags.keys()) == ["LOC", "ORG", "PER"]
+    assert len(res_by_tags["PER"].type_match_bounds_match) == 2
+    assert res_by_tags["LOC"].missed_gold_span == [Span("LOC", 5, 6)]
+    assert res_by_tags["ORG"].unecessary_predicted_span == [Span("ORG", 8, 9)]
+    assert res.strict_match.get_summary()["precision"] == 2 / 3
+
+
+def test_ner_taglist_eval_schemes():
+    tokens = [['The', 'John', 'Doe', 'went', 'to', 'Vancouver']]
+    gold = [['O', 'B-PER', 'I-PER', 'O', 'O', 'B-LOC']]
+    pred = [['O', 'B-PER', 'I-PER', 'O', 'O', 'I-LOC']]
+
+    evaluator = NERTagListEvaluator(tokens, gold, pred, schemes=['lenient', 'strict'], compute_token_metrics=True)
+    results_by_scheme = evaluator.evaluate_schemes()
+
+    lenient_res, _ = results_by_scheme['lenient']
+    strict_res, strict_res_by_tags = results_by_scheme['strict']
+    assert len(lenient_res.type_match_bounds_match) == 2
+    assert len(strict_res.type_match_bounds_match) == 1
+    assert strict_res_by_tags['LOC'].missed_gold_span == [Span('LOC', 5, 5)]
+    assert evaluator.results is lenient_res
+    assert evaluator.token_results.total == 6
+
+    other_res, _ = evaluator.evaluate_predictions([[Span('PER', 1, 2)]])
+    assert len(other_res.missed_gold_span) == 1
+    assert evaluator.results is lenient_res
+
+    with pytest.raises(Exception):
+        NERTagListEvaluator(tokens, gold, pred).evaluate_schemes()
+
+
+def test_ner_taglist_eval_tag_scheme():
+    tokens = [['The', 'John', 'Doe', 'went', 'to', 'Vancouver', 'BC']]
+    gold = [['O', 'B-PER', 'E-PER', 'O', 'O', 'B-LOC', 'E-LOC']]
+    pred = [['O', 'B-PER', 'I-PER', 'O', 'O', 'B-LOC', 'E-LOC']]
+
+    evaluator = NERTagListEvaluator(tokens, gold, pred, tag_scheme='BIOES-strict', schemes=['BIOES-strict', 'BIOES'])
+    results_by_scheme = evaluator.evaluate_schemes()
+
+    assert len(results_by_scheme['BIOES-strict'][0].missed_gold_span) == 1
+    assert len(results_by_scheme['BIOES'][0].type_match_bounds_match) == 2
+    assert evaluator.validation_report["gold_invalid_transitions"] == 0
+    assert evaluator.validation_report["predicted_invalid_transitions"] == 1
+    assert evaluator.invalid_transition_counts_by_scheme == {'BIOES-strict': 1, 'BIOES': 1}
+
+    # legacy decoding is kept by the 'lenient' scheme
+    gold = [['O', 'B-PER', 'I-PER', 'O', 'O', 'B-LOC', 'I-LOC']]
+    pred = [['B-PER', 'L-PER', 'I-LOC', 'U-LOC', 'I-LOC', 'O', 'B-ORG']]
+    default_res, _ = NERTagListEvaluator(tokens, gold, pred, validation_policy='skip').evaluate()
+    lenient_res, _ = NERTagListEvaluator(tokens, gold, pred, schemes=['lenient'], validation_policy='skip').evaluate()
+    assert default_res.get_scenario_counts() == lenient_res.get_scenario_counts()
+    assert default_res.unecessary_predicted_span == lenient_res.unecessary_predicted_span
+
+
+def test_ner_evaluator_breakdowns():
+    gold_entities = [[Span("PER", 0, 1), Span("LOC", 5, 5)], [Span("ORG", 2, 8)]]
+    predicted_entities = [[Span("PER", 0, 1)], [Span("ORG", 2, 5)]]
+
+    res, res_by_tags = NEREvaluator(gold_entities, predicted_entities, breakdowns=['length']).evaluate()
+
+    length_breakdown = res.breakdowns['length']
+    assert length_breakdown.counts['type_match_bounds_match'] == [0, 1, 0, 0]
+    assert length_breakdown.counts['missed_gold_span'] == [1, 0, 0, 0]
+    assert length_breakdown.counts['type_match_bounds_partial'] == [0, 0, 0, 1]
+    assert res_by_tags['ORG'].breakdowns['length'].counts['type_match_bounds_partial'] == [0, 0, 0, 1]
+    assert length_breakdown.summarize_result()['2']['strict_match']['f1'] == 1
+
+
+def test_ner_evaluator_prediction_scores():
+    gold = [[(0, 4, 'PER'), (10, 16, 'LOC')]]
+    pred = [[(0, 4, 'PER', 0.95), (6, 8, 'ORG', 0.4), (10, 16, 'LOC', 0.7)]]
+
+    res, _ = NERCharOffsetEvaluator(gold, pred).evaluate()
+    assert res.type_match_bounds_match[0].predicted_span.score == 0.95
+    threshold, summary = res.prediction_scores.best_f1_threshold()
+    assert threshold == 0.7
+    assert summary["f1"] == 1
+
+
+def test_ner_evaluator_examples_per_category():
+    gold_entities = [[Span("PER", idx, idx) for idx in range(0, 20, 2)] for _ in range(5)]
+    predicted_entities = [[Span("PER", idx, idx) for idx in range(0, 10, 2)] for _ in range(5)]
+
+    res, res_by_tags = NEREvaluator(gold_entities, predicted_entities, examples_per_category=3).evaluate()
+
+    assert len(res.type_match_bounds_match) == 3
+    assert len(res_by_tags["PER"].missed_gold_span) == 3
+    assert res.get_scenario_counts()["type_match_bounds_match"] == 25
+    assert res.strict_match.get_summary()["recall"] == 0.5
+
+
+class FakeArray:
+    """Stands in for a NumPy array, only `tolist` is used."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def tolist(self):
+        return self.rows
+
+
+def test_ner_evaluator_from_padded_arrays():
+    id_to_label = {0: 'O', 1: 'B-PER', 2: 'I-PER', 3: 'B-LOC'}
+    # [CLS] John Do ##e visited Canada [SEP] <pad>
+    gold_label_ids = FakeArray([[-100, 1, 2, -100, 0, 3, -100, -100],
+                                [-100, 3, 0, -100, 0, 0, 0, 0]])
+    pred_label_ids = FakeArray([[0, 1, 0, 2, 0, 3, 0, 0],
+                                [0, 1, 2, 0, 3, 3, 3, 3]])
+
+    evaluator = NEREvaluator.from_padded_arrays(gold_label_ids, pred_label_ids, id_to_label, lengths=FakeArray([8, 3]))
+    assert evaluator.gold_entity_span_lists == [[Span('PER', 0, 1), Span('LOC', 3, 3)], [Span('LOC', 0, 0)]]
+    assert evaluator.pred_entity_span_lists == [[Span('PER', 0, 0), Span('LOC', 3, 3)], [Span('PER', 0, 1)]]
+    assert evaluator.doc_lengths == [4, 2]
+
+    res, _ = evaluator.evaluate()
+    assert res.type_match_bounds_match == [GoldPredictedPair(Span('LOC', 3, 3), Span('LOC', 3, 3))]
+    assert res.type_match_bounds_partial == [GoldPredictedPair(Span('PER', 0, 1), Span('PER', 0, 0))]
+    assert res.type_mismatch_bounds_partial == [GoldPredictedPair(Span('LOC', 0, 0), Span('PER', 0, 1))]
+
+    mask = [[1, 1, 1, 1, 1, 1, 1, 0], [1, 1, 1, 0, 0, 0, 0, 0]]
+    masked_evaluator = NEREvaluator.from_padded_arrays(gold_label_ids.rows, pred_label_ids.rows,
+                                                       ['O', 'B-PER', 'I-PER', 'B-LOC'], mask=mask)
+    assert masked_evaluator.pred_entity_span_lists == evaluator.pred_entity_span_lists
+
+    with pytest.raises(Exception):
+        NEREvaluator.from_padded_arrays([[0, 1]], [[0]], id_to_label)
+
+    # pad ids other than ignore_index must not index the labels from the end.
+    with pytest.raises(Exception, match='gold label id -1 in row #0'):
+        NEREvaluator.from_padded_arrays([[1, 2, 0, -1]], [[1, 2, 0, 0]], ['O', 'B-PER', 'I-PER'])
+    with pytest.raises(Exception, match='predicted label id 3 in row #1'):
+        NEREvaluator.from_padded_arrays([[1, 2], [0, 0]], [[1, 2], [0, 3]], ['O', 'B-PER', 'I-PER'])
+    assert NEREvaluator.from_padded_arrays([[1, 2, 0, -1]], [[1, 2, 0, 0]], ['O', 'B-PER', 'I-PER'],
+                                           ignore_index=-1).gold_entity_span_lists == [[Span('PER', 0, 1)]]
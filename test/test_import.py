@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+# generous enough for slow CI machines, an eager import of numpy alone takes longer.
+IMPORT_TIME_BUDGET_US = 50000
+
+
+def import_times(statement: str):
+    """Runs the statement in a fresh interpreter with -X importtime and returns {module: cumulative time in us}.
+    """
+    completed_process = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                                       capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed_process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_import_is_lazy():
+    times = import_times('import seqnereval')
+
+    assert 'seqnereval' in times
+    assert times['seqnereval'] < IMPORT_TIME_BUDGET_US
+    for module in times:
+        assert not module.startswith(('numpy', 'pandas', 'asyncio', 'multiprocessing', 'seqnereval.'))
+
+
+def test_lazy_attributes():
+    times = import_times('import seqnereval; seqnereval.NERTagListEvaluator')
+
+    assert 'seqnereval.evaluator' in times
+    assert 'seqnereval.service' not in times
+    assert 'seqnereval.streaming' not in times
+
+
+def test_evaluating_doesnt_import_caches_and_snapshots():
+    times = import_times("from seqnereval import NERTagListEvaluator; "
+                         "NERTagListEvaluator([['John']], [['B-PER']], [['B-PER']]).evaluate()")
+
+    for module in ('seqnereval.cache', 'seqnereval.checkpoint', 'seqnereval.models.result_snapshot', 'pickle', 'mmap'):
+        assert module not in times
+
+
+def test_dir_lists_lazy_attributes():
+    import seqnereval
+
+    assert 'NEREvaluator' in dir(seqnereval)
+    assert seqnereval.NEREvaluator is seqnereval.evaluator.NEREvaluator
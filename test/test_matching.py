@@ -0,0 +1,59 @@
+from seqnereval import NEREvaluator, NERTagListEvaluator
+from seqnereval.matching import assign_overlapping_pairs, count_decoded_spans, find_overlapping_pairs
+from seqnereval.models import ConfusionMatrix, CountAggregator, Span
+from seqnereval.streaming import evaluate_batch
+import random
+
+
+def test_find_overlapping_pairs():
+    gold_bounds = [(0, 5), (2, 3), (10, 12)]
+    pred_bounds = [(0, 1), (3, 8), (20, 21)]
+
+    pairs, gold_overlaps, pred_overlaps = find_overlapping_pairs(gold_bounds, pred_bounds)
+    assert pairs == [(0, 0), (0, 1), (1, 1)]
+    assert list(gold_overlaps) == [1, 1, 0]
+    assert list(pred_overlaps) == [1, 1, 0]
+
+
+def test_assign_overlapping_pairs():
+    # exact matches go first, then the same type over the longest overlap, every span is assigned at most once.
+    gold_bounds, gold_types = [(0, 5), (2, 3), (10, 12)], ['PER', 'LOC', 'ORG']
+    pred_bounds, pred_types = [(0, 1), (2, 3), (3, 8), (10, 11), (11, 12)], ['PER', 'LOC', 'PER', 'MISC', 'ORG']
+
+    pairs, gold_assigned, pred_assigned = assign_overlapping_pairs(gold_bounds, gold_types, pred_bounds, pred_types)
+    assert pairs == [(0, 2), (1, 1), (2, 4)]
+    assert list(gold_assigned) == [1, 1, 1]
+    assert list(pred_assigned) == [0, 1, 1, 0, 1]
+
+
+def test_count_decoded_spans():
+    gold_spans = [('ORG', 0, 4), ('LOC', 3, 4), ('PER', 10, 11), ('PER', 14, 14)]
+    pred_spans = [('LOC', 3, 4), ('ORG', 0, 3), ('PER', 10, 11), ('MISC', 20, 21)]
+
+    counts, confusion_matrix = CountAggregator(), ConfusionMatrix()
+    count_decoded_spans(gold_spans, pred_spans, counts, confusion_matrix)
+
+    results, results_grouped_by_tags = NEREvaluator(
+        [[Span(*span) for span in gold_spans]], [[Span(*span) for span in pred_spans]]).evaluate()
+    assert counts.get_scenario_counts() == results.get_scenario_counts()
+    for tag, results_for_tag in results_grouped_by_tags.items():
+        assert counts.get_scenario_counts(tag) == results_for_tag.get_scenario_counts()
+    assert confusion_matrix == results.confusion_matrix
+
+
+def test_evaluate_batch_counts_only_matches_full_evaluation():
+    random.seed(7)
+    tags = ['O', 'O', 'O', 'B-PER', 'I-PER', 'B-LOC', 'I-LOC', 'U-ORG', 'L-ORG']
+    documents = []
+    for _ in range(50):
+        length = random.randint(0, 30)
+        documents.append((['tok'] * length, random.choices(tags, k=length), random.choices(tags, k=length)))
+
+    batch_result = evaluate_batch(documents, counts_only=True)
+    tokens, gold_tag_lists, pred_tag_lists = zip(*documents)
+    results, results_grouped_by_tags = NERTagListEvaluator(tokens, gold_tag_lists, pred_tag_lists).evaluate()
+
+    assert batch_result.counts.get_scenario_counts() == results.get_scenario_counts()
+    for tag, results_for_tag in results_grouped_by_tags.items():
+        assert batch_result.counts.get_scenario_counts(tag) == results_for_tag.get_scenario_counts()
+    assert batch_result.confusion_matrix == results.confusion_matrix
@@ -0,0 +1,51 @@
+from seqnereval import NERTagListEvaluator
+from seqnereval.parallel import SharedTagArrays, evaluate_shared
+from seqnereval.models import CountAggregator
+
+tokens = [
+    ['The', 'John', 'Doe\'s', 'Basketball', 'Club'],
+    ['The', 'Canada', 'Place', 'is', 'best', '.'],
+    [],
+    ['_', 'John', 'is', 'a', 'good', 'person', '.'],
+]
+gold = [
+    ["O", "B-PER", "I-PER", "B-ORG", "I-ORG"],
+    ["O", "B-LOC", "I-LOC", "O", "O", "O"],
+    [],
+    ["O", "U-PER", "O", "O", "O", "O", "O"],
+]
+pred = [
+    ["O", "B-PER", "I-PER", "B-LOC", "I-LOC"],
+    ["O", "B-LOC", "O", "O", "O", "O"],
+    [],
+    ["O", "O", "O", "O", "B-PER", "O", "O"],
+]
+
+
+def test_SharedTagArrays_document_ranges():
+    with SharedTagArrays(gold, pred) as tag_arrays:
+        assert tag_arrays.document_count == 4 and tag_arrays.token_count == 18
+        assert list(tag_arrays.costs) == [13, 9, 0, 9]
+        assert tag_arrays.document_ranges(100) == [(0, 4)]
+        assert tag_arrays.document_ranges(20) == [(0, 1), (1, 4)]
+        assert tag_arrays.document_ranges(1) == [(0, 1), (1, 2), (2, 3), (3, 4)]
+
+
+def test_evaluate_shared():
+    results, results_grouped_by_tags = NERTagListEvaluator(tokens, gold, pred).evaluate()
+    counts = CountAggregator.from_results_grouped_by_tags(results_grouped_by_tags)
+
+    with SharedTagArrays(gold, pred) as tag_arrays:
+        batch_result = evaluate_shared(tag_arrays, chunk_cost=10)
+        assert list(batch_result.worker_timings.values())[0]["chunks"] == 3
+        assert batch_result.results is None
+        assert batch_result.counts.summarize_result_by_tags() == counts.summarize_result_by_tags()
+        assert batch_result.confusion_matrix.to_dict() == results.confusion_matrix.to_dict()
+        assert batch_result.document_count == 4 and batch_result.token_count == 18
+
+        parallel_batch_result = evaluate_shared(tag_arrays, jobs=2, counts_only=False)
+        assert parallel_batch_result.counts.summarize_result_by_tags() == counts.summarize_result_by_tags()
+        assert parallel_batch_result.results.summarize_result() == results.summarize_result()
+        assert sum(timing["tokens"] for timing in parallel_batch_result.worker_timings.values()) == 18
+        assert [(span.span_type, span.start_idx, span.end_idx) for span in parallel_batch_result.results.missed_gold_span] == \
+            [(span.span_type, span.start_idx, span.end_idx) for span in results.missed_gold_span]
@@ -0,0 +1,15 @@
+from seqnereval.scheduling import largest_first, pack_document_ranges, tag_list_cost
+
+
+def test_tag_list_cost():
+    assert tag_list_cost(['B-PER', 'I-PER', 'O'], ['O', 'O', 'B-LOC']) == 6
+
+
+def test_pack_document_ranges():
+    assert pack_document_ranges([5, 5, 50000, 1, 1, 1], 10) == [(0, 2), (2, 3), (3, 6)]
+    assert pack_document_ranges([5, 5, 5], 100) == [(0, 3)]
+    assert pack_document_ranges([], 10) == []
+
+
+def test_largest_first():
+    assert largest_first([10, 50000, 3, 10]) == [1, 0, 3, 2]
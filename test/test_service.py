@@ -0,0 +1,113 @@
+from seqnereval.service import EvaluationService, evaluate_document
+import asyncio
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_evaluate_document():
+    results, results_grouped_by_tags = evaluate_document(None, ['B-PER', 'I-PER', 'O'], ['B-PER', 'I-PER', 'B-LOC'])
+
+    assert len(results.type_match_bounds_match) == 1
+    assert len(results.unecessary_predicted_span) == 1
+    assert sorted(results_grouped_by_tags.keys()) == ['LOC', 'PER']
+
+
+def test_EvaluationService_snapshot():
+    clock = FakeClock()
+
+    async def run():
+        async with EvaluationService(worker_count=2, window_seconds=10, decay_half_life_seconds=10,
+                                     clock=clock) as service:
+            await service.submit(['B-PER', 'O'], ['B-PER', 'O'], ['John', 'is'])
+            await service.submit(['B-PER', 'O'], ['O', 'O'])
+            await service.join()
+
+            clock.now = 10
+            await service.submit(['B-LOC', 'O'], ['B-LOC', 'O'])
+            await service.join()
+            return service.snapshot()
+
+    snapshot = asyncio.run(run())
+
+    assert snapshot["documents_processed"] == 3
+    assert snapshot["documents_failed"] == 0
+    assert snapshot["overall"]["type_match_bounds_match"] == 2
+    assert snapshot["overall"]["missed_gold_span"] == 1
+    assert snapshot["confusion_matrix"]["PER"]["PER"] == 1
+    assert snapshot["by_tags"]["PER"]["strict_match"]["recall"] == 0.5
+    assert snapshot["by_tags"]["LOC"]["strict_match"]["f1"] == 1
+
+    # the first two documents fell out of the window
+    assert snapshot["window"]["documents"] == 1
+    assert snapshot["window"]["overall"]["strict_match"]["f1"] == 1
+    assert list(snapshot["window"]["by_tags"].keys()) == ["LOC"]
+
+    # the first two documents are worth half of the last one
+    decayed = snapshot["decayed"]["overall"]["strict_match"]
+    assert decayed["correct_counts"] == pytest.approx(1.5)
+    assert decayed["missed_counts"] == pytest.approx(0.5)
+    assert decayed["recall"] == pytest.approx(0.75)
+
+
+def test_EvaluationService_failed_documents():
+    async def run():
+        service = EvaluationService()
+        with pytest.raises(Exception):
+            await service.submit(['O'], ['O'])
+
+        await service.start()
+        await service.submit(['O', 'O'], ['O'])
+        await service.submit(['B-PER'], ['B-PER'])
+        await service.stop()
+        return service
+
+    service = asyncio.run(run())
+    assert service.results is None
+    assert service.documents_failed == 1
+    assert service.documents_processed == 1
+    assert service.snapshot()["window"] is None
+    assert service.snapshot()["decayed"] is None
+
+
+def test_EvaluationService_late_documents():
+    clock = FakeClock()
+
+    async def run():
+        async with EvaluationService(window_seconds=10, window_bucket_count=10, clock=clock) as service:
+            clock.now = 20
+            await service.submit(['B-PER', 'O'], ['B-PER', 'O'], timestamp=20)
+            await service.join()
+            # submitted after a more recent document, only the first one is still in the window.
+            await service.submit(['B-PER', 'O'], ['O', 'O'], timestamp=15)
+            await service.submit(['B-PER', 'O'], ['O', 'O'], timestamp=5)
+            await service.join()
+            return service.snapshot()
+
+    snapshot = asyncio.run(run())
+
+    assert snapshot["documents_processed"] == 3
+    assert snapshot["overall"]["missed_gold_span"] == 2
+    assert snapshot["window"]["documents"] == 2
+    assert snapshot["window"]["overall"]["strict_match"]["recall"] == 0.5
+
+
+def test_EvaluationService_examples_per_category():
+    async def run():
+        async with EvaluationService(examples_per_category=1) as service:
+            for _ in range(3):
+                await service.submit(['B-PER', 'O'], ['O', 'O'], ['John', 'is'])
+            await service.join()
+            return service
+
+    service = asyncio.run(run())
+
+    assert service.snapshot()["overall"]["missed_gold_span"] == 3
+    assert len(service.results.missed_gold_span) == 1 and service.results.missed_gold_span.seen == 3
+    assert service.results_grouped_by_tags["PER"].missed_gold_span[0].spanned_tokens == ['John']
@@ -0,0 +1,181 @@
+from seqnereval import NERTagListEvaluator, checkpoint
+from seqnereval.streaming import StreamingEvaluator, evaluate_batch
+
+tokens = [
+    ['The', 'John', 'Doe\'s', 'Basketball', 'Club'],
+    ['The', 'Canada', 'Place', 'is', 'best', '.'],
+    ['_', 'John', 'is', 'a', 'good', 'person', '.'],
+]
+gold = [
+    ["O", "B-PER", "I-PER", "B-ORG", "I-ORG"],
+    ["O", "B-LOC", "I-LOC", "O", "O", "O"],
+    ["O", "U-PER", "O", "O", "O", "O", "O"],
+]
+pred = [
+    ["O", "B-PER", "I-PER", "B-LOC", "I-LOC"],
+    ["O", "B-LOC", "O", "O", "O", "O"],
+    ["O", "O", "O", "O", "B-PER", "O", "O"],
+]
+
+
+def test_evaluate_batch():
+    batch_result = evaluate_batch(list(zip(tokens, gold, pred)), counts_only=True)
+
+    assert batch_result.document_count == 3
+    assert batch_result.token_count == 18
+    assert batch_result.results is None and batch_result.results_grouped_by_tags is None
+    assert batch_result.counts.get_scenario_counts()['type_match_bounds_match'] == 1
+
+
+def test_StreamingEvaluator():
+    expected_results, expected_results_grouped_by_tags = NERTagListEvaluator(tokens, gold, pred).evaluate()
+
+    for jobs in [1, 2]:
+        evaluator = StreamingEvaluator(jobs=jobs, batch_size=2)
+        evaluator.evaluate(zip(tokens, gold, pred))
+
+        assert evaluator.document_count == 3
+        assert evaluator.results.summarize_result() == expected_results.summarize_result()
+        assert evaluator.results_grouped_by_tags['PER'].missed_gold_span == \
+            expected_results_grouped_by_tags['PER'].missed_gold_span
+
+        summary = evaluator.summarize_result(per_tag=True)
+        assert summary['overall']['strict_match'] == expected_results.strict_match.get_summary()
+        assert summary['by_tags']['LOC']['strict_match'] == \
+            expected_results_grouped_by_tags['LOC'].strict_match.get_summary()
+        assert summary['confusion_matrix'] == expected_results.confusion_matrix.to_dict()
+
+    evaluator = StreamingEvaluator(counts_only=True)
+    evaluator.evaluate(zip(tokens, gold, pred))
+    assert evaluator.results is None
+    assert evaluator.summarize_result()['overall']['strict_match'] == expected_results.strict_match.get_summary()
+    assert evaluator.get_throughput()['tokens'] == 18
+
+
+def test_streaming_evaluator_heavy_hitters():
+    documents = [(['Acme', 'Corp', 'rocks'], ['B-ORG', 'I-ORG', 'O'], ['O', 'O', 'O'])] * 5
+
+    evaluator = StreamingEvaluator(counts_only=True, batch_size=2, heavy_hitter_capacity=10)
+    evaluator.evaluate(documents)
+
+    assert evaluator.heavy_hitters.top(1, 'missed_gold_span') == [(('missed_gold_span', 'ORG', None, 'Acme Corp'), 5)]
+
+
+def test_streaming_evaluator_batch_cost():
+    expected_results, _ = NERTagListEvaluator(tokens, gold, pred).evaluate()
+
+    for jobs in [1, 2]:
+        evaluator = StreamingEvaluator(jobs=jobs, batch_cost=10)
+        evaluator.evaluate(zip(tokens, gold, pred))
+
+        assert evaluator.results.summarize_result() == expected_results.summarize_result()
+        # no two documents fit in a batch costing at most 10.
+        workers = evaluator.get_throughput()['workers']
+        assert sum(timing['chunks'] for timing in workers.values()) == 3
+        assert sum(timing['tokens'] for timing in workers.values()) == 18
+
+
+def test_StreamingEvaluator_checkpoint(tmp_path):
+    checkpoint_path = str(tmp_path / 'evaluation.ckpt')
+    expected_results, _ = NERTagListEvaluator(tokens, gold, pred).evaluate()
+
+    # a crash after the first two documents.
+    evaluator = StreamingEvaluator(batch_size=1)
+    evaluator.evaluate(zip(tokens[:2], gold[:2], pred[:2]), checkpoint_path=checkpoint_path, checkpoint_every=1)
+
+    resumed_evaluator = StreamingEvaluator.from_checkpoint(checkpoint_path)
+    assert resumed_evaluator.document_count == 2 and resumed_evaluator.batch_size == 1
+    resumed_evaluator.evaluate(zip(tokens, gold, pred), checkpoint_path=checkpoint_path)
+
+    assert resumed_evaluator.document_count == 3
+    assert resumed_evaluator.results.summarize_result() == expected_results.summarize_result()
+    assert StreamingEvaluator.from_checkpoint(checkpoint_path).token_count == 18
+    assert list(tmp_path.iterdir()) == [tmp_path / 'evaluation.ckpt']
+
+
+def sampling_documents(document_count):
+    # the PER span of every document starts at a different token, and the lengths vary so that the batches
+    # are handed out of order.
+    return [(['_'] * (doc_idx * 7 % 30) + ['John', 'met', 'Paris'], ['O'] * (doc_idx * 7 % 30) + ['B-PER', 'O', 'B-LOC'],
+             ['O'] * (doc_idx * 7 % 30) + ['B-PER', 'O', 'O']) for doc_idx in range(document_count)]
+
+
+def get_samples(evaluator):
+    return {
+        'overall': [(span_pair.gold_span.start_idx, span_pair.gold_span.end_idx)
+                    for span_pair in evaluator.results.type_match_bounds_match],
+        'missed': [(span.start_idx, span.end_idx) for span in evaluator.results_grouped_by_tags['LOC'].missed_gold_span],
+    }
+
+
+def test_StreamingEvaluator_sampling_is_deterministic():
+    documents = sampling_documents(300)
+
+    samples = []
+    for jobs in [1, 2, 3]:
+        evaluator = StreamingEvaluator(jobs=jobs, batch_size=20, examples_per_category=4)
+        merged_document_counts = []
+        add_batch_result = evaluator.add_batch_result
+
+        def record_merge(batch_result):
+            merged_document_counts.append(evaluator.document_count)
+            add_batch_result(batch_result)
+
+        evaluator.add_batch_result = record_merge
+        evaluator.evaluate(documents)
+
+        # batches are merged in stream order.
+        assert merged_document_counts == list(range(0, 300, 20))
+        assert evaluator.results.type_match_bounds_match.seen == 300
+        samples.append(get_samples(evaluator))
+
+    assert len(samples[0]['overall']) == 4 and samples[0] == samples[1] == samples[2]
+
+
+def test_StreamingEvaluator_resume_from_pool_checkpoints(tmp_path, monkeypatch):
+    documents = sampling_documents(300)
+    expected_evaluator = StreamingEvaluator(batch_size=20, examples_per_category=4).evaluate(documents)
+
+    # keep every intermediate checkpoint, keyed by the # of documents evaluated.
+    checkpoint_paths = {}
+    save_checkpoint = StreamingEvaluator.save_checkpoint
+
+    def save_every_checkpoint(evaluator, path):
+        checkpoint_paths[evaluator.document_count] = f'{path}.{evaluator.document_count}'
+        save_checkpoint(evaluator, checkpoint_paths[evaluator.document_count])
+
+    monkeypatch.setattr(StreamingEvaluator, 'save_checkpoint', save_every_checkpoint)
+    StreamingEvaluator(jobs=2, batch_size=20, examples_per_category=4).evaluate(
+        documents, checkpoint_path=str(tmp_path / 'evaluation.ckpt'), checkpoint_every=1)
+    assert sorted(checkpoint_paths) == list(range(20, 320, 20))
+
+    for document_count, checkpoint_path in checkpoint_paths.items():
+        resumed_evaluator = StreamingEvaluator.from_checkpoint(checkpoint_path, jobs=2)
+        assert resumed_evaluator.document_count == document_count
+        resumed_evaluator.evaluate(documents)
+
+        assert resumed_evaluator.document_count == 300
+        assert resumed_evaluator.summarize_result(per_tag=True) == expected_evaluator.summarize_result(per_tag=True)
+        assert get_samples(resumed_evaluator) == get_samples(expected_evaluator)
+
+
+def test_StreamingEvaluator_checkpoint_is_compact(tmp_path, monkeypatch):
+    checkpoint_path = str(tmp_path / 'evaluation.ckpt')
+    synced_directories = []
+    monkeypatch.setattr(checkpoint, 'fsync_directory', synced_directories.append)
+    expected_results, expected_results_grouped_by_tags = NERTagListEvaluator(tokens, gold, pred).evaluate()
+
+    evaluator = StreamingEvaluator(batch_size=1, examples_per_category=1)
+    evaluator.evaluate(zip(tokens, gold, pred), checkpoint_path=checkpoint_path)
+    assert synced_directories == [str(tmp_path)]
+
+    saved_checkpoint = checkpoint.pickle_load(checkpoint_path)
+    assert isinstance(saved_checkpoint['results'], bytes)
+    assert set(saved_checkpoint['results_grouped_by_tags']) == {'PER', 'ORG', 'LOC'}
+
+    resumed_evaluator = StreamingEvaluator.from_checkpoint(checkpoint_path)
+    assert resumed_evaluator.results.summarize_result() == expected_results.summarize_result()
+    assert resumed_evaluator.results_grouped_by_tags['PER'].summarize_result() == \
+        expected_results_grouped_by_tags['PER'].summarize_result()
+    assert resumed_evaluator.results.missed_gold_span.seen == len(expected_results.missed_gold_span)
+    assert resumed_evaluator.confusion_matrix == expected_results.confusion_matrix
@@ -0,0 +1,38 @@
+from seqnereval import aggregate_subword_tag_ids
+import pytest
+
+
+def test_aggregate_subword_tag_ids():
+    # [CLS] Jo ##hn Doe Van ##cou ##ver [SEP]
+    word_ids = [None, 0, 0, 1, 2, 2, 2, None]
+    tag_ids = [0, 1, 2, 2, 3, 1, 1, 0]
+
+    assert aggregate_subword_tag_ids(tag_ids, word_ids, 'first') == [1, 2, 3]
+    assert aggregate_subword_tag_ids(tag_ids, word_ids, 'last') == [2, 2, 1]
+    assert aggregate_subword_tag_ids(tag_ids, word_ids, 'majority') == [1, 2, 1]
+    # the votes of a word split by another word (or a special token) are counted together.
+    assert aggregate_subword_tag_ids([2, 2, 1, 0, 3, 1], [0, 0, 1, None, 0, 1], 'majority') == [2, 1]
+
+    logits = [
+        [5, 0, 0, 0],
+        [0, 1, 0.5, 0],
+        [0, 0, 4, 0],
+        [0, 0, 2, 0],
+        [0, 0, 0, 1],
+        [0, 3, 0, 0],
+        [0, 0.1, 0, 0],
+        [5, 0, 0, 0],
+    ]
+    assert aggregate_subword_tag_ids(None, word_ids, 'max_prob', logits) == [2, 2, 1]
+
+    with pytest.raises(Exception):
+        aggregate_subword_tag_ids(tag_ids, word_ids, 'average')
+
+    with pytest.raises(Exception):
+        aggregate_subword_tag_ids(tag_ids, word_ids, 'max_prob')
+
+    with pytest.raises(Exception):
+        aggregate_subword_tag_ids(tag_ids[:-1], word_ids)
+
+    with pytest.raises(Exception):
+        aggregate_subword_tag_ids([1, 1], [0, 2])